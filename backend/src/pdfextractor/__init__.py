@@ -2,6 +2,12 @@ __version__ = "1.0.0"
 __author__ = "ENTER AI Fellowship"
 
 from .pipeline import ExtractionPipeline, Pipeline
-from .api import app
 
 __all__ = ["ExtractionPipeline", "Pipeline", "app"]
+
+
+def __getattr__(name):
+    if name == "app":
+        from .api import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
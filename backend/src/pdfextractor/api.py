@@ -1,7 +1,14 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Tuple
+import asyncio
 import json
+import random
+import time
+import xxhash
 from dotenv import load_dotenv
 
 from .models import (
@@ -14,17 +21,34 @@ from .models import (
     ProcessingMetadata
 )
 from .pipeline import Pipeline
+from .executor import ExtractionExecutor, QueueFullError
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 from .settings import settings
 from . import __version__
 
 load_dotenv()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+QUEUE_RETRY_INITIAL_DELAY = 0.1
+
+executor = ExtractionExecutor(settings.execution)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    executor.shutdown()
+    pipeline.flush_statistics()
+    pipeline.llm.close()
+
+
 app = FastAPI(
     title="PDF Extractor API",
     description="Intelligent PDF data extraction with heuristics, caching, and LLM fallback",
     version=__version__,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -38,8 +62,10 @@ app.add_middleware(
 pipeline = Pipeline(
     cache_dir=settings.cache.directory,
     enable_cache=True,
-    enable_heuristics=True
+    enable_heuristics=True,
+    parser_pool=executor.process_pool
 )
+executor.register_metrics(pipeline.metrics)
 
 
 def validate_pdf_extension(filename: str) -> None:
@@ -59,17 +85,84 @@ def parse_schema(schema_str: str) -> dict:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-async def read_pdf_content(pdf: UploadFile) -> bytes:
+def queue_full_error(e: QueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, extraction queue is full. Retry later.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+async def run_extraction(
+    pdf_content: bytes,
+    pdf_hash: str,
+    label: str,
+    schema: Dict[str, str],
+    use_cache: bool,
+    batch_llm: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    lookup = None
+    if use_cache:
+        lookup = await run_in_threadpool(pipeline.lookup, pdf_hash, label, schema)
+        if lookup.full_hit:
+            return await run_in_threadpool(
+                pipeline.process, pdf_content, label, schema, pdf_hash=pdf_hash, lookup=lookup
+            )
+    
+    return await executor.run(
+        pipeline.process,
+        pdf_content,
+        label,
+        schema,
+        use_cache=use_cache,
+        pdf_hash=pdf_hash,
+        batch_llm=batch_llm,
+        lookup=lookup
+    )
+
+
+async def run_with_queue_retry(*args, **kwargs) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    deadline = time.monotonic() + settings.execution.batch_queue_timeout_seconds
+    delay = QUEUE_RETRY_INITIAL_DELAY
+    while True:
+        try:
+            return await run_extraction(*args, **kwargs)
+        except QueueFullError as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            await asyncio.sleep(min(delay * random.uniform(0.5, 1.0), e.retry_after, remaining))
+            delay = min(delay * 2, e.retry_after)
+
+
+async def read_pdf_content(pdf: UploadFile) -> Tuple[bytes, str]:
+    max_size = settings.limits.max_pdf_size_mb * 1024 * 1024
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"PDF too large. Maximum size: {settings.limits.max_pdf_size_mb}MB"
+    )
+    
+    if pdf.size is not None and pdf.size > max_size:
+        raise too_large
+    
     try:
-        content = await pdf.read()
-        max_size = settings.limits.max_pdf_size_mb * 1024 * 1024
+        digest = xxhash.xxh64()
+        chunks = []
+        size = 0
         
-        if len(content) > max_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"PDF too large. Maximum size: {settings.limits.max_pdf_size_mb}MB"
-            )
-        return content
+        while True:
+            chunk = await pdf.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            size += len(chunk)
+            if size > max_size:
+                raise too_large
+            
+            digest.update(chunk)
+            chunks.append(chunk)
+        
+        return b"".join(chunks), digest.hexdigest()
     except HTTPException:
         raise
     except Exception as e:
@@ -101,17 +194,20 @@ async def extract_from_pdf(
     
     validate_pdf_extension(pdf.filename)
     schema_dict = parse_schema(schema)
-    pdf_content = await read_pdf_content(pdf)
+    pdf_content, pdf_hash = await read_pdf_content(pdf)
     
     print(f"  - PDF size: {len(pdf_content)} bytes")
     
     try:
-        data, metadata = pipeline.process(pdf_content, label, schema_dict, use_cache=use_cache)
+        data, metadata = await run_extraction(pdf_content, pdf_hash, label, schema_dict, use_cache)
         print(f"  - Extraction successful, method: {metadata.get('method')}")
         return ExtractionResult(
             data=data,
             metadata=ProcessingMetadata(**metadata)
         )
+    except QueueFullError as e:
+        print("  - Rejected, queue full")
+        raise queue_full_error(e)
     except Exception as e:
         print(f"  - Extraction error: {str(e)}")
         import traceback
@@ -119,11 +215,56 @@ async def extract_from_pdf(
         raise HTTPException(status_code=500, detail=f"Extraction error: {str(e)}")
 
 
+async def process_batch_item(
+    idx: int,
+    filename: str,
+    pdf_content: bytes,
+    pdf_hash: str,
+    req: DocumentLabel,
+    use_cache: bool,
+    semaphore: asyncio.Semaphore
+) -> BatchItem:
+    async with semaphore:
+        try:
+            data, metadata = await run_with_queue_retry(
+                pdf_content,
+                pdf_hash,
+                req.label,
+                req.extraction_schema,
+                use_cache,
+                batch_llm=True
+            )
+            return BatchItem(
+                index=idx,
+                data=data,
+                metadata=ProcessingMetadata(**metadata)
+            )
+        except QueueFullError:
+            return BatchItem(index=idx, error="Server busy, extraction queue is full")
+        except Exception as e:
+            print(f"[BATCH] Error processing file {idx} ('{filename}'): {str(e)}")
+            return BatchItem(
+                index=idx,
+                error=f"Error processing file {idx} ('{filename}'): {str(e)}"
+            )
+
+
+async def stream_batch_items(tasks: List[asyncio.Task]):
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            yield item.model_dump_json() + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 @app.post("/extract/batch", response_model=BatchResult)
 async def extract_batch_from_pdfs(
     pdfs: List[UploadFile] = File(...),
     requests: str = Form(...),
-    use_cache: bool = Form(True)
+    use_cache: bool = Form(True),
+    stream: bool = Form(False)
 ):
     try:
         requests_list = json.loads(requests)
@@ -142,43 +283,53 @@ async def extract_batch_from_pdfs(
             detail=f"PDF count ({len(pdfs)}) must match request count ({len(validated_requests)})"
         )
     
-    results = []
+    failed = []
+    pending = []
     
     for idx, (pdf, req) in enumerate(zip(pdfs, validated_requests)):
-        validate_pdf_extension(pdf.filename)
-        
         try:
-            pdf_content = await read_pdf_content(pdf)
-            data, metadata = pipeline.process(
-                pdf_content,
-                req.label,
-                req.extraction_schema,
-                use_cache=use_cache
-            )
-            
-            results.append(BatchItem(
+            validate_pdf_extension(pdf.filename)
+            pdf_content, pdf_hash = await read_pdf_content(pdf)
+            pending.append((idx, pdf.filename, pdf_content, pdf_hash, req))
+        except HTTPException as e:
+            failed.append(BatchItem(
                 index=idx,
-                data=data,
-                metadata=ProcessingMetadata(**metadata)
+                error=f"Error processing file {idx} ('{pdf.filename}'): {e.detail}"
             ))
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error processing file {idx} ('{pdf.filename}'): {str(e)}"
-            )
+    
+    semaphore = asyncio.Semaphore(settings.execution.batch_concurrency)
+    tasks = [
+        asyncio.create_task(
+            process_batch_item(idx, filename, pdf_content, pdf_hash, req, use_cache, semaphore)
+        )
+        for idx, filename, pdf_content, pdf_hash, req in pending
+    ]
+    
+    if stream:
+        async def ndjson_lines():
+            for item in failed:
+                yield item.model_dump_json() + "\n"
+            async for line in stream_batch_items(tasks):
+                yield line
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    results = failed + list(await asyncio.gather(*tasks))
+    results.sort(key=lambda item: item.index)
+    total_failed = sum(1 for item in results if item.error is not None)
     
     return BatchResult(
         results=results,
-        total_processed=len(results)
+        total_processed=len(results) - total_failed,
+        total_failed=total_failed
     )
 
 
 @app.get("/stats", response_model=PipelineStatistics)
 async def get_statistics():
     try:
-        stats = pipeline.get_statistics()
+        stats = await run_in_threadpool(pipeline.get_statistics)
+        stats["executor"] = executor.get_stats()
         return PipelineStatistics(**stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
@@ -187,8 +338,16 @@ async def get_statistics():
 @app.post("/stats/reset")
 async def reset_statistics():
     try:
-        pipeline.reset_statistics()
+        await run_in_threadpool(pipeline.reset_statistics)
         return {"message": "Statistics reset successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error resetting stats: {str(e)}")
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    try:
+        text = await run_in_threadpool(pipeline.metrics.render)
+        return PlainTextResponse(text, media_type=METRICS_CONTENT_TYPE)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering metrics: {str(e)}")
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import xxhash
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pdfextractor.cache import MemoryCache
+from pdfextractor.cli import iter_dataset_items
+from pdfextractor.latency import PERCENTILES, STAGES, percentile
+from pdfextractor.llm_client import LLMClient
+from pdfextractor.pipeline import ExtractionPipeline
+
+SCENARIOS = ["cold", "warm_l1", "warm_l2", "l3_partial"]
+EXTRA_FIELD = ("campo_extra_benchmark", "Campo ausente do cache, força um hit parcial (L3)")
+COMPARED_CONFIG = ("documents", "repeat", "workers", "llm_latency_ms")
+MIN_LATENCY_DELTA = 0.001
+RSS_SAMPLE_INTERVAL = 0.01
+MIN_RSS_DELTA_MB = 5.0
+
+
+class FakeLLMClient(LLMClient):
+    
+    def __init__(self, latency_seconds: float = 0.2):
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+        super().__init__()
+        self.latency_seconds = latency_seconds
+    
+    @staticmethod
+    def answer(text: str, field: str) -> Any:
+        return f"{field}-{xxhash.xxh64(f'{field}:{text}'.encode()).hexdigest()[:8]}"
+    
+    async def _respond(self, messages: List[Dict[str, str]], fields: int):
+        await asyncio.sleep(self.latency_seconds)
+        self._record_usage(SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+            completion_tokens=10 * fields,
+            prompt_tokens_details=None
+        ))
+    
+    async def aextract_fields(
+        self,
+        text: str,
+        schema: Dict[str, str],
+        label: Optional[str] = None,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        messages = self._build_messages(self._prepare_text(text, schema, context), schema, label, context)
+        await self._respond(messages, len(schema))
+        return {field: self.answer(text, field) for field in schema}
+    
+    async def aextract_batch(
+        self,
+        items: List[Tuple[str, Dict[str, str], Optional[Dict]]],
+        label: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        messages = self._build_batch_messages(items, label)
+        await self._respond(messages, sum(len(schema) for _, schema, _ in items))
+        self.stats.incr("batched_calls")
+        self.stats.incr("batched_documents", len(items))
+        return [
+            {field: self.answer(text, field) for field in schema}
+            for text, schema, context in items
+        ]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return round(peak / 1024**2, 1)
+    return round(peak / 1024, 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * resource.getpagesize() / 1024**2
+
+
+class RssSampler:
+    
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start: Optional[float] = None
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def __enter__(self) -> "RssSampler":
+        self.start = current_rss_mb()
+        self.peak = self.start
+        if self.start is not None:
+            self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._sample()
+    
+    def growth_mb(self) -> Optional[float]:
+        if self.start is None or self.peak is None:
+            return None
+        return self.peak - self.start
+
+
+def load_items(args) -> List[Dict[str, Any]]:
+    if args.pdfs:
+        try:
+            schema = json.loads(args.schema)
+        except (TypeError, json.JSONDecodeError) as e:
+            print(f"Erro: informe um --schema JSON válido para usar --pdfs: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        paths = sorted(Path(args.pdfs).glob("*.pdf"))
+        items = [
+            {"index": idx, "label": args.label, "schema": schema, "pdf_path": str(path)}
+            for idx, path in enumerate(paths, 1)
+        ]
+    else:
+        if not os.path.exists(args.dataset):
+            print(f"Erro: Dataset não encontrado: {args.dataset}", file=sys.stderr)
+            sys.exit(1)
+        with open(args.dataset, 'r', encoding='utf-8') as f:
+            items = list(iter_dataset_items(json.load(f), args.pdf_dir))
+    
+    for item in items:
+        with open(item["pdf_path"], 'rb') as f:
+            item["pdf_content"] = f.read()
+    
+    return items
+
+
+def make_pipeline(cache_dir: str, latency_seconds: float) -> ExtractionPipeline:
+    pipeline = ExtractionPipeline(cache_dir=cache_dir, llm=FakeLLMClient(latency_seconds))
+    if pipeline.calibrator is not None:
+        pipeline.calibrator.sample_rate = 0.0
+    return pipeline
+
+
+def run_pass(
+    pipeline: ExtractionPipeline,
+    items: List[Dict[str, Any]],
+    workers: int,
+    extra_field: bool = False
+) -> Tuple[float, List[Dict[str, Any]], RssSampler]:
+    def extract(item):
+        schema = dict(item["schema"])
+        if extra_field:
+            schema[EXTRA_FIELD[0]] = EXTRA_FIELD[1]
+        _, metadata = pipeline.extract(item["pdf_content"], item["label"], schema, batch_llm=workers > 1)
+        return metadata
+    
+    with RssSampler() as rss:
+        started_at = time.perf_counter()
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                samples = list(pool.map(extract, items))
+        else:
+            samples = [extract(item) for item in items]
+        elapsed = time.perf_counter() - started_at
+    
+    return elapsed, samples, rss
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    summary = {f"p{p}": round(percentile(ordered, p), 6) for p in PERCENTILES}
+    summary["mean"] = round(sum(ordered) / len(ordered), 6) if ordered else 0.0
+    return summary
+
+
+def summarize_rss(samplers: List[RssSampler]) -> Dict[str, Optional[float]]:
+    peaks = [rss.peak for rss in samplers if rss.peak is not None]
+    growth = [rss.growth_mb() for rss in samplers if rss.growth_mb() is not None]
+    return {
+        "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+        "rss_growth_mb": round(max(growth), 1) if growth else None,
+    }
+
+
+def summarize_scenario(passes: List[Tuple[float, List[Dict[str, Any]], RssSampler]]) -> Dict[str, Any]:
+    seconds = sum(elapsed for elapsed, _, _ in passes)
+    samples = [metadata for _, pass_samples, _ in passes for metadata in pass_samples]
+    
+    methods: Dict[str, int] = {}
+    cache_levels: Dict[str, int] = {}
+    for metadata in samples:
+        methods[metadata["method"]] = methods.get(metadata["method"], 0) + 1
+        if metadata.get("cache_level"):
+            cache_levels[metadata["cache_level"]] = cache_levels.get(metadata["cache_level"], 0) + 1
+    
+    stages = {}
+    for stage in STAGES:
+        values = [metadata["timings"][stage] for metadata in samples if stage in metadata.get("timings", {})]
+        if values:
+            stages[stage] = {"count": len(values), **summarize(values)}
+    
+    return {
+        "documents": len(samples),
+        "seconds": round(seconds, 4),
+        "docs_per_sec": round(len(samples) / seconds, 2) if seconds else 0.0,
+        "methods": methods,
+        "cache_levels": cache_levels,
+        "latency": summarize([metadata["processing_time"] for metadata in samples]),
+        "stages": stages,
+        **summarize_rss([rss for _, _, rss in passes]),
+    }
+
+
+def run_benchmark(
+    items: List[Dict[str, Any]],
+    scenarios: List[str],
+    latency_seconds: float,
+    repeat: int,
+    workers: int
+) -> Dict[str, Any]:
+    passes: Dict[str, List] = {name: [] for name in scenarios}
+    
+    for _ in range(repeat):
+        cache_dir = tempfile.mkdtemp(prefix="pdfextractor-bench-")
+        pipeline = make_pipeline(cache_dir, latency_seconds)
+        try:
+            cold = run_pass(pipeline, items, workers)
+            if "cold" in passes:
+                passes["cold"].append(cold)
+            
+            if "warm_l1" in passes:
+                passes["warm_l1"].append(run_pass(pipeline, items, workers))
+            
+            if "warm_l2" in passes:
+                memory_cache = pipeline.cache.memory_cache
+                pipeline.cache.memory_cache = MemoryCache(max_items=0)
+                try:
+                    passes["warm_l2"].append(run_pass(pipeline, items, workers))
+                finally:
+                    pipeline.cache.memory_cache = memory_cache
+            
+            if "l3_partial" in passes:
+                passes["l3_partial"].append(run_pass(pipeline, items, workers, extra_field=True))
+        finally:
+            pipeline.llm.close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    return {
+        "config": {
+            "documents": len(items),
+            "repeat": repeat,
+            "workers": workers,
+            "llm_latency_ms": round(latency_seconds * 1000, 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": {name: summarize_scenario(scenario_passes) for name, scenario_passes in passes.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        
+        if current["docs_per_sec"] < previous["docs_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: docs/s {current['docs_per_sec']} < baseline {previous['docs_per_sec']}"
+            )
+        
+        for key in ("p50", "p95"):
+            delta = current["latency"][key] - previous["latency"][key]
+            if delta > MIN_LATENCY_DELTA and current["latency"][key] > previous["latency"][key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {current['latency'][key]:.4f}s > baseline {previous['latency'][key]:.4f}s"
+                )
+        
+        growth, previous_growth = current.get("rss_growth_mb"), previous.get("rss_growth_mb")
+        if (
+            growth is not None and previous_growth is not None
+            and growth - previous_growth > MIN_RSS_DELTA_MB
+            and growth > previous_growth * (1 + tolerance)
+        ):
+            regressions.append(f"{name}: RSS +{growth}MB > baseline +{previous_growth}MB")
+    
+    if report["peak_rss_mb"] > baseline.get("peak_rss_mb", float("inf")) * (1 + tolerance):
+        regressions.append(f"peak RSS {report['peak_rss_mb']}MB > baseline {baseline['peak_rss_mb']}MB")
+    
+    return regressions
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    config = report["config"]
+    print(
+        f"\n{config['documents']} documentos x {config['repeat']} repetições, "
+        f"{config['workers']} worker(s), LLM falso com {config['llm_latency_ms']}ms",
+        file=sys.stderr
+    )
+    print(f"{'cenário':<12}{'docs/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}  métodos", file=sys.stderr)
+    
+    for name, scenario in report["scenarios"].items():
+        latency = scenario["latency"]
+        line = (
+            f"{name:<12}{scenario['docs_per_sec']:>10.2f}"
+            f"{latency['p50']:>10.4f}{latency['p95']:>10.4f}{latency['p99']:>10.4f}  "
+            f"{', '.join(f'{k}={v}' for k, v in sorted(scenario['methods'].items()))}"
+        )
+        if scenario.get("rss_growth_mb") is not None:
+            line += f"  RSS {scenario['peak_rss_mb']}MB (+{scenario['rss_growth_mb']}MB)"
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous and previous["docs_per_sec"]:
+            change = (scenario["docs_per_sec"] / previous["docs_per_sec"] - 1) * 100
+            line += f"  ({change:+.1f}% docs/s vs baseline)"
+        print(line, file=sys.stderr)
+        
+        for stage, summary in scenario["stages"].items():
+            print(
+                f"  {stage:<14}p50 {summary['p50']:.4f}s  p95 {summary['p95']:.4f}s  p99 {summary['p99']:.4f}s",
+                file=sys.stderr
+            )
+    
+    print(f"Pico de RSS: {report['peak_rss_mb']}MB", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark offline do pipeline de extração com LLM simulado"
+    )
+    
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--dataset', default='examples/dataset.json', help='Arquivo dataset.json (padrão: examples/dataset.json)')
+    source.add_argument('--pdfs', help='Diretório com PDFs (usa --label e --schema para todos)')
+    parser.add_argument('--pdf-dir', help='Diretório base dos PDFs do dataset (opcional)')
+    parser.add_argument('--label', default='documento', help='Label usado com --pdfs')
+    parser.add_argument('--schema', help='Schema JSON usado com --pdfs')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument('--llm-latency-ms', type=float, default=200, help='Latência simulada de cada chamada ao LLM')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Repetições de cada cenário, cada uma com cache novo')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Documentos processados em paralelo')
+    parser.add_argument('--output', '-o', help='Salvar relatório JSON neste arquivo')
+    parser.add_argument('--baseline', help='Relatório JSON anterior para comparação')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Variação aceita em relação ao baseline (padrão: 0.2)')
+    
+    args = parser.parse_args()
+    
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Erro: cenários desconhecidos: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    items = load_items(args)
+    if not items:
+        print("Erro: nenhum PDF encontrado", file=sys.stderr)
+        sys.exit(1)
+    
+    report = run_benchmark(items, scenarios, args.llm_latency_ms / 1000, args.repeat, args.workers)
+    print_report(report, baseline)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório salvo em: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    
+    if baseline is not None:
+        different = [
+            key for key in COMPARED_CONFIG
+            if baseline.get("config", {}).get(key) != report["config"][key]
+        ]
+        if different:
+            print(f"\nAviso: configuração diferente do baseline ({', '.join(different)})", file=sys.stderr)
+        
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressões em relação ao baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  ✗ {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("\nSem regressões em relação ao baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,7 @@
 from .cache_manager import CacheManager as Cache
 from .cache_key import CacheKeyGenerator as KeyGenerator
+from .memory_cache import MemoryCache
+from .parse_cache import ParseCache
+from .shared_counters import SharedCounters
 
-__all__ = ["Cache", "KeyGenerator", "CacheManager", "CacheKeyGenerator"]
+__all__ = ["Cache", "KeyGenerator", "CacheManager", "CacheKeyGenerator", "MemoryCache", "ParseCache", "SharedCounters"]
@@ -15,15 +15,17 @@ class CacheKeyGenerator:
         return xxhash.xxh64(schema_json.encode()).hexdigest()
     
     @staticmethod
-    def generate_full_key(pdf_content: bytes, label: str, schema: Dict[str, str]) -> str:
-        pdf_hash = CacheKeyGenerator.hash_pdf(pdf_content)
+    def generate_full_key(pdf_hash: str, label: str, schema: Dict[str, str]) -> str:
         schema_hash = CacheKeyGenerator.hash_schema(schema)
         return f"{pdf_hash}:{label}:{schema_hash}"
     
     @staticmethod
-    def generate_field_key(pdf_content: bytes, label: str, field_name: str) -> str:
-        pdf_hash = CacheKeyGenerator.hash_pdf(pdf_content)
-        return f"{pdf_hash}:{label}:field:{field_name}"
+    def generate_document_key(pdf_hash: str, label: str) -> str:
+        return f"{pdf_hash}:{label}:doc"
+    
+    @staticmethod
+    def generate_field_key(field_name: str, description: str) -> str:
+        return f"{field_name}:{xxhash.xxh64(str(description).encode()).hexdigest()}"
     
     @staticmethod
     def generate_template_key(label: str) -> str:
@@ -1,110 +1,159 @@
 import time
-from typing import Optional, Dict, Any
-from collections import OrderedDict
-from diskcache import Cache
+from typing import Callable, Optional, Dict, Any
+from diskcache import FanoutCache, Lock
 from .cache_key import CacheKeyGenerator
+from .memory_cache import MemoryCache
+from .shared_counters import SharedCounters
+from ..metrics import MetricsRegistry
+from ..settings import CacheSettings, settings
+
+LOCK_EXPIRE_SECONDS = 10
 
 
 class CacheManager:
     
-    def __init__(self, cache_dir: str = "./storage/cache_data", memory_size: int = 100):
-        self.memory_cache: OrderedDict = OrderedDict()
-        self.memory_size = memory_size
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        cache_settings: Optional[CacheSettings] = None,
+        shared_stats: bool = True
+    ):
+        cache_settings = cache_settings or settings.cache
+        
+        self.memory_cache = MemoryCache(
+            max_items=max(1, int(cache_settings.memory_size * (1 - cache_settings.parsed_fraction))),
+            max_bytes=int(cache_settings.memory_size_mb * (1 - cache_settings.parsed_fraction) * 1024**2),
+            ttl_seconds=cache_settings.memory_ttl_seconds
+        )
         
-        self.disk_cache = Cache(
-            cache_dir,
-            size_limit=1024**3,
+        self.disk_cache = FanoutCache(
+            cache_dir or cache_settings.directory,
+            shards=cache_settings.shards,
+            size_limit=int(cache_settings.disk_size_gb * (1 - cache_settings.parsed_fraction) * 1024**3),
             eviction_policy='least-recently-used'
         )
         
         self.key_gen = CacheKeyGenerator()
         
-        self.stats = {
-            "l1_hits": 0,
-            "l2_hits": 0,
-            "l3_hits": 0,
-            "misses": 0,
-            "total_requests": 0,
-        }
+        self.stats_store = self.disk_cache.cache("stats") if shared_stats else None
+        self.calibration_store = self.disk_cache.cache("calibration")
+        self.stats = SharedCounters(
+            "cache",
+            ["l1_hits", "l2_hits", "l3_hits", "misses", "total_requests"],
+            store=self.stats_store
+        )
     
     def get(
         self, 
-        pdf_content: bytes,
+        pdf_hash: str,
         label: str, 
         schema: Dict[str, str]
     ) -> Optional[Dict[str, Any]]:
-        self.stats["total_requests"] += 1
+        self.stats.incr("total_requests")
         
-        full_key = self.key_gen.generate_full_key(pdf_content, label, schema)
+        doc_key = self.key_gen.generate_document_key(pdf_hash, label)
+        schema_hash = self.key_gen.hash_schema(schema)
         
-        if full_key in self.memory_cache:
-            self.memory_cache.move_to_end(full_key)
-            self.stats["l1_hits"] += 1
-            result = self.memory_cache[full_key]
-            result["_cache_level"] = "L1_MEMORY"
-            return result
+        record = self.memory_cache.get(doc_key)
+        cache_level = "L1_MEMORY"
+        
+        if record is None:
+            record = self.disk_cache.get(doc_key)
+            cache_level = "L2_DISK"
+            if record is not None:
+                self.memory_cache.set(doc_key, record)
         
-        disk_result = self.disk_cache.get(full_key)
-        if disk_result is not None:
-            self._add_to_l1(full_key, disk_result)
-            self.stats["l2_hits"] += 1
-            disk_result["_cache_level"] = "L2_DISK"
-            return disk_result
+        if record is None or "results" not in record:
+            self.stats.incr("misses")
+            return None
         
-        partial = self._try_partial_match(pdf_content, label, schema)
+        if schema_hash in record["results"]:
+            self.stats.incr("l1_hits" if cache_level == "L1_MEMORY" else "l2_hits")
+            result = dict(record["results"][schema_hash])
+            result["_cache_level"] = cache_level
+            return result
+        
+        partial = self._try_partial_match(record["fields"], schema)
         if partial:
-            self.stats["l3_hits"] += 1
+            self.stats.incr("l3_hits")
             partial["_cache_level"] = "L3_PARTIAL"
             return partial
         
-        self.stats["misses"] += 1
+        self.stats.incr("misses")
         return None
     
     def set(
         self,
-        pdf_content: bytes,
+        pdf_hash: str,
         label: str,
         schema: Dict[str, str],
         result: Dict[str, Any]
     ):
-        full_key = self.key_gen.generate_full_key(pdf_content, label, schema)
+        doc_key = self.key_gen.generate_document_key(pdf_hash, label)
+        schema_hash = self.key_gen.hash_schema(schema)
         
-        clean_result = {k: v for k, v in result.items() if not k.startswith("_")}
+        values = {field_name: result.get(field_name) for field_name in schema}
+        
+        with Lock(self.disk_cache, f"{doc_key}:lock", expire=LOCK_EXPIRE_SECONDS):
+            record = self.disk_cache.get(doc_key)
+            if record is None or "results" not in record:
+                record = {"fields": {}, "results": {}}
+            
+            fields = record["fields"]
+            for field_name, field_value in values.items():
+                field_key = self.key_gen.generate_field_key(field_name, schema[field_name])
+                if field_value is not None or field_key not in fields:
+                    fields[field_key] = field_value
+            
+            record["results"][schema_hash] = values
+            record["updated_at"] = time.time()
+            
+            self.disk_cache.set(doc_key, record)
+            self.memory_cache.set(doc_key, record)
+    
+    def get_template(self, label: str) -> Optional[Dict[str, Any]]:
+        key = self.key_gen.generate_template_key(label)
         
-        self._add_to_l1(full_key, clean_result)
-        self.disk_cache.set(full_key, clean_result)
+        template = self.memory_cache.get(key)
+        if template is None:
+            template = self.disk_cache.get(key)
+            if template is not None:
+                self.memory_cache.set(key, template)
         
-        for field_name, field_value in clean_result.items():
-            if field_value is not None:
-                field_key = self.key_gen.generate_field_key(pdf_content, label, field_name)
-                self.disk_cache.set(field_key, {
-                    "value": field_value,
-                    "timestamp": time.time()
-                })
+        return template
     
-    def _add_to_l1(self, key: str, value: Any):
-        if len(self.memory_cache) >= self.memory_size:
-            self.memory_cache.popitem(last=False)
-        self.memory_cache[key] = value
+    def set_template(self, label: str, template: Dict[str, Any]):
+        key = self.key_gen.generate_template_key(label)
+        self.memory_cache.set(key, template)
+        self.disk_cache.set(key, template)
     
-    def _try_partial_match(
+    def update_template(
         self,
-        pdf_content: bytes,
         label: str,
+        update: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]
+    ) -> bool:
+        key = self.key_gen.generate_template_key(label)
+        
+        with Lock(self.disk_cache, f"{key}:lock", expire=LOCK_EXPIRE_SECONDS):
+            template = update(self.disk_cache.get(key))
+            if template is None:
+                return False
+            
+            self.disk_cache.set(key, template)
+            self.memory_cache.set(key, template)
+        
+        return True
+    
+    def _try_partial_match(
+        self,
+        fields: Dict[str, Any],
         schema: Dict[str, str]
     ) -> Optional[Dict]:
-        result = {}
-        found_count = 0
-        
-        for field_name in schema.keys():
-            field_key = self.key_gen.generate_field_key(pdf_content, label, field_name)
-            cached_field = self.disk_cache.get(field_key)
-            
-            if cached_field:
-                result[field_name] = cached_field["value"]
-                found_count += 1
-            else:
-                result[field_name] = None
+        result = {
+            field_name: fields.get(self.key_gen.generate_field_key(field_name, description))
+            for field_name, description in schema.items()
+        }
+        found_count = sum(1 for value in result.values() if value is not None)
         
         match_rate = found_count / len(schema) if schema else 0
         
@@ -115,22 +164,50 @@ class CacheManager:
         
         return None
     
+    def register_metrics(self, metrics: MetricsRegistry):
+        metrics.counter(
+            "cache_hits_total", "Result cache hits by level", ["level"],
+            collect=lambda: self._hit_counts()
+        )
+        metrics.counter(
+            "cache_misses_total", "Result cache misses",
+            collect=lambda: {(): self.stats.snapshot()["misses"]}
+        )
+        metrics.gauge(
+            "cache_memory_items", "Entries in the L1 memory cache",
+            collect=lambda: {(): len(self.memory_cache)}
+        )
+        metrics.gauge(
+            "cache_memory_bytes", "Estimated size of the L1 memory cache",
+            collect=lambda: {(): self.memory_cache.size_bytes}
+        )
+    
+    def _hit_counts(self) -> Dict[tuple, int]:
+        counters = self.stats.snapshot()
+        return {
+            ("l1",): counters["l1_hits"],
+            ("l2",): counters["l2_hits"],
+            ("l3",): counters["l3_hits"],
+        }
+    
     def get_stats(self) -> Dict[str, Any]:
-        total = self.stats["total_requests"]
-        total_hits = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["l3_hits"]
+        counters = self.stats.snapshot()
+        total = counters["total_requests"]
+        total_hits = counters["l1_hits"] + counters["l2_hits"] + counters["l3_hits"]
         
         return {
             "requests": total,
             "hits": {
-                "l1": self.stats["l1_hits"],
-                "l2": self.stats["l2_hits"],
-                "l3": self.stats["l3_hits"],
+                "l1": counters["l1_hits"],
+                "l2": counters["l2_hits"],
+                "l3": counters["l3_hits"],
                 "total": total_hits
             },
-            "misses": self.stats["misses"],
+            "misses": counters["misses"],
             "hit_rate": f"{total_hits / max(1, total) * 100:.1f}%",
             "cache_sizes": {
                 "memory_items": len(self.memory_cache),
+                "memory_bytes": self.memory_cache.size_bytes,
                 "disk_items": len(self.disk_cache)
             }
         }
@@ -0,0 +1,59 @@
+import pickle
+import threading
+import time
+from typing import Optional, Any, Hashable
+from collections import OrderedDict
+
+
+class MemoryCache:
+    
+    def __init__(self, max_items: int = 100, max_bytes: int = 64 * 1024**2, ttl_seconds: float = 3600):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            payload, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            
+            self._entries.move_to_end(key)
+        
+        return pickle.loads(payload)
+    
+    def set(self, key: Hashable, value: Any):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = (payload, expires_at)
+            self.size_bytes += len(payload)
+            
+            while self._entries and (
+                len(self._entries) > self.max_items or self.size_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+    
+    def _remove(self, key: Hashable):
+        payload, _ = self._entries.pop(key)
+        self.size_bytes -= len(payload)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,88 @@
+import os
+from typing import Optional, Dict, Any
+from diskcache import FanoutCache
+from .memory_cache import MemoryCache
+from .shared_counters import SharedCounters
+from ..metrics import MetricsRegistry
+from ..settings import CacheSettings, settings
+
+
+class ParseCache:
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        cache_settings: Optional[CacheSettings] = None,
+        shared_stats: bool = True
+    ):
+        cache_settings = cache_settings or settings.cache
+        
+        self.memory_cache = MemoryCache(
+            max_items=max(1, int(cache_settings.memory_size * cache_settings.parsed_fraction)),
+            max_bytes=int(cache_settings.memory_size_mb * cache_settings.parsed_fraction * 1024**2),
+            ttl_seconds=cache_settings.memory_ttl_seconds
+        )
+        
+        self.disk_cache = FanoutCache(
+            os.path.join(cache_dir or cache_settings.directory, "parsed"),
+            shards=cache_settings.shards,
+            size_limit=int(cache_settings.disk_size_gb * cache_settings.parsed_fraction * 1024**3),
+            eviction_policy='least-recently-used'
+        )
+        
+        self.stats = SharedCounters(
+            "parsed",
+            ["memory_hits", "disk_hits", "misses"],
+            store=self.disk_cache.cache("stats") if shared_stats else None
+        )
+    
+    def get(self, pdf_hash: str) -> Optional[Dict[str, Any]]:
+        artifacts = self.memory_cache.get(pdf_hash)
+        if artifacts is not None:
+            self.stats.incr("memory_hits")
+            return artifacts
+        
+        artifacts = self.disk_cache.get(pdf_hash)
+        if artifacts is not None:
+            self.memory_cache.set(pdf_hash, artifacts)
+            self.stats.incr("disk_hits")
+            return artifacts
+        
+        self.stats.incr("misses")
+        return None
+    
+    def set(self, pdf_hash: str, artifacts: Dict[str, Any]):
+        self.memory_cache.set(pdf_hash, artifacts)
+        self.disk_cache.set(pdf_hash, artifacts)
+    
+    def register_metrics(self, metrics: MetricsRegistry):
+        metrics.counter(
+            "parse_cache_hits_total", "Parsed PDF artifact cache hits by level", ["level"],
+            collect=lambda: self._hit_counts()
+        )
+        metrics.counter(
+            "parse_cache_misses_total", "Parsed PDF artifact cache misses",
+            collect=lambda: {(): self.stats.snapshot()["misses"]}
+        )
+    
+    def _hit_counts(self) -> Dict[tuple, int]:
+        counters = self.stats.snapshot()
+        return {
+            ("memory",): counters["memory_hits"],
+            ("disk",): counters["disk_hits"],
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        counters = self.stats.snapshot()
+        return {
+            "hits": {
+                "memory": counters["memory_hits"],
+                "disk": counters["disk_hits"],
+            },
+            "misses": counters["misses"],
+            "cache_sizes": {
+                "memory_items": len(self.memory_cache),
+                "memory_bytes": self.memory_cache.size_bytes,
+                "disk_items": len(self.disk_cache)
+            }
+        }
@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Union
+from diskcache import Cache
+
+Number = Union[int, float]
+
+
+class SharedCounters:
+    
+    def __init__(
+        self,
+        namespace: str,
+        names: Iterable[str],
+        store: Optional[Cache] = None,
+        flush_interval: float = 1.0
+    ):
+        self.namespace = namespace
+        self.names = list(names)
+        self.store = store
+        self.flush_interval = flush_interval
+        
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Number] = {name: 0 for name in self.names}
+        self._last_flush = time.monotonic()
+    
+    def _key(self, name: str) -> str:
+        return f"stats:{self.namespace}:{name}"
+    
+    def incr(self, name: str, delta: Number = 1):
+        with self._lock:
+            self._pending[name] += delta
+            due = self.store is not None and time.monotonic() - self._last_flush >= self.flush_interval
+        
+        if due:
+            self.flush()
+    
+    def flush(self):
+        if self.store is None:
+            return
+        
+        with self._lock:
+            pending = {name: value for name, value in self._pending.items() if value}
+            for name in pending:
+                self._pending[name] = 0
+            self._last_flush = time.monotonic()
+        
+        for name, delta in pending.items():
+            self.store.incr(self._key(name), delta, retry=True)
+    
+    def snapshot(self) -> Dict[str, Number]:
+        if self.store is None:
+            with self._lock:
+                return dict(self._pending)
+        
+        self.flush()
+        return {name: self.store.get(self._key(name), 0) for name in self.names}
+    
+    def reset(self):
+        with self._lock:
+            for name in self.names:
+                self._pending[name] = 0
+        
+        if self.store is not None:
+            for name in self.names:
+                self.store.delete(self._key(name), retry=True)
@@ -4,6 +4,7 @@ import argparse
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 from pathlib import Path
 
 # Adiciona src ao path
@@ -40,98 +41,180 @@ def extract_single(args):
     print(json.dumps(output, ensure_ascii=False, indent=2))
 
 
-def extract_batch(args):
-    if not os.path.exists(args.dataset):
-        print(f"Erro: Dataset não encontrado: {args.dataset}", file=sys.stderr)
-        sys.exit(1)
-    
-    with open(args.dataset, 'r', encoding='utf-8') as f:
-        dataset = json.load(f)
-    
-    if not isinstance(dataset, list):
-        print("Erro: Dataset deve ser uma lista JSON", file=sys.stderr)
-        sys.exit(1)
-    
-    requests = []
+def iter_dataset_items(dataset, pdf_dir):
     for idx, item in enumerate(dataset, 1):
         if not all(k in item for k in ['label', 'extraction_schema', 'pdf_path']):
             print(f"Aviso: Item {idx} está incompleto, pulando...", file=sys.stderr)
             continue
         
         pdf_path = item['pdf_path']
-        if args.pdf_dir:
-            pdf_path = os.path.join(args.pdf_dir, pdf_path)
+        if pdf_dir:
+            pdf_path = os.path.join(pdf_dir, pdf_path)
         
         if not os.path.exists(pdf_path):
             print(f"Aviso: PDF não encontrado: {pdf_path}, pulando...", file=sys.stderr)
             continue
         
-        with open(pdf_path, 'rb') as f:
-            pdf_content = f.read()
-        
-        requests.append({
-            "pdf_content": pdf_content,
+        yield {
+            "index": idx,
             "label": item['label'],
             "schema": item['extraction_schema'],
             "pdf_path": pdf_path,
-        })
-    
-    if not requests:
-        print("Erro: Nenhum item válido no dataset", file=sys.stderr)
-        sys.exit(1)
-    
-    print(f"Processando {len(requests)} documentos...", file=sys.stderr)
+        }
+
+
+def load_completed_items(output_path):
+    completed = set()
+    if not output_path or not os.path.exists(output_path):
+        return completed
     
-    pipeline = ExtractionPipeline()
-    results = []
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in entry:
+                completed.add((entry.get("index"), entry.get("pdf_path")))
     
-    for idx, req in enumerate(requests, 1):
-        if args.verbose:
-            print(f"[{idx}/{len(requests)}] Processando {os.path.basename(req['pdf_path'])}...", file=sys.stderr)
+    return completed
+
+
+def process_dataset_item(pipeline, item, batch_llm=False):
+    try:
+        with open(item["pdf_path"], 'rb') as f:
+            pdf_content = f.read()
         
         result, metadata = pipeline.extract(
-            pdf_content=req["pdf_content"],
-            label=req["label"],
-            schema=req["schema"]
+            pdf_content=pdf_content,
+            label=item["label"],
+            schema=item["schema"],
+            batch_llm=batch_llm
         )
         
-        results.append({
-            "pdf_path": req["pdf_path"],
-            "label": req["label"],
+        return {
+            "index": item["index"],
+            "pdf_path": item["pdf_path"],
+            "label": item["label"],
             "data": result,
             "metadata": metadata
-        })
-        
-        if args.verbose:
-            method = metadata.get("method", "unknown")
-            time = metadata.get("processing_time", 0)
-            print(f"  ✓ Método: {method}, Tempo: {time:.3f}s", file=sys.stderr)
+        }
+    except Exception as e:
+        return {
+            "index": item["index"],
+            "pdf_path": item["pdf_path"],
+            "label": item["label"],
+            "error": str(e)
+        }
+
+
+def open_output(output_path, resume):
+    if not output_path:
+        return sys.stdout
     
-    output = {
-        "results": results,
-        "total_processed": len(results)
-    }
+    if resume and os.path.exists(output_path):
+        f = open(output_path, 'a+', encoding='utf-8')
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+        return f
+    
+    return open(output_path, 'w', encoding='utf-8')
+
+
+def extract_batch(args):
+    if not os.path.exists(args.dataset):
+        print(f"Erro: Dataset não encontrado: {args.dataset}", file=sys.stderr)
+        sys.exit(1)
+    
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+    
+    if not isinstance(dataset, list):
+        print("Erro: Dataset deve ser uma lista JSON", file=sys.stderr)
+        sys.exit(1)
+    
+    completed = load_completed_items(args.output) if args.resume else set()
+    if completed:
+        print(f"Retomando: {len(completed)} itens já processados serão pulados", file=sys.stderr)
+    
+    items = (
+        item for item in iter_dataset_items(dataset, args.pdf_dir)
+        if (item["index"], item["pdf_path"]) not in completed
+    )
+    
+    workers = max(1, args.workers)
+    parser_pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Contadores locais: --stats reporta apenas esta execução, não o total acumulado no cache
+    pipeline = ExtractionPipeline(parser_pool=parser_pool, shared_stats=False)
+    
+    print(f"Processando {len(dataset)} itens do dataset com {workers} worker(s)...", file=sys.stderr)
+    
+    output = open_output(args.output, args.resume)
+    processed = 0
+    failed = 0
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            
+            def drain(return_when):
+                nonlocal processed, failed
+                done, not_done = wait(in_flight, return_when=return_when)
+                for future in done:
+                    entry = future.result()
+                    output.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    output.flush()
+                    processed += 1
+                    
+                    if "error" in entry:
+                        failed += 1
+                        print(f"  ✗ [{entry['index']}] {os.path.basename(entry['pdf_path'])}: {entry['error']}", file=sys.stderr)
+                    elif args.verbose:
+                        method = entry["metadata"].get("method", "unknown")
+                        time = entry["metadata"].get("processing_time", 0)
+                        print(f"  ✓ [{entry['index']}] {os.path.basename(entry['pdf_path'])} Método: {method}, Tempo: {time:.3f}s", file=sys.stderr)
+                return not_done
+            
+            for item in items:
+                if args.verbose:
+                    print(f"[{item['index']}/{len(dataset)}] Processando {os.path.basename(item['pdf_path'])}...", file=sys.stderr)
+                
+                in_flight.add(pool.submit(process_dataset_item, pipeline, item, workers > 1))
+                if len(in_flight) >= workers * 2:
+                    in_flight = drain(FIRST_COMPLETED)
+            
+            if in_flight:
+                drain(ALL_COMPLETED)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if parser_pool is not None:
+            parser_pool.shutdown()
+    
+    print(f"\nProcessados: {processed}, falhas: {failed}", file=sys.stderr)
     
     if args.stats:
-        output["statistics"] = pipeline.get_stats()
+        stats = pipeline.get_stats()
         
         if args.verbose:
             print("\n" + "="*70, file=sys.stderr)
             print("ESTATÍSTICAS", file=sys.stderr)
             print("="*70, file=sys.stderr)
-            stats = pipeline.get_stats()
             print(f"Total extrações: {stats['extractions']['total']}", file=sys.stderr)
             print(f"Cache hits: {stats['extractions']['cache_hits']}", file=sys.stderr)
             print(f"Heurística apenas: {stats['extractions']['heuristic_only']}", file=sys.stderr)
             print(f"Híbrido (heur+LLM): {stats['extractions']['hybrid']}", file=sys.stderr)
             print(f"Tempo médio: {stats['performance']['avg_time']}s", file=sys.stderr)
+            for stage, summary in stats['latency']['stages'].items():
+                if summary['count']:
+                    print(f"  {stage}: p50 {summary['p50']:.3f}s, p95 {summary['p95']:.3f}s, p99 {summary['p99']:.3f}s", file=sys.stderr)
+        else:
+            print(json.dumps({"statistics": stats}, ensure_ascii=False, indent=2), file=sys.stderr)
     
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
         print(f"\nResultados salvos em: {args.output}", file=sys.stderr)
-    else:
-        print(json.dumps(output, ensure_ascii=False, indent=2))
 
 
 def main():
@@ -151,7 +234,9 @@ def main():
     batch_parser = subparsers.add_parser('batch', help='Processar lote de PDFs')
     batch_parser.add_argument('--dataset', required=True, help='Arquivo dataset.json')
     batch_parser.add_argument('--pdf-dir', help='Diretório base dos PDFs (opcional)')
-    batch_parser.add_argument('--output', '-o', help='Arquivo de saída (opcional)')
+    batch_parser.add_argument('--output', '-o', help='Arquivo de saída JSONL (opcional)')
+    batch_parser.add_argument('--workers', '-w', type=int, default=1, help='Número de documentos processados em paralelo')
+    batch_parser.add_argument('--resume', action='store_true', help='Pula itens já presentes no arquivo de saída')
     batch_parser.add_argument('--stats', action='store_true', help='Incluir estatísticas')
     batch_parser.add_argument('--verbose', '-v', action='store_true', help='Modo verbose')
     batch_parser.add_argument('--pretty', action='store_true', help='Output JSON formatado')
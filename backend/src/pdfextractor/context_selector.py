@@ -0,0 +1,112 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set
+
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = {
+    "a", "ao", "aos", "as", "com", "da", "das", "de", "do", "dos", "e", "em",
+    "na", "nas", "no", "nos", "o", "os", "ou", "para", "pela", "pelo", "por",
+    "qual", "que", "se", "um", "uma", "the", "of", "and", "or",
+    "normalmente", "geralmente", "pode", "ser", "campo", "valor", "numero",
+    "canto", "superior", "inferior", "esquerdo", "direito", "imagem", "documento",
+}
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", normalize(text))
+
+
+class ContextSelector:
+    
+    def __init__(self, tokens_per_field: int, max_tokens: int, window_lines: int = 1):
+        self.tokens_per_field = tokens_per_field
+        self.max_tokens = max_tokens
+        self.window_lines = window_lines
+    
+    def budget_chars(self, schema: Dict[str, str]) -> int:
+        tokens = min(self.max_tokens, self.tokens_per_field * max(len(schema), 1))
+        return tokens * CHARS_PER_TOKEN
+    
+    def select(
+        self,
+        text: str,
+        schema: Dict[str, str],
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        budget = self.budget_chars(schema)
+        if len(text) <= budget:
+            return text
+        
+        lines = text.split("\n")
+        keywords = self._keywords(schema)
+        anchors = self._anchors(context)
+        
+        scores = [self._score(line, keywords, anchors) for line in lines]
+        ranked = sorted(
+            (idx for idx, score in enumerate(scores) if score > 0),
+            key=lambda idx: (-scores[idx], idx)
+        )
+        
+        selected: Set[int] = set()
+        used = 0
+        for idx in ranked:
+            for radius in range(self.window_lines, -1, -1):
+                window = range(max(idx - radius, 0), min(idx + radius + 1, len(lines)))
+                added = [i for i in window if i not in selected]
+                cost = sum(len(lines[i]) + 1 for i in added)
+                if used + cost <= budget:
+                    selected.update(added)
+                    used += cost
+                    break
+        
+        if not selected:
+            return lines[ranked[0]][:budget] if ranked else text[:budget]
+        
+        chunks = []
+        previous = None
+        for idx in sorted(selected):
+            if previous is not None and idx != previous + 1:
+                chunks.append("[...]")
+            chunks.append(lines[idx])
+            previous = idx
+        
+        return "\n".join(chunks)
+    
+    def _keywords(self, schema: Dict[str, str]) -> Dict[str, float]:
+        keywords: Dict[str, float] = {}
+        for field, description in schema.items():
+            for token in tokenize(field.replace("_", " ")):
+                if len(token) >= 3 and token not in STOPWORDS:
+                    keywords[token] = 2.0
+            for token in tokenize(description or ""):
+                if len(token) >= 4 and token not in STOPWORDS:
+                    keywords.setdefault(token, 1.0)
+        return keywords
+    
+    def _anchors(self, context: Optional[Dict[str, Any]]) -> List[str]:
+        if not context:
+            return []
+        return [
+            normalize(str(value)) for value in context.values()
+            if value is not None and len(str(value)) >= 2
+        ]
+    
+    def _score(self, line: str, keywords: Dict[str, float], anchors: List[str]) -> float:
+        normalized = normalize(line)
+        score = 0.0
+        for token in set(tokenize(line)):
+            for keyword, weight in keywords.items():
+                if token == keyword or (len(keyword) >= 5 and token.startswith(keyword[:5])):
+                    score += weight
+                    break
+        
+        if any(anchor in normalized for anchor in anchors):
+            score += 0.5
+        
+        return score
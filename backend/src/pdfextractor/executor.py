@@ -0,0 +1,101 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import MetricsRegistry
+from .settings import ExecutionSettings
+
+
+class QueueFullError(Exception):
+    
+    def __init__(self, retry_after: int):
+        super().__init__("Extraction queue is full")
+        self.retry_after = retry_after
+
+
+class ExtractionExecutor:
+    
+    def __init__(self, execution_settings: ExecutionSettings):
+        self.settings = execution_settings
+        self.capacity = execution_settings.thread_workers + execution_settings.max_queue_size
+        
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=execution_settings.thread_workers,
+            thread_name_prefix="extraction"
+        )
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        if execution_settings.process_workers > 0:
+            self.process_pool = ProcessPoolExecutor(max_workers=execution_settings.process_workers)
+        
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+        }
+    
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.stats["rejected"] += 1
+                raise QueueFullError(self.settings.retry_after_seconds)
+            self._pending += 1
+            self.stats["submitted"] += 1
+    
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            self.stats["completed"] += 1
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        self._acquire()
+        try:
+            future = self.thread_pool.submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+    
+    def register_metrics(self, metrics: MetricsRegistry):
+        metrics.gauge(
+            "executor_active", "Extractions running on the worker threads",
+            collect=lambda: {(): self.get_stats()["active"]}
+        )
+        metrics.gauge(
+            "queue_depth", "Extractions waiting for a worker thread",
+            collect=lambda: {(): self.get_stats()["queued"]}
+        )
+        metrics.gauge(
+            "queue_capacity", "Maximum running plus queued extractions",
+            collect=lambda: {(): self.capacity}
+        )
+        metrics.counter(
+            "queue_rejections_total", "Requests rejected because the queue was full",
+            collect=lambda: {(): self.get_stats()["rejected"]}
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+        
+        return {
+            "worker_pid": os.getpid(),
+            "pending": pending,
+            "active": min(pending, self.settings.thread_workers),
+            "queued": max(0, pending - self.settings.thread_workers),
+            "capacity": self.capacity,
+            "submitted": self.stats["submitted"],
+            "rejected": self.stats["rejected"],
+            "completed": self.stats["completed"],
+        }
+    
+    def shutdown(self):
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
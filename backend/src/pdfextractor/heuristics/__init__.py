@@ -1,3 +1,9 @@
 from .registry import HeuristicExtractor as Heuristics
+from .registry import ExtractorRegistry, registry
+from .base import Anchor, FieldRule, LabelExtractor
+from .calibration import ConfidenceCalibrator
+from .templates import LayoutTemplate
+from .spatial import SpatialIndex
+from .tables import TableReader
 
-__all__ = ["Heuristics", "HeuristicExtractor"]
+__all__ = ["Heuristics", "HeuristicExtractor", "ExtractorRegistry", "registry", "Anchor", "FieldRule", "LabelExtractor", "LayoutTemplate", "TableReader", "SpatialIndex", "ConfidenceCalibrator"]
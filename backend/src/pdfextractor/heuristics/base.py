@@ -0,0 +1,108 @@
+import re
+from typing import Any, Callable, Dict, List, Match, Optional, Pattern, Sequence, Tuple, Union
+
+PATTERNS = {
+    'cpf': r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
+    'cnpj': r'\b\d{2}\.?\d{3}\.?\d{3}/?0001-?\d{2}\b',
+    'telefone': r'\(?\d{2}\)?\s?\d{4,5}-?\d{4}',
+    'cep': r'\b\d{5}-?\d{3}\b',
+    'email': r'[\w\.-]+@[\w\.-]+\.\w+',
+    'data': r'\b\d{2}/\d{2}/\d{4}\b',
+    'inscricao': r'\b\d{5,8}\b',
+    'numero': r'\b\d+\b',
+}
+
+COMPILED_PATTERNS = {name: re.compile(pattern) for name, pattern in PATTERNS.items()}
+
+
+class Anchor:
+    
+    def __init__(self, phrase: str, direction: str = "right", value: Optional[Union[str, Pattern]] = None):
+        self.phrase = phrase
+        self.direction = direction
+        self.value = re.compile(value) if isinstance(value, str) else value
+    
+    def read(self, index) -> Optional[str]:
+        for box in index.find(self.phrase):
+            words = index.below(box) if self.direction == "below" else index.right_of(box)
+            text = " ".join(w["text"] for w in words)
+            if not text:
+                continue
+            if self.value is None:
+                return text
+            match = self.value.search(text)
+            if match:
+                return match.group(1 if self.value.groups else 0)
+        return None
+
+
+class FieldRule:
+    
+    def __init__(
+        self,
+        name: str,
+        matches: Callable[[str], bool],
+        confidence: float,
+        patterns: Sequence[Union[str, Pattern]] = (),
+        group: int = 1,
+        transform: Optional[Callable[[str], Any]] = None,
+        hints: Sequence[str] = (),
+        anchors: Sequence[Anchor] = (),
+        anchor_confidence: float = 0.95
+    ):
+        self.name = name
+        self.matches = matches
+        self.confidence = confidence
+        self.patterns: List[Pattern] = [re.compile(p) if isinstance(p, str) else p for p in patterns]
+        self.group = group
+        self.transform = transform
+        self.hints = tuple(hints)
+        self.anchors = tuple(anchors)
+        self.anchor_confidence = anchor_confidence
+    
+    def apply(
+        self,
+        search: Callable[[Pattern], Optional[Match]],
+        lowered: str,
+        index=None
+    ) -> Optional[Tuple[Any, float]]:
+        if self.hints and not any(hint in lowered for hint in self.hints):
+            return None
+        
+        if index is not None:
+            for anchor in self.anchors:
+                value = anchor.read(index)
+                if value:
+                    if self.transform is not None:
+                        value = self.transform(value)
+                    return value, self.anchor_confidence
+        
+        for pattern in self.patterns:
+            match = search(pattern)
+            if match:
+                value = match.group(self.group)
+                if self.transform is not None:
+                    value = self.transform(value)
+                return value, self.confidence
+        return None
+
+
+class LabelExtractor:
+    
+    RULES: List[FieldRule] = []
+    READS_TABLES = False
+    
+    def rule_for(self, field_name: str) -> Optional[FieldRule]:
+        field_lower = field_name.lower()
+        for rule in self.RULES:
+            if rule.matches(field_lower):
+                return rule
+        return None
+    
+    def capabilities(self, schema: Dict[str, str]) -> Dict[str, float]:
+        capabilities = {}
+        for field_name in schema:
+            rule = self.rule_for(field_name)
+            if rule is not None:
+                capabilities[field_name] = rule.confidence
+        return capabilities
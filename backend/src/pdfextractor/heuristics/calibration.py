@@ -0,0 +1,137 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from diskcache import Cache
+from ..settings import settings
+from .templates import normalize
+
+MIN_THRESHOLD = 0.5
+MAX_THRESHOLD = 1.01
+MAX_CACHED_FIELDS = 4096
+
+
+def agrees(heuristic_value: Any, llm_value: Any) -> bool:
+    if heuristic_value is None or llm_value is None:
+        return heuristic_value is None and llm_value is None
+    return normalize(heuristic_value) == normalize(llm_value)
+
+
+class ConfidenceCalibrator:
+    
+    def __init__(
+        self,
+        store: Optional[Cache] = None,
+        base_threshold: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        target_agreement: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+        max_cached_fields: int = MAX_CACHED_FIELDS
+    ):
+        self.store = store
+        self.base_threshold = settings.heuristics.confidence_threshold if base_threshold is None else base_threshold
+        self.min_samples = settings.heuristics.calibration_min_samples if min_samples is None else min_samples
+        self.target_agreement = (
+            settings.heuristics.calibration_target_agreement if target_agreement is None else target_agreement
+        )
+        self.sample_rate = settings.heuristics.calibration_sample_rate if sample_rate is None else sample_rate
+        
+        self.max_cached_fields = max_cached_fields
+        
+        self._counts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _key(self, label: str, field_name: str, name: str) -> str:
+        return f"calibration:{label}:{field_name}:{name}"
+    
+    def _load(self, label: str, field_name: str) -> List[int]:
+        key = (label, field_name)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is not None:
+                self._counts.move_to_end(key)
+                return counts
+        
+        if self.store is not None:
+            counts = self._stored(label, field_name)
+        else:
+            counts = [0, 0]
+        
+        with self._lock:
+            counts = self._counts.setdefault(key, counts)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_cached_fields:
+                self._counts.popitem(last=False)
+        return counts
+    
+    def _stored(self, label: str, field_name: str) -> List[int]:
+        return [
+            self.store.get(self._key(label, field_name, "agree"), 0),
+            self.store.get(self._key(label, field_name, "total"), 0),
+        ]
+    
+    def _threshold(self, agree: int, total: int) -> float:
+        if total < self.min_samples:
+            return self.base_threshold
+        
+        rate = agree / total
+        return min(max(self.base_threshold + self.target_agreement - rate, MIN_THRESHOLD), MAX_THRESHOLD)
+    
+    def threshold(self, label: str, field_name: str) -> float:
+        return self._threshold(*self._load(label, field_name))
+    
+    def record(self, label: str, field_name: str, heuristic_value: Any, llm_value: Any):
+        agreed = int(agrees(heuristic_value, llm_value))
+        counts = self._load(label, field_name)
+        
+        if self.store is not None:
+            agree = self.store.incr(self._key(label, field_name, "agree"), agreed, retry=True)
+            total = self.store.incr(self._key(label, field_name, "total"), 1, retry=True)
+            with self._lock:
+                counts[0], counts[1] = agree, total
+        else:
+            with self._lock:
+                counts[0] += agreed
+                counts[1] += 1
+    
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if self.store is not None:
+            counts: Dict[Tuple[str, str], List[int]] = {}
+            for key in list(self.store.iterkeys()):
+                if isinstance(key, str) and key.startswith("calibration:") and key.endswith(":total"):
+                    prefix, field_name, _ = key.rsplit(":", 2)
+                    label = prefix[len("calibration:"):]
+                    counts[(label, field_name)] = self._stored(label, field_name)
+            
+            with self._lock:
+                for key, stored in counts.items():
+                    cached = self._counts.get(key)
+                    if cached is not None:
+                        cached[0], cached[1] = stored
+        else:
+            with self._lock:
+                counts = {key: list(value) for key, value in self._counts.items()}
+        
+        snapshot: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (label, field_name), (agree, total) in sorted(counts.items()):
+            if not total:
+                continue
+            snapshot.setdefault(label, {})[field_name] = {
+                "agree": agree,
+                "total": total,
+                "agreement": round(agree / total, 3),
+                "threshold": round(self._threshold(agree, total), 3),
+            }
+        return snapshot
+    
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+        
+        if self.store is not None:
+            for key in list(self.store.iterkeys()):
+                if isinstance(key, str) and key.startswith("calibration:"):
+                    self.store.delete(key, retry=True)
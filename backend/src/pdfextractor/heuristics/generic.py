@@ -0,0 +1,18 @@
+from typing import Optional
+from .base import COMPILED_PATTERNS, FieldRule, LabelExtractor
+
+
+class GenericExtractor(LabelExtractor):
+    
+    def rule_for(self, field_name: str) -> Optional[FieldRule]:
+        field_lower = field_name.lower()
+        names = [name for name in COMPILED_PATTERNS if name in field_lower]
+        if not names:
+            return None
+        return FieldRule(
+            names[0],
+            lambda field: True,
+            0.7,
+            [COMPILED_PATTERNS[name] for name in names],
+            group=0
+        )
@@ -0,0 +1,45 @@
+import re
+from .base import COMPILED_PATTERNS, Anchor, FieldRule, LabelExtractor
+
+UF_PATTERN = r'\b(AC|AL|AP|AM|BA|CE|DF|ES|GO|MA|MT|MS|MG|PA|PB|PR|PE|PI|RJ|RN|RS|RO|RR|SC|SP|SE|TO)\b'
+
+
+class OABExtractor(LabelExtractor):
+    
+    RULES = [
+        FieldRule(
+            "nome", lambda field: 'nome' in field, 0.9,
+            [r'\b([A-ZÀ-Ú]+(?:[\s\'][A-ZÀ-Ú]+){1,4})\b'], transform=str.strip
+        ),
+        FieldRule(
+            "inscricao", lambda field: 'inscri' in field, 0.95, [r'\b(\d{6})\b'],
+            anchors=[Anchor("inscrição", "below", r'\b(\d{6})\b')]
+        ),
+        FieldRule(
+            "seccional", lambda field: 'seccional' in field, 0.9, [UF_PATTERN],
+            anchors=[Anchor("seccional", "below", UF_PATTERN)]
+        ),
+        FieldRule(
+            "subsecao", lambda field: 'subsec' in field or 'subseç' in field, 0.85,
+            [re.compile(r'Conselho Seccional[\s\-]+(.+?)(?=\n|$)', re.IGNORECASE)], transform=str.strip,
+            hints=("conselho seccional",)
+        ),
+        FieldRule(
+            "categoria", lambda field: 'categoria' in field, 0.9,
+            [re.compile(r'\b(ADVOGAD[OA]|SUPLEMENTAR|ESTAGIÁRI[OA])\b', re.IGNORECASE)],
+            hints=("advogad", "suplementar", "estagi")
+        ),
+        FieldRule("telefone", lambda field: 'telefone' in field, 0.85, [COMPILED_PATTERNS['telefone']], group=0),
+        FieldRule(
+            "situacao", lambda field: 'situa' in field, 0.9,
+            [re.compile(r'Situação\s+(\w+)', re.IGNORECASE)],
+            hints=("situação",),
+            anchors=[Anchor("situação", "right", r'(\w+)')]
+        ),
+        FieldRule(
+            "endereco", lambda field: 'endereco' in field or 'endereço' in field, 0.8,
+            [re.compile(r'Endereço.+?\n(.+?\n.+?\n.+?)\n', re.IGNORECASE | re.DOTALL)],
+            transform=lambda value: value.strip().replace('\n', ', '),
+            hints=("endereço",)
+        ),
+    ]
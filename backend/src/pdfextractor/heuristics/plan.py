@@ -0,0 +1,40 @@
+from typing import Any, Dict, Match, Optional, Pattern, Tuple
+from ..pdf_parser import ParsedPage
+from .base import FieldRule
+from .spatial import index_for
+
+
+class ExtractionPlan:
+    
+    def __init__(self, rules: Dict[str, Optional[FieldRule]], reads_tables: bool = False):
+        self.rules = rules
+        self.reads_tables = reads_tables
+        self.capabilities = {
+            field_name: rule.confidence
+            for field_name, rule in rules.items() if rule is not None
+        }
+        self.uses_hints = any(rule.hints for rule in rules.values() if rule is not None)
+        self.uses_anchors = any(rule.anchors for rule in rules.values() if rule is not None)
+    
+    def execute(self, page: ParsedPage) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        text = page.text or ""
+        searched: Dict[Pattern, Optional[Match]] = {}
+        lowered = text.lower() if self.uses_hints else ""
+        index = index_for(page) if self.uses_anchors and page.words else None
+        
+        def search(pattern: Pattern) -> Optional[Match]:
+            if pattern not in searched:
+                searched[pattern] = pattern.search(text)
+            return searched[pattern]
+        
+        results = {}
+        confidence = {}
+        for field_name, rule in self.rules.items():
+            answer = rule.apply(search, lowered, index) if rule else None
+            if answer is None:
+                results[field_name] = None
+                confidence[field_name] = 0.0
+            else:
+                results[field_name], confidence[field_name] = answer
+        
+        return results, confidence
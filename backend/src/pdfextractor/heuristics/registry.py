@@ -1,234 +1,187 @@
+import importlib
 import re
-from typing import Dict, Any, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Pattern, Tuple
+from ..pdf_parser import ParsedDocument
+from ..settings import settings
+from .base import LabelExtractor
+from .calibration import ConfidenceCalibrator
+from .plan import ExtractionPlan
+from .tables import TableReader
+from .templates import LayoutTemplate
 
 
-class HeuristicExtractor:
+class ExtractorRegistry:
     
-    PATTERNS = {
-        'cpf': r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
-        'cnpj': r'\b\d{2}\.?\d{3}\.?\d{3}/?0001-?\d{2}\b',
-        'telefone': r'\(?\d{2}\)?\s?\d{4,5}-?\d{4}',
-        'cep': r'\b\d{5}-?\d{3}\b',
-        'email': r'[\w\.-]+@[\w\.-]+\.\w+',
-        'data': r'\b\d{2}/\d{2}/\d{4}\b',
-        'inscricao': r'\b\d{5,8}\b',
-        'numero': r'\b\d+\b',
-    }
+    def __init__(self, fallback: str = ".generic:GenericExtractor"):
+        self.fallback = fallback
+        self._specs: List[Tuple[Pattern, str]] = []
+        self._loaded: Dict[str, LabelExtractor] = {}
+        self._lock = threading.Lock()
     
-    def extract_fields(
-        self,
-        text: str,
-        schema: Dict[str, str],
-        label: str
-    ) -> Tuple[Dict[str, Any], Dict[str, float], bool]:
-        results = {}
-        confidence = {}
+    def register(self, pattern: str, target: str):
+        with self._lock:
+            self._specs.append((re.compile(pattern, re.IGNORECASE), target))
+    
+    def for_label(self, label: str) -> LabelExtractor:
+        target = next(
+            (target for pattern, target in self._specs if pattern.search(label)),
+            self.fallback
+        )
         
-        if 'oab' in label.lower():
-            results, confidence = self._extract_oab(text, schema)
-        elif 'sistema' in label.lower():
-            results, confidence = self._extract_sistema(text, schema)
-        else:
-            results, confidence = self._extract_generic(text, schema)
+        extractor = self._loaded.get(target)
+        if extractor is not None:
+            return extractor
         
-        needs_llm = any(
-            results.get(field) is None or confidence.get(field, 0) < 0.75
-            for field in schema.keys()
-        )
+        with self._lock:
+            extractor = self._loaded.get(target)
+            if extractor is None:
+                extractor = self._load(target)
+                self._loaded[target] = extractor
         
-        return results, confidence, needs_llm
+        return extractor
     
-    def _extract_oab(
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+    
+    @staticmethod
+    def _load(target: str) -> LabelExtractor:
+        module_name, class_name = target.split(":")
+        module = importlib.import_module(module_name, package=__package__)
+        return getattr(module, class_name)()
+
+
+registry = ExtractorRegistry()
+registry.register(r"oab", ".oab:OABExtractor")
+registry.register(r"sistema", ".sistema:SistemaExtractor")
+
+
+class HeuristicExtractor:
+    
+    def __init__(
         self,
-        text: str,
-        schema: Dict[str, str]
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        results = {}
-        confidence = {}
+        extractor_registry: Optional[ExtractorRegistry] = None,
+        plan_cache_size: Optional[int] = None,
+        tables_enabled: Optional[bool] = None,
+        calibrator: Optional[ConfidenceCalibrator] = None
+    ):
+        self.registry = extractor_registry or registry
+        self.calibrator = calibrator
+        self.plan_cache_size = plan_cache_size or settings.heuristics.plan_cache_size
+        self.tables = TableReader() if (
+            settings.heuristics.tables_enabled if tables_enabled is None else tables_enabled
+        ) else None
+        self._plans: OrderedDict = OrderedDict()
+        self._plans_lock = threading.Lock()
+    
+    def threshold(self, label: str, field_name: str) -> float:
+        if self.calibrator is None:
+            return settings.heuristics.confidence_threshold
+        return self.calibrator.threshold(label, field_name)
+    
+    def plan_for(self, schema: Dict[str, str], label: str) -> ExtractionPlan:
+        key = (label, tuple(schema))
         
-        for field_name in schema.keys():
-            field_lower = field_name.lower()
-            
-            if 'nome' in field_lower:
-                match = re.search(r'\b([A-ZÀ-Ú]+(?:[\s\'][A-ZÀ-Ú]+){1,4})\b', text)
-                if match:
-                    results[field_name] = match.group(1).strip()
-                    confidence[field_name] = 0.9
-            
-            elif 'inscri' in field_lower:
-                match = re.search(r'\b(\d{6})\b', text)
-                if match:
-                    results[field_name] = match.group(1)
-                    confidence[field_name] = 0.95
-            
-            elif 'seccional' in field_lower:
-                match = re.search(r'\b(AC|AL|AP|AM|BA|CE|DF|ES|GO|MA|MT|MS|MG|PA|PB|PR|PE|PI|RJ|RN|RS|RO|RR|SC|SP|SE|TO)\b', text)
-                if match:
-                    results[field_name] = match.group(1)
-                    confidence[field_name] = 0.9
-            
-            elif 'subsec' in field_lower or 'subseç' in field_lower:
-                match = re.search(r'Conselho Seccional[\s\-]+(.+?)(?=\n|$)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1).strip()
-                    confidence[field_name] = 0.85
-            
-            elif 'categoria' in field_lower:
-                match = re.search(r'\b(ADVOGAD[OA]|SUPLEMENTAR|ESTAGIÁRI[OA])\b', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1)
-                    confidence[field_name] = 0.9
-            
-            elif 'telefone' in field_lower:
-                match = re.search(self.PATTERNS['telefone'], text)
-                if match:
-                    results[field_name] = match.group(0)
-                    confidence[field_name] = 0.85
-            
-            elif 'situa' in field_lower:
-                match = re.search(r'Situação\s+(\w+)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1)
-                    confidence[field_name] = 0.9
-            
-            elif 'endereco' in field_lower or 'endereço' in field_lower:
-                match = re.search(r'Endereço.+?\n(.+?\n.+?\n.+?)\n', text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    results[field_name] = match.group(1).strip().replace('\n', ', ')
-                    confidence[field_name] = 0.8
-            
-            if field_name not in results:
-                results[field_name] = None
-                confidence[field_name] = 0.0
+        with self._plans_lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
         
-        return results, confidence
-    
-    def _extract_sistema(
-        self,
-        text: str,
-        schema: Dict[str, str]
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        results = {}
-        confidence = {}
+        extractor = self.registry.for_label(label)
+        plan = ExtractionPlan(
+            {field_name: extractor.rule_for(field_name) for field_name in schema},
+            reads_tables=extractor.READS_TABLES and self.tables is not None
+        )
         
-        for field_name in schema.keys():
-            field_lower = field_name.lower()
-            
-            if 'sistema' in field_lower and 'tipo' not in field_lower:
-                patterns = [
-                    r'\b(CONSIGNADO|CREDITO|FINANCIAMENTO|EMPRESTIMO)\b',
-                    r'Sistema[:\s]+([A-Z]{5,}?)(?=\s|$)',
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        results[field_name] = match.group(1).strip()
-                        confidence[field_name] = 0.85
-                        break
-            
-            elif 'tipo' in field_lower and 'sistema' in field_lower:
-                match = re.search(r'Tipo\s+(?:de\s+)?Sistema[:\s]+([A-Z\s]+)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1).strip()
-                    confidence[field_name] = 0.85
-            
-            elif 'produto' in field_lower:
-                patterns = [
-                    r'Produto[:\s]+([A-Z\s]+?)(?=\n|Sistema|Qtd)',
-                    r'(?:Produto|PRODUTO)[:\s]*([A-Z]{5,})',
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        results[field_name] = match.group(1).strip()
-                        confidence[field_name] = 0.85
-                        break
-            
-            elif 'cidade' in field_lower:
-                match = re.search(r'Cidade[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s[A-ZÀ-Ú][a-zà-ú]+)*)', text, re.IGNORECASE)
-                if match:
-                    results[field_name] = match.group(1).strip()
-                    confidence[field_name] = 0.9
-            
-            elif 'qtd' in field_lower or 'quantidade' in field_lower or 'parcela' in field_lower:
-                patterns = [
-                    r'(?:Qtd|Quantidade|Parcelas)[:\s]+(\d+)',
-                    r'(\d+)\s+parcelas?',
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        results[field_name] = match.group(1)
-                        confidence[field_name] = 0.95
-                        break
-            
-            elif 'venc' in field_lower or 'vcto' in field_lower or 'vern' in field_lower:
-                patterns = [
-                    r'(?:Vcto\s+mais\s+antigo)[^\d]*(\d{2}/\d{2}/\d{4})',
-                    r'(?:Vcto|Vencimento|venc)[^\d]{0,20}(\d{2}/\d{2}/\d{4})',
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        results[field_name] = match.group(1)
-                        confidence[field_name] = 0.95
-                        break
-            
-            elif 'data' in field_lower:
-                if 'base' in field_lower or 'ref' in field_lower:
-                    match = re.search(r'Data\s+(?:Referência|Base)[:\s]*(\d{2}/\d{2}/\d{4})', text, re.IGNORECASE)
-                    if match:
-                        results[field_name] = match.group(1)
-                        confidence[field_name] = 0.95
-                else:
-                    match = re.search(self.PATTERNS['data'], text)
-                    if match:
-                        results[field_name] = match.group(0)
-                        confidence[field_name] = 0.7
-            
-            elif 'valor' in field_lower or 'parc' in field_lower:
-                patterns = [
-                    r'(?:Vlr?\.?\s*Parc\.?|Valor|V/r)[:\s]*\n?\s*((?:\d{1,3}\.)*\d{1,3},\d{2})',
-                    r'R?\$\s*((?:\d{1,3}\.)*\d{1,3},\d{2})',
-                    r'\b((?:\d{1,3}\.)+\d{1,3},\d{2})\b',
-                    r'\b(\d{1,3},\d{2})\b',
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        valor_str = match.group(1)
-                        valor_normalizado = valor_str.replace('.', '').replace(',', '.')
-                        results[field_name] = valor_normalizado
-                        confidence[field_name] = 0.9
-                        break
-            
-            if field_name not in results:
-                results[field_name] = None
-                confidence[field_name] = 0.0
+        with self._plans_lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
         
-        return results, confidence
+        return plan
     
-    def _extract_generic(
+    def answerable_fields(
         self,
-        text: str,
-        schema: Dict[str, str]
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        results = {}
-        confidence = {}
+        schema: Dict[str, str],
+        label: str,
+        template: Optional[LayoutTemplate] = None
+    ) -> Dict[str, float]:
+        plan = self.plan_for(schema, label)
+        answerable = dict(plan.capabilities)
+        for field_name in schema:
+            if plan.reads_tables or (template is not None and field_name in template.fields):
+                answerable.setdefault(field_name, 0.9)
+        return answerable
+    
+    def extract_fields(
+        self,
+        document: ParsedDocument,
+        schema: Dict[str, str],
+        label: str,
+        template: Optional[LayoutTemplate] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float], bool]:
+        results = {field_name: None for field_name in schema}
+        confidence = {field_name: 0.0 for field_name in schema}
         
-        for field_name in schema.keys():
-            field_lower = field_name.lower()
-            
-            for pattern_name, pattern in self.PATTERNS.items():
-                if pattern_name in field_lower:
-                    match = re.search(pattern, text)
-                    if match:
-                        results[field_name] = match.group(0)
-                        confidence[field_name] = 0.7
-                        break
-            
-            if field_name not in results:
-                results[field_name] = None
-                confidence[field_name] = 0.0
+        pending = schema
+        for page in document.pages():
+            plan = self.plan_for(pending, label)
+            if plan.capabilities:
+                page_results, page_confidence = plan.execute(page)
+                self._merge(results, confidence, page_results, page_confidence)
+            
+            table_pending = self.pending_fields(pending, label, results, confidence) if plan.reads_tables else {}
+            if table_pending:
+                table_results, table_confidence = self.tables.extract(page, table_pending)
+                for field_name, value in table_results.items():
+                    rule = plan.rules.get(field_name)
+                    if rule is not None and rule.transform is not None:
+                        table_results[field_name] = rule.transform(value)
+                self._merge(results, confidence, table_results, table_confidence, replace_ties=True)
+            
+            if template is not None:
+                template_results, template_confidence = template.extract(page, pending)
+                self._merge(results, confidence, template_results, template_confidence)
+            
+            pending = self.pending_fields(schema, label, results, confidence)
+            if not pending:
+                break
+        
+        needs_llm = bool(self.pending_fields(schema, label, results, confidence))
         
-        return results, confidence
+        return results, confidence, needs_llm
+    
+    def pending_fields(
+        self,
+        schema: Dict[str, str],
+        label: str,
+        results: Dict[str, Any],
+        confidence: Dict[str, float]
+    ) -> Dict[str, str]:
+        return {
+            field_name: description for field_name, description in schema.items()
+            if results.get(field_name) is None
+            or confidence.get(field_name, 0) < self.threshold(label, field_name)
+        }
+    
+    def _merge(
+        self,
+        results: Dict[str, Any],
+        confidence: Dict[str, float],
+        found: Dict[str, Any],
+        found_confidence: Dict[str, float],
+        replace_ties: bool = False
+    ):
+        for field_name, value in found.items():
+            if value is None:
+                continue
+            current = confidence.get(field_name, 0)
+            if (
+                results.get(field_name) is None
+                or found_confidence[field_name] > current
+                or (replace_ties and found_confidence[field_name] == current)
+            ):
+                results[field_name] = value
+                confidence[field_name] = found_confidence[field_name]
@@ -0,0 +1,100 @@
+import re
+from .base import COMPILED_PATTERNS, Anchor, FieldRule, LabelExtractor
+
+DATE_PATTERN = r'(\d{2}/\d{2}/\d{4})'
+MONEY_PATTERN = r'((?:\d{1,3}\.)*\d{1,3},\d{2})'
+
+QUANTIDADE_PATTERNS = [
+    re.compile(r'(?:Qtd|Quantidade|Parcelas)[:\s]+(\d+)', re.IGNORECASE),
+    re.compile(r'(\d+)\s+parcelas?', re.IGNORECASE),
+]
+
+
+def normalize_valor(valor_str: str) -> str:
+    return valor_str.replace('.', '').replace(',', '.')
+
+
+class SistemaExtractor(LabelExtractor):
+    
+    READS_TABLES = True
+    
+    RULES = [
+        FieldRule(
+            "sistema", lambda field: 'sistema' in field and 'tipo' not in field, 0.85,
+            [
+                re.compile(r'\b(CONSIGNADO|CREDITO|FINANCIAMENTO|EMPRESTIMO)\b', re.IGNORECASE),
+                re.compile(r'Sistema[:\s]+([A-Z]{5,}?)(?=\s|$)', re.IGNORECASE),
+            ],
+            transform=str.strip,
+            hints=("consignado", "credito", "financiamento", "emprestimo", "sistema"),
+            anchors=[Anchor("sistema", "below", re.compile(r'\b(CONSIGNADO|CREDITO|FINANCIAMENTO|EMPRESTIMO)\b', re.IGNORECASE))]
+        ),
+        FieldRule(
+            "tipo_sistema", lambda field: 'tipo' in field and 'sistema' in field, 0.85,
+            [re.compile(r'Tipo\s+(?:de\s+)?Sistema[:\s]+([A-Z\s]+)', re.IGNORECASE)],
+            transform=str.strip,
+            hints=("sistema",)
+        ),
+        FieldRule(
+            "produto", lambda field: 'produto' in field, 0.85,
+            [
+                re.compile(r'Produto[:\s]+([A-Z\s]+?)(?=\n|Sistema|Qtd)', re.IGNORECASE),
+                re.compile(r'(?:Produto|PRODUTO)[:\s]*([A-Z]{5,})', re.IGNORECASE),
+            ],
+            transform=str.strip,
+            hints=("produto",),
+            anchors=[Anchor("produto", "below", r'\b([A-Z]{5,})\b')]
+        ),
+        FieldRule(
+            "cidade", lambda field: 'cidade' in field, 0.9,
+            [re.compile(r'Cidade[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s[A-ZÀ-Ú][a-zà-ú]+)*)', re.IGNORECASE)],
+            transform=str.strip,
+            hints=("cidade",),
+            anchors=[Anchor("cidade", "right", r'([A-ZÀ-Ú][a-zà-ú]+(?:\s[A-ZÀ-Ú][a-zà-ú]+)*)')]
+        ),
+        FieldRule(
+            "quantidade", lambda field: 'qtd' in field or 'quantidade' in field, 0.95,
+            QUANTIDADE_PATTERNS,
+            hints=("qtd", "quantidade", "parcela"),
+            anchors=[Anchor("qtd parcelas", "below", r'\b(\d+)\b')]
+        ),
+        FieldRule(
+            "parcela", lambda field: 'parcela' in field, 0.95,
+            QUANTIDADE_PATTERNS,
+            hints=("qtd", "quantidade", "parcela")
+        ),
+        FieldRule(
+            "vencimento", lambda field: 'venc' in field or 'vcto' in field or 'vern' in field, 0.95,
+            [
+                re.compile(r'(?:Vcto\s+mais\s+antigo)[^\d]*(\d{2}/\d{2}/\d{4})', re.IGNORECASE),
+                re.compile(r'(?:Vcto|Vencimento|venc)[^\d]{0,20}(\d{2}/\d{2}/\d{4})', re.IGNORECASE),
+            ],
+            hints=("vcto", "venc"),
+            anchors=[
+                Anchor("vcto mais antigo", "below", DATE_PATTERN),
+                Anchor("data vencimento", "below", DATE_PATTERN),
+            ]
+        ),
+        FieldRule(
+            "data_referencia", lambda field: 'data' in field and ('base' in field or 'ref' in field), 0.95,
+            [re.compile(r'Data\s+(?:Referência|Base)[:\s]*(\d{2}/\d{2}/\d{4})', re.IGNORECASE)],
+            hints=("referência", "base"),
+            anchors=[Anchor("data referência", "right", DATE_PATTERN)]
+        ),
+        FieldRule("data", lambda field: 'data' in field, 0.7, [COMPILED_PATTERNS['data']], group=0),
+        FieldRule(
+            "valor", lambda field: 'valor' in field or 'parc' in field, 0.9,
+            [
+                re.compile(r'(?:Vlr?\.?\s*Parc\.?|Valor|V/r)[:\s]*\n?\s*((?:\d{1,3}\.)*\d{1,3},\d{2})', re.IGNORECASE),
+                re.compile(r'R?\$\s*((?:\d{1,3}\.)*\d{1,3},\d{2})', re.IGNORECASE),
+                re.compile(r'\b((?:\d{1,3}\.)+\d{1,3},\d{2})\b', re.IGNORECASE),
+                re.compile(r'\b(\d{1,3},\d{2})\b', re.IGNORECASE),
+            ],
+            transform=normalize_valor,
+            hints=(",",),
+            anchors=[
+                Anchor("vlr parc", "below", MONEY_PATTERN),
+                Anchor("vir parc", "below", MONEY_PATTERN),
+            ]
+        ),
+    ]
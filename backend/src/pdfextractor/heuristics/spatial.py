@@ -0,0 +1,142 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from ..pdf_parser import ParsedPage
+from ..settings import settings
+from .templates import normalize as normalize_text
+
+Word = Dict[str, Any]
+BBox = Tuple[float, float, float, float]
+
+CELL_SIZE = 50
+WORD_GAP_RATIO = 0.6
+
+
+@lru_cache(maxsize=16384)
+def normalize(text: str) -> str:
+    return normalize_text(text)
+
+
+def center_y(box) -> float:
+    return (box[1] + box[3]) / 2
+
+
+def word_box(word: Word) -> BBox:
+    return word["x0"], word["y0"], word["x1"], word["y1"]
+
+
+class SpatialIndex:
+    
+    def __init__(self, words: List[Word], x_tolerance: float = 30, y_tolerance: float = 20, cell_size: int = CELL_SIZE):
+        self.words = words
+        self.x_tolerance = x_tolerance
+        self.y_tolerance = y_tolerance
+        self.cell_size = cell_size
+        self.right_edge = max((w["x1"] for w in words), default=0)
+        
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        self._by_text: Dict[str, List[int]] = {}
+        self._texts = [normalize(w["text"]) for w in words]
+        
+        size = self.cell_size
+        for idx, word in enumerate(words):
+            for cx in range(int(word["x0"] // size), int(word["x1"] // size) + 1):
+                for cy in range(int(word["y0"] // size), int(word["y1"] // size) + 1):
+                    self._grid.setdefault((cx, cy), []).append(idx)
+            if self._texts[idx]:
+                self._by_text.setdefault(self._texts[idx], []).append(idx)
+    
+    def _cells(self, box: BBox):
+        x0, y0, x1, y1 = (int(v // self.cell_size) for v in box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+    
+    def query(self, box: BBox) -> List[int]:
+        x0, y0, x1, y1 = box
+        found = set()
+        for cell in self._cells(box):
+            for idx in self._grid.get(cell, ()):
+                word = self.words[idx]
+                if word["x1"] >= x0 and word["x0"] <= x1 and word["y1"] >= y0 and word["y0"] <= y1:
+                    found.add(idx)
+        return sorted(found, key=lambda idx: (self.words[idx]["x0"], self.words[idx]["y0"]))
+    
+    def find(self, phrase: str) -> List[BBox]:
+        tokens = [normalize(part) for part in phrase.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+        
+        matches = []
+        for start in self._by_text.get(tokens[0], ()):
+            span = [start]
+            for token in tokens[1:]:
+                following = self._next_word(span[-1])
+                if following is None or self._texts[following] != token:
+                    break
+                span.append(following)
+            else:
+                boxes = [word_box(self.words[idx]) for idx in span]
+                matches.append((
+                    min(b[0] for b in boxes), min(b[1] for b in boxes),
+                    max(b[2] for b in boxes), max(b[3] for b in boxes),
+                ))
+        return matches
+    
+    def right_of(self, anchor: BBox, max_distance: Optional[float] = None) -> List[Word]:
+        height = anchor[3] - anchor[1]
+        band = min(self.y_tolerance, height) / 2
+        right = self.right_edge if max_distance is None else anchor[2] + max_distance
+        
+        cy = center_y(anchor)
+        candidates = [
+            idx for idx in self.query((anchor[2], cy - band, right, cy + band))
+            if self.words[idx]["x0"] >= anchor[2] - 1 and abs(center_y(word_box(self.words[idx])) - cy) <= band
+        ]
+        return self._run(candidates)
+    
+    def below(self, anchor: BBox, max_distance: Optional[float] = None) -> List[Word]:
+        bottom = anchor[3] + (2 * self.y_tolerance if max_distance is None else max_distance)
+        candidates = [
+            idx for idx in self.query((anchor[0] - self.x_tolerance, anchor[3], anchor[2] + self.x_tolerance, bottom))
+            if self.words[idx]["y0"] >= anchor[3] - 1
+        ]
+        if not candidates:
+            return []
+        
+        top = min(self.words[idx]["y0"] for idx in candidates)
+        height = min(self.words[idx]["y1"] - self.words[idx]["y0"] for idx in candidates)
+        row = [idx for idx in candidates if self.words[idx]["y0"] - top <= height / 2]
+        return self._run(row)
+    
+    def _next_word(self, idx: int) -> Optional[int]:
+        word = self.words[idx]
+        height = word["y1"] - word["y0"]
+        cy = center_y(word_box(word))
+        box = (word["x1"], cy - height / 2, word["x1"] + height * WORD_GAP_RATIO, cy + height / 2)
+        following = [
+            other for other in self.query(box)
+            if other != idx and self.words[other]["x0"] >= word["x1"] - 1
+            and abs(center_y(word_box(self.words[other])) - cy) <= height / 2
+        ]
+        return following[0] if following else None
+    
+    def _run(self, candidates: List[int]) -> List[Word]:
+        if not candidates:
+            return []
+        
+        run = [min(candidates, key=lambda idx: self.words[idx]["x0"])]
+        while True:
+            following = self._next_word(run[-1])
+            if following is None or following in run or self.words[following]["text"].endswith(":"):
+                break
+            run.append(following)
+        return [self.words[idx] for idx in run]
+
+
+def index_for(page: ParsedPage) -> SpatialIndex:
+    return page.derive("index", lambda: SpatialIndex(
+        page.words,
+        x_tolerance=settings.heuristics.position_x_tolerance,
+        y_tolerance=settings.heuristics.position_y_tolerance
+    ))
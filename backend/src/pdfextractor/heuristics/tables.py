@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..context_selector import normalize
+from ..pdf_parser import ParsedPage
+
+ABBREVIATIONS = {
+    "qtd": "quantidade", "qtde": "quantidade", "vcto": "vencimento", "venc": "vencimento",
+    "vlr": "valor", "vir": "valor", "vr": "valor", "parc": "parcela", "ref": "referencia",
+    "dt": "data", "nro": "numero", "num": "numero", "cod": "codigo", "tel": "telefone",
+}
+
+CONNECTORS = {"a", "o", "as", "os", "de", "da", "das", "do", "dos", "e", "em", "na", "no", "por", "para"}
+
+EXACT_CONFIDENCE = 0.95
+PARTIAL_CONFIDENCE = 0.9
+FORM_CONFIDENCE = 0.8
+WEAK_CONFIDENCE = 0.7
+
+
+@lru_cache(maxsize=4096)
+def tokens(text: str) -> Tuple[str, ...]:
+    words = re.findall(r"[a-z0-9]+", normalize(text))
+    return tuple(ABBREVIATIONS.get(w, w) for w in words if w not in CONNECTORS)
+
+
+def same_token(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    short, long = sorted((a, b), key=len)
+    return len(short) >= 4 and long.startswith(short)
+
+
+@lru_cache(maxsize=16384)
+def header_match(header: str, name: Tuple[str, ...], description: Tuple[str, ...]) -> Tuple[float, float]:
+    header_tokens = tokens(header)
+    if not header_tokens or not name:
+        return 0.0, 0.0
+    
+    known = name + description
+    if not all(any(same_token(h, t) for t in known) for h in header_tokens):
+        return 0.0, 0.0
+    
+    recall = sum(any(same_token(t, h) for h in header_tokens) for t in name) / len(name)
+    if recall == 1.0:
+        score = EXACT_CONFIDENCE
+    elif recall >= 0.5 and len(header_tokens) > 1:
+        score = PARTIAL_CONFIDENCE
+    elif recall >= 0.5:
+        score = WEAK_CONFIDENCE
+    else:
+        return 0.0, 0.0
+    
+    if header.endswith(":"):
+        score = min(score, FORM_CONFIDENCE)
+    return score, recall
+
+
+def clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+def is_value(text: Optional[str]) -> bool:
+    return bool(text) and not text.endswith(":")
+
+
+class TableReader:
+    
+    def extract(self, page: ParsedPage, schema: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        results = {}
+        confidence = {}
+        
+        tables = page.tables
+        if not tables:
+            return results, confidence
+        
+        cells = list(self._cells(tables))
+        
+        for field_name, description in schema.items():
+            name = tokens(field_name.replace("_", " "))
+            described = tokens(description or "")
+            
+            best, values = (0.0, 0.0), set()
+            for header, value in cells:
+                match = header_match(header, name, described)
+                if match[0] == 0.0 or match < best:
+                    continue
+                if match > best:
+                    best, values = match, set()
+                values.add(value)
+            
+            if len(values) != 1:
+                continue
+            
+            results[field_name] = values.pop()
+            confidence[field_name] = best[0]
+        
+        return results, confidence
+    
+    def _cells(self, tables: List[List[List[Optional[str]]]]) -> Iterator[Tuple[str, str]]:
+        for table in tables:
+            header = table[0]
+            first_row = table[1] if len(table) > 1 else []
+            for idx, cell in enumerate(header):
+                key = clean(cell)
+                value = clean(first_row[idx]) if idx < len(first_row) else None
+                if key and is_value(value):
+                    yield key, value
+            
+            if all(len(row) == 2 for row in table):
+                for row in table:
+                    key, value = clean(row[0]), clean(row[1])
+                    if key and is_value(value):
+                        yield key, value
@@ -0,0 +1,278 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+from ..pdf_parser import ParsedDocument, ParsedPage
+
+Word = Dict[str, Any]
+BBox = List[float]
+
+WORD_GAP_RATIO = 0.6
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return re.sub(r"[^a-z0-9]", "", "".join(c for c in text if not unicodedata.combining(c)))
+
+
+def value_kind(value: str) -> str:
+    normalized = normalize(value)
+    if normalized.isdigit():
+        return "digits"
+    if not any(c.isdigit() for c in normalized):
+        return "alpha"
+    return "mixed"
+
+
+def bbox_of(words: List[Word]) -> BBox:
+    return [
+        min(w["x0"] for w in words),
+        min(w["y0"] for w in words),
+        max(w["x1"] for w in words),
+        max(w["y1"] for w in words),
+    ]
+
+
+class LayoutTemplate:
+    
+    def __init__(
+        self,
+        label: str,
+        fields: Optional[Dict[str, Dict[str, Any]]] = None,
+        x_tolerance: float = 30,
+        y_tolerance: float = 20,
+        min_samples: int = 3
+    ):
+        self.label = label
+        self.fields: Dict[str, Dict[str, Any]] = fields or {}
+        self.x_tolerance = x_tolerance
+        self.y_tolerance = y_tolerance
+        self.min_samples = min_samples
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return self.fields
+    
+    def extract(
+        self,
+        page: ParsedPage,
+        schema: Dict[str, str]
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        results = {}
+        confidence = {}
+        
+        learned_fields = {
+            field_name: self.fields[field_name] for field_name in schema
+            if field_name in self.fields and self.fields[field_name].get("page", 0) == page.number
+        }
+        if not learned_fields:
+            return results, confidence
+        
+        lines = page.lines
+        if not lines:
+            return results, confidence
+        
+        for field_name, learned in learned_fields.items():
+            
+            dx, dy, anchored = 0.0, 0.0, False
+            if learned["anchor"]:
+                found = self._find_phrase(lines, learned["anchor"], learned["anchor_bbox"])
+                if found is not None:
+                    dx = found[0] - learned["anchor_bbox"][0]
+                    dy = found[1] - learned["anchor_bbox"][1]
+                    anchored = True
+            
+            if learned["samples"] < self.min_samples:
+                score = 0.6
+            elif anchored:
+                score = 0.9
+            else:
+                score = 0.8
+            
+            x0, y0, x1, y1 = learned["bbox"]
+            value = self._read_region(lines, [x0 + dx, y0 + dy, x1 + dx, y1 + dy])
+            if not value:
+                continue
+            if learned["kind"] != "any" and value_kind(value) != learned["kind"]:
+                continue
+            
+            results[field_name] = value
+            confidence[field_name] = score
+        
+        return results, confidence
+    
+    def learn(self, document: ParsedDocument, values: Dict[str, Any]) -> bool:
+        remaining = {
+            field_name: str(value) for field_name, value in values.items()
+            if value is not None and not isinstance(value, (dict, list))
+        }
+        
+        changed = False
+        for page in document.pages():
+            if not remaining:
+                break
+            
+            text = normalize(page.text or "")
+            candidates = {
+                field_name: value for field_name, value in remaining.items()
+                if normalize(value) in text
+            }
+            if not candidates:
+                continue
+            
+            lines = page.lines
+            if not lines:
+                continue
+            
+            spans = {}
+            for field_name, value in candidates.items():
+                span = self._locate(lines, value)
+                if span:
+                    spans[field_name] = span
+            
+            if not spans:
+                continue
+            
+            for field_name in spans:
+                del remaining[field_name]
+            
+            if self._learn_page(page.number, lines, spans, values):
+                changed = True
+        
+        return changed
+    
+    def _learn_page(
+        self,
+        number: int,
+        lines: List[List[Word]],
+        spans: Dict[str, List[Tuple[int, Word]]],
+        values: Dict[str, Any]
+    ) -> bool:
+        taken = {id(word) for span in spans.values() for _, word in span}
+        
+        changed = False
+        for field_name, span in spans.items():
+            bbox = bbox_of([word for _, word in span])
+            anchor, anchor_bbox = self._anchor_for(lines, span, bbox, taken)
+            kind = value_kind(str(values[field_name]))
+            
+            learned = self.fields.get(field_name)
+            if (
+                learned is not None
+                and learned.get("page", 0) == number
+                and self._same_place(learned["bbox"], bbox)
+            ):
+                learned["samples"] += 1
+                learned["bbox"] = bbox
+                if learned["anchor"] != anchor:
+                    learned["anchor"], learned["anchor_bbox"] = None, None
+                else:
+                    learned["anchor_bbox"] = anchor_bbox
+                if learned["kind"] != kind:
+                    learned["kind"] = "any"
+            else:
+                self.fields[field_name] = {
+                    "bbox": bbox,
+                    "anchor": anchor,
+                    "anchor_bbox": anchor_bbox,
+                    "kind": kind,
+                    "page": number,
+                    "samples": 1,
+                }
+            changed = True
+        
+        return changed
+    
+    def _same_place(self, a: BBox, b: BBox) -> bool:
+        return abs(a[0] - b[0]) <= self.x_tolerance and abs(a[1] - b[1]) <= self.y_tolerance
+    
+    def _locate(self, lines: List[List[Word]], value: str) -> Optional[List[Tuple[int, Word]]]:
+        target = normalize(value)
+        if len(target) < 2:
+            return None
+        
+        flat = [(idx, word, normalize(word["text"])) for idx, line in enumerate(lines) for word in line]
+        
+        for start, (_, _, text) in enumerate(flat):
+            if not text or not target.startswith(text):
+                continue
+            
+            acc = ""
+            end = start
+            while end < len(flat) and len(acc) < len(target):
+                acc += flat[end][2]
+                end += 1
+                if not target.startswith(acc):
+                    break
+            
+            if acc == target:
+                return [(idx, word) for idx, word, _ in flat[start:end]]
+        
+        return None
+    
+    def _anchor_for(
+        self,
+        lines: List[List[Word]],
+        span: List[Tuple[int, Word]],
+        bbox: BBox,
+        taken: set
+    ) -> Tuple[Optional[List[str]], Optional[BBox]]:
+        line_idx, first = span[0]
+        line = lines[line_idx]
+        
+        left = [w for w in line if w["x1"] <= first["x0"] and id(w) not in taken][-3:]
+        if left and left[-1]["text"].endswith(":"):
+            return [normalize(w["text"]) for w in left], bbox_of(left)
+        
+        if line_idx > 0:
+            above = [
+                w for w in lines[line_idx - 1]
+                if w["x1"] >= bbox[0] - self.x_tolerance
+                and w["x0"] <= bbox[2] + self.x_tolerance
+                and id(w) not in taken
+            ]
+            if above and bbox[1] - max(w["y1"] for w in above) <= 2 * self.y_tolerance:
+                return [normalize(w["text"]) for w in above], bbox_of(above)
+        
+        if left:
+            return [normalize(w["text"]) for w in left], bbox_of(left)
+        
+        return None, None
+    
+    def _find_phrase(self, lines: List[List[Word]], phrase: List[str], near: BBox) -> Optional[BBox]:
+        best, best_distance = None, None
+        for line in lines:
+            texts = [normalize(w["text"]) for w in line]
+            for start in range(len(texts) - len(phrase) + 1):
+                if texts[start:start + len(phrase)] != phrase:
+                    continue
+                found = bbox_of(line[start:start + len(phrase)])
+                distance = abs(found[0] - near[0]) + abs(found[1] - near[1])
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = found, distance
+        return best
+    
+    def _read_region(self, lines: List[List[Word]], region: BBox) -> Optional[str]:
+        x0, y0, x1, y1 = region
+        
+        parts = []
+        for line in lines:
+            height = max(w["y1"] - w["y0"] for w in line)
+            pad = min(self.y_tolerance, height / 2)
+            center = sum((w["y0"] + w["y1"]) / 2 for w in line) / len(line)
+            if center < y0 - pad or center > y1 + pad:
+                continue
+            
+            seeds = [
+                idx for idx, w in enumerate(line)
+                if w["x0"] >= x0 - self.x_tolerance and w["x0"] <= x1
+            ]
+            if not seeds:
+                continue
+            
+            start, end = seeds[0], seeds[-1]
+            max_gap = height * WORD_GAP_RATIO
+            while end < len(line) - 1 and line[end + 1]["x0"] - line[end]["x1"] <= max_gap:
+                end += 1
+            
+            parts.append(" ".join(w["text"] for w in line[start:end + 1]))
+        
+        return " ".join(parts) if parts else None
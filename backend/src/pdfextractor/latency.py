@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Optional
+
+STAGES = ["cache_lookup", "parse", "heuristics", "llm", "cache_write"]
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered, p: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageTimer:
+    
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started_at
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {name: round(seconds, 6) for name, seconds in self.stages.items()}
+
+
+class LatencyWindow:
+    
+    def __init__(self, size: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+    
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self._count
+        
+        summary = {"count": count, "window": len(ordered)}
+        for p in PERCENTILES:
+            summary[f"p{p}"] = round(percentile(ordered, p), 6)
+        summary["max"] = round(ordered[-1], 6) if ordered else 0.0
+        return summary
+
+
+class LatencyStats:
+    
+    def __init__(self, window_size: int = 1000, groups: Optional[Dict[str, Iterable[str]]] = None):
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Dict[str, LatencyWindow]] = {}
+        for group, names in (groups or {}).items():
+            for name in names:
+                self._window(group, name)
+    
+    def _window(self, group: str, name: str) -> LatencyWindow:
+        with self._lock:
+            windows = self._windows.setdefault(group, {})
+            window = windows.get(name)
+            if window is None:
+                window = windows[name] = LatencyWindow(self.window_size)
+            return window
+    
+    def record(self, group: str, name: str, seconds: float):
+        self._window(group, name).add(seconds)
+    
+    def record_timer(self, method: str, timer: StageTimer, elapsed: float):
+        for stage, seconds in timer.stages.items():
+            self.record("stages", stage, seconds)
+        self.record("methods", method, elapsed)
+    
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            windows = {group: dict(names) for group, names in self._windows.items()}
+        
+        return {
+            group: {name: window.summary() for name, window in names.items()}
+            for group, names in windows.items()
+        }
+    
+    def reset(self):
+        with self._lock:
+            for group, names in self._windows.items():
+                for name in names:
+                    names[name] = LatencyWindow(self.window_size)
@@ -0,0 +1,110 @@
+import asyncio
+from functools import partial
+from typing import Any, Dict, List, Optional, Set
+
+
+class BatchRequest:
+    
+    def __init__(self, text: str, schema: Dict[str, str], context: Optional[Dict], future: asyncio.Future):
+        self.text = text
+        self.schema = schema
+        self.context = context
+        self.future = future
+
+
+class LLMBatcher:
+    
+    def __init__(self, client, max_batch_size: int, window_seconds: float, max_batch_chars: int):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self.max_batch_chars = max_batch_chars
+        
+        self._pending: Dict[str, List[BatchRequest]] = {}
+        self._pending_chars: Dict[str, int] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(
+        self,
+        text: str,
+        schema: Dict[str, str],
+        label: Optional[str] = None,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        group = label or ""
+        
+        if self._pending_chars.get(group, 0) + len(text) > self.max_batch_chars:
+            self._flush(group)
+        
+        request = BatchRequest(text, schema, context, loop.create_future())
+        self._pending.setdefault(group, []).append(request)
+        self._pending_chars[group] = self._pending_chars.get(group, 0) + len(text)
+        
+        if len(self._pending[group]) >= self.max_batch_size:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window_seconds, self._flush, group)
+        
+        return await request.future
+    
+    def _flush(self, group: str):
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        
+        requests = self._pending.pop(group, [])
+        self._pending_chars.pop(group, None)
+        if requests:
+            task = asyncio.ensure_future(self._run(group or None, requests))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(partial(self._finish, requests))
+    
+    def _finish(self, requests: List[BatchRequest], task: asyncio.Task):
+        if task.cancelled():
+            error = asyncio.CancelledError()
+        else:
+            error = task.exception()
+            if error is None:
+                return
+            print(f"Erro inesperado no lote LLM: {error}")
+        
+        for request in requests:
+            if not request.future.done():
+                request.future.set_exception(error)
+    
+    async def _run(self, label: Optional[str], requests: List[BatchRequest]):
+        if len(requests) == 1:
+            await self._run_single(label, requests[0])
+            return
+        
+        try:
+            answers = await self.client.aextract_batch(
+                [(r.text, r.schema, r.context) for r in requests],
+                label
+            )
+        except Exception as e:
+            print(f"Erro no lote LLM, repetindo individualmente: {e}")
+            answers = [None] * len(requests)
+        
+        fallbacks = []
+        for request, answer in zip(requests, answers):
+            if answer is None:
+                fallbacks.append(request)
+            elif not request.future.done():
+                request.future.set_result(answer)
+        
+        if fallbacks:
+            self.client.stats.incr("batch_fallbacks", len(fallbacks))
+            await asyncio.gather(*(self._run_single(label, r) for r in fallbacks))
+    
+    async def _run_single(self, label: Optional[str], request: BatchRequest):
+        try:
+            result = await self.client.aextract_fields(request.text, request.schema, label, request.context)
+            if not request.future.done():
+                request.future.set_result(result)
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
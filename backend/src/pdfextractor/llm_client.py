@@ -1,15 +1,97 @@
+import asyncio
 import json
 import os
-from typing import Dict, Optional
-from openai import OpenAI
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import httpx
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    RateLimitError,
+)
+from diskcache import Cache
 from dotenv import load_dotenv
+from .cache import KeyGenerator, SharedCounters
+from .context_selector import ContextSelector
+from .llm_batcher import LLMBatcher
+from .metrics import MetricsRegistry
+from .settings import LLMSettings, settings
 
 load_dotenv()
 
+SYSTEM_PROMPT = (
+    "Você é um assistente de extração de dados. "
+    "Extraia informações do texto e retorne APENAS JSON válido. "
+    "Se um campo não existir no texto, retorne null."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "Você é um assistente de extração de dados. "
+    "Você receberá vários documentos numerados. Extraia as informações "
+    "de cada um separadamente e retorne APENAS JSON válido. "
+    "Se um campo não existir no texto, retorne null."
+)
+
+
+class LLMError(Exception):
+    pass
+
+
+class CircuitOpenError(LLMError):
+    pass
+
+
+class CircuitBreaker:
+    
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_trial = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.half_open_trial:
+            self.half_open_trial = True
+            return True
+        return False
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_trial = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.half_open_trial or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.half_open_trial = False
+    
+    def reopen(self):
+        self.opened_at = time.monotonic()
+        self.half_open_trial = False
+
 
 class LLMClient:
     
-    def __init__(self):
+    def __init__(self, stats_store: Optional[Cache] = None, llm_settings: Optional[LLMSettings] = None):
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError(
@@ -17,102 +99,365 @@ class LLMClient:
                 "Defina a variável de ambiente ou crie arquivo .env"
             )
         
-        self.client = OpenAI(api_key=api_key)
-        self.model = os.getenv("OPENAI_MODEL", "gpt-5-mini")
+        self.settings = llm_settings or settings.llm
+        self.model = self.settings.model
         
-        self.stats = {
-            "total_calls": 0,
-            "total_tokens_input": 0,
-            "total_tokens_output": 0,
-        }
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=self.settings.timeout_seconds,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self.settings.max_connections,
+                    max_keepalive_connections=self.settings.max_connections
+                )
+            )
+        )
+        self.circuit = CircuitBreaker(
+            failure_threshold=self.settings.circuit_failure_threshold,
+            reset_seconds=self.settings.circuit_reset_seconds
+        )
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        
+        self.context_selector = ContextSelector(
+            tokens_per_field=self.settings.context_tokens_per_field,
+            max_tokens=self.settings.context_max_tokens,
+            window_lines=self.settings.context_window_lines
+        )
+        
+        self.batcher = LLMBatcher(
+            self,
+            max_batch_size=self.settings.batch_max_size,
+            window_seconds=self.settings.batch_window_ms / 1000,
+            max_batch_chars=self.settings.batch_max_chars
+        )
+        
+        self._prefixes: OrderedDict = OrderedDict()
+        self._prefix_lock = threading.Lock()
+        
+        self.stats = SharedCounters(
+            "llm",
+            [
+                "total_calls",
+                "total_tokens_input",
+                "total_tokens_output",
+                "total_tokens_cached",
+                "retries",
+                "errors",
+                "circuit_rejections",
+                "batched_calls",
+                "batched_documents",
+                "batch_fallbacks",
+                "context_chars_in",
+                "context_chars_sent",
+            ],
+            store=stats_store
+        )
     
     def extract_fields(
         self,
         text: str,
         schema: Dict[str, str],
         label: Optional[str] = None,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        batch: bool = False
     ) -> Dict[str, any]:
-        max_length = int(os.getenv("MAX_TEXT_LENGTH", "10000"))
-        if len(text) > max_length:
-            text = text[:max_length] + "\n... (texto truncado)"
+        if batch and self.settings.batching_enabled:
+            coroutine = self.batcher.submit(text, schema, label, context)
+        else:
+            coroutine = self.aextract_fields(text, schema, label, context)
         
-        prompt = self._build_prompt(text, schema, label, context)
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        return future.result()
+    
+    async def aextract_fields(
+        self,
+        text: str,
+        schema: Dict[str, str],
+        label: Optional[str] = None,
+        context: Optional[Dict] = None
+    ) -> Dict[str, any]:
+        messages = self._build_messages(self._prepare_text(text, schema, context), schema, label, context)
+        response = await self._create_with_retries(messages=messages)
+        self._record_usage(response.usage)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "Você é um assistente de extração de dados. "
-                            "Extraia informações do texto e retorne APENAS JSON válido. "
-                            "Se um campo não existir no texto, retorne null."
-                        )
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                reasoning_effort="minimal",
-            )
-            
-            usage = response.usage
-            self.stats["total_calls"] += 1
-            self.stats["total_tokens_input"] += usage.prompt_tokens
-            self.stats["total_tokens_output"] += usage.completion_tokens
-            
             result = json.loads(response.choices[0].message.content)
-            
-            for field in schema.keys():
-                if field not in result:
-                    result[field] = None
-            
-            return result
-            
-        except Exception as e:
-            print(f"Erro ao chamar LLM: {e}")
-            return {field: None for field in schema.keys()}
+        except (json.JSONDecodeError, TypeError) as e:
+            self.stats.incr("errors")
+            raise LLMError(f"Resposta inválida do LLM: {e}") from e
+        
+        if not isinstance(result, dict):
+            self.stats.incr("errors")
+            raise LLMError(f"Resposta do LLM não é um objeto JSON: {type(result).__name__}")
+        
+        for field in schema.keys():
+            if field not in result:
+                result[field] = None
+        
+        return result
     
-    def _build_prompt(
+    async def aextract_batch(
+        self,
+        items: List[Tuple[str, Dict[str, str], Optional[Dict]]],
+        label: Optional[str] = None
+    ) -> List[Optional[Dict[str, any]]]:
+        messages = self._build_batch_messages(items, label)
+        response = await self._create_with_retries(messages=messages)
+        self._record_usage(response.usage)
+        self.stats.incr("batched_calls")
+        self.stats.incr("batched_documents", len(items))
+        
+        try:
+            documents = json.loads(response.choices[0].message.content)["documentos"]
+        except (json.JSONDecodeError, TypeError, KeyError) as e:
+            raise LLMError(f"Resposta inválida do LLM em lote: {e}") from e
+        
+        if not isinstance(documents, dict):
+            raise LLMError("Resposta inválida do LLM em lote: 'documentos' não é um objeto")
+        
+        results = []
+        for idx, (_, schema, _) in enumerate(items):
+            answer = documents.get(str(idx))
+            if not isinstance(answer, dict) or set(answer) != set(schema):
+                results.append(None)
+                continue
+            results.append({field: answer.get(field) for field in schema})
+        
+        return results
+    
+    async def _create_with_retries(self, messages):
+        if not self.circuit.allow():
+            self.stats.incr("circuit_rejections")
+            raise CircuitOpenError("Circuit breaker aberto: provedor LLM indisponível")
+        
+        trial = self.circuit.half_open_trial
+        succeeded = False
+        try:
+            response = await self._create_attempts(messages)
+            succeeded = True
+            return response
+        finally:
+            if trial and not succeeded:
+                self.circuit.reopen()
+    
+    async def _create_attempts(self, messages):
+        attempt = 0
+        while True:
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        response_format={"type": "json_object"},
+                        reasoning_effort=self.settings.reasoning_effort,
+                    ),
+                    timeout=self.settings.timeout_seconds
+                )
+                self.circuit.record_success()
+                return response
+            except Exception as e:
+                transient = self._is_transient(e)
+                if transient and attempt < self.settings.max_retries:
+                    attempt += 1
+                    self.stats.incr("retries")
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                
+                self.stats.incr("errors")
+                if transient:
+                    self.circuit.record_failure()
+                print(f"Erro ao chamar LLM: {e}")
+                raise LLMError(f"Erro ao chamar LLM: {e}") from e
+    
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(
+            self.settings.backoff_max_seconds,
+            self.settings.backoff_base_seconds * 2 ** (attempt - 1)
+        )
+        return random.uniform(0, ceiling)
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, APITimeoutError, APIConnectionError, RateLimitError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+    
+    def _prepare_text(self, text: str, schema: Dict[str, str], context: Optional[Dict]) -> str:
+        selected = text
+        if self.settings.context_selection_enabled:
+            selected = self.context_selector.select(text, schema, context)
+        
+        max_length = settings.limits.max_text_length
+        if len(selected) > max_length:
+            selected = selected[:max_length] + "\n... (texto truncado)"
+        
+        self.stats.incr("context_chars_in", len(text))
+        self.stats.incr("context_chars_sent", len(selected))
+        return selected
+    
+    def close(self):
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+    
+    def _build_messages(
         self,
         text: str,
         schema: Dict[str, str],
         label: Optional[str],
         context: Optional[Dict]
-    ) -> str:
-        label_ctx = f"\nTipo de documento: {label}\n" if label else ""
+    ) -> List[Dict[str, str]]:
+        prefix = self._prompt_prefix("single", label, schema)
         
         context_ctx = ""
         if context:
-            context_ctx = "\nCampos já identificados:\n"
-            for k, v in context.items():
-                if v is not None:
-                    context_ctx += f"- {k}: {v}\n"
+            known = [f"- {k}: {v}" for k, v in context.items() if v is not None]
+            if known:
+                context_ctx = "Campos já identificados:\n" + "\n".join(known) + "\n\n"
+        
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{prefix}\n\n{context_ctx}Texto:\n{text}"}
+        ]
+    
+    def _build_batch_messages(
+        self,
+        items: List[Tuple[str, Dict[str, str], Optional[Dict]]],
+        label: Optional[str]
+    ) -> List[Dict[str, str]]:
+        descriptions = {}
+        for _, schema, _ in items:
+            descriptions.update(schema)
+        
+        prefix = self._prompt_prefix("batch", label, descriptions)
+        
+        documents_str = ""
+        for idx, (text, schema, context) in enumerate(items):
+            documents_str += f"\n### Documento {idx}\n"
+            documents_str += f"Campos para extrair: {', '.join(schema.keys())}\n"
+            
+            if context:
+                known = [f"- {k}: {v}" for k, v in context.items() if v is not None]
+                if known:
+                    documents_str += "Campos já identificados:\n" + "\n".join(known) + "\n"
+            
+            documents_str += f"Texto:\n{self._prepare_text(text, schema, context)}\n"
         
+        return [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{prefix}\n{documents_str}"}
+        ]
+    
+    def _prompt_prefix(self, kind: str, label: Optional[str], schema: Dict[str, str]) -> str:
+        key = (kind, label, KeyGenerator.hash_schema(schema))
+        
+        with self._prefix_lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                return prefix
+        
+        label_ctx = f"\nTipo de documento: {label}" if label else ""
         schema_str = "\n".join([
-            f'"{field}": {desc}'
-            for field, desc in schema.items()
+            f'"{field}": {schema[field]}'
+            for field in sorted(schema)
         ])
         
-        prompt = f"""Extraia os seguintes campos deste texto.{label_ctx}{context_ctx}
+        if kind == "batch":
+            prefix = f"""Extraia os campos indicados de cada documento abaixo.{label_ctx}
 
-Campos para extrair:
+Descrição dos campos:
 {schema_str}
 
-Texto:
-{text}
+Retorne JSON no formato {{"documentos": {{"0": {{"campo": valor}}, "1": {{...}}}}}}, com uma chave por documento e apenas os campos pedidos para ele. Se um campo não existir, use null."""
+        else:
+            prefix = f"""Extraia os seguintes campos do texto ao final.{label_ctx}
+
+Campos para extrair:
+{schema_str}
 
 Retorne JSON com os campos. Se um campo não existir, use null."""
         
-        return prompt
+        with self._prefix_lock:
+            self._prefixes[key] = prefix
+            while len(self._prefixes) > self.settings.prompt_prefix_cache_size:
+                self._prefixes.popitem(last=False)
+        
+        return prefix
+    
+    def _record_usage(self, usage):
+        self.stats.incr("total_calls")
+        self.stats.incr("total_tokens_input", usage.prompt_tokens)
+        self.stats.incr("total_tokens_output", usage.completion_tokens)
+        
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) if details else None
+        if cached_tokens:
+            self.stats.incr("total_tokens_cached", cached_tokens)
+    
+    def register_metrics(self, metrics: MetricsRegistry):
+        metrics.counter(
+            "llm_calls_total", "Successful LLM API calls",
+            collect=lambda: {(): self.stats.snapshot()["total_calls"]}
+        )
+        metrics.counter(
+            "llm_tokens_total", "LLM tokens by type", ["type"],
+            collect=lambda: self._token_counts()
+        )
+        metrics.counter(
+            "llm_errors_total", "LLM calls that failed after retries",
+            collect=lambda: {(): self.stats.snapshot()["errors"]}
+        )
+        metrics.counter(
+            "llm_retries_total", "LLM call retries",
+            collect=lambda: {(): self.stats.snapshot()["retries"]}
+        )
+        metrics.counter(
+            "llm_circuit_rejections_total", "LLM calls rejected by the open circuit breaker",
+            collect=lambda: {(): self.stats.snapshot()["circuit_rejections"]}
+        )
+        metrics.gauge(
+            "llm_circuit_open", "1 when the LLM circuit breaker is open or half open",
+            collect=lambda: {(): int(self.circuit.state != "closed")}
+        )
+    
+    def _token_counts(self) -> Dict[tuple, int]:
+        counters = self.stats.snapshot()
+        return {
+            ("input",): counters["total_tokens_input"],
+            ("output",): counters["total_tokens_output"],
+            ("cached",): counters["total_tokens_cached"],
+        }
     
     def get_stats(self) -> Dict:
+        counters = self.stats.snapshot()
         return {
-            "calls": self.stats["total_calls"],
+            "calls": counters["total_calls"],
+            "retries": counters["retries"],
+            "errors": counters["errors"],
+            "circuit_rejections": counters["circuit_rejections"],
+            "circuit_state": self.circuit.state,
+            "prompt_prefixes": len(self._prefixes),
+            "batching": {
+                "calls": counters["batched_calls"],
+                "documents": counters["batched_documents"],
+                "fallbacks": counters["batch_fallbacks"],
+            },
+            "context": {
+                "chars_in": counters["context_chars_in"],
+                "chars_sent": counters["context_chars_sent"],
+            },
             "tokens": {
-                "input": self.stats["total_tokens_input"],
-                "output": self.stats["total_tokens_output"],
-                "total": self.stats["total_tokens_input"] + self.stats["total_tokens_output"]
+                "input": counters["total_tokens_input"],
+                "output": counters["total_tokens_output"],
+                "cached": counters["total_tokens_cached"],
+                "total": counters["total_tokens_input"] + counters["total_tokens_output"]
             }
         }
@@ -9,10 +9,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 if __name__ == "__main__":
+    workers = int(os.getenv("API_WORKERS", "1"))
+    
     uvicorn.run(
         "pdfextractor.api:app",
         host=os.getenv("API_HOST", "0.0.0.0"),
         port=int(os.getenv("API_PORT", "8000")),
-        reload=os.getenv("API_RELOAD", "true").lower() == "true",
+        workers=workers,
+        reload=workers == 1 and os.getenv("API_RELOAD", "true").lower() == "true",
         log_level=os.getenv("LOG_LEVEL", "info").lower()
     )
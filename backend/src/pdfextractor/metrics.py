@@ -0,0 +1,189 @@
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+Number = Union[int, float]
+Labels = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_value(value: Number) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    
+    TYPE = "untyped"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[Labels, Number]]] = None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, Number] = {}
+    
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _add(self, amount: Number, labels: Dict[str, str]):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self) -> List[Tuple[str, Labels, Labels, Number]]:
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        
+        return [
+            (self.name, self.labelnames, key if isinstance(key, tuple) else (str(key),), value)
+            for key, value in sorted(values.items())
+        ]
+    
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {escape(self.documentation)}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for name, labelnames, values, value in self.samples():
+            lines.append(f"{name}{format_labels(labelnames, values)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    
+    TYPE = "counter"
+    
+    def inc(self, amount: Number = 1, **labels: str):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._add(amount, labels)
+
+
+class Gauge(Metric):
+    
+    TYPE = "gauge"
+    
+    def set(self, value: Number, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: Number = 1, **labels: str):
+        self._add(amount, labels)
+    
+    def dec(self, amount: Number = 1, **labels: str):
+        self._add(-amount, labels)
+
+
+class Histogram(Metric):
+    
+    TYPE = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Labels, List[Number]] = {}
+    
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[idx] += 1
+            series[-1] += value
+    
+    def samples(self) -> List[Tuple[str, Labels, Labels, Number]]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        
+        samples = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                samples.append((f"{self.name}_bucket", bucket_labels, key + (format_value(bound),), count))
+            samples.append((f"{self.name}_sum", self.labelnames, key, values[-1]))
+            samples.append((f"{self.name}_count", self.labelnames, key, values[-2]))
+        return samples
+
+
+class MetricsRegistry:
+    
+    def __init__(self, namespace: str = "pdfextractor"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), collect=None) -> Counter:
+        return self.register(Counter(self._name(name), documentation, labelnames, collect))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(self._name(name), documentation, labelnames, collect))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(self._name(name), documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"Erro ao coletar métrica '{metric.name}': {e}")
+        return "\n".join(lines) + "\n"
@@ -19,10 +19,14 @@ class DocumentLabel(BaseModel):
 
 
 class ProcessingMetadata(BaseModel):
-    method: str = Field(..., description="Extraction method: cache, heuristic, hybrid, empty")
+    method: str = Field(..., description="Extraction method: cache, heuristic, hybrid, llm, empty, coalesced")
     processing_time: float = Field(..., description="Processing time in seconds")
+    timings: Optional[Dict[str, float]] = Field(default=None, description="Seconds spent per stage: cache_lookup, parse, heuristics, llm, cache_write (coalesced_wait for coalesced requests)")
     heuristic_confidence: Optional[Dict[str, float]] = Field(default=None)
     cache_level: Optional[str] = Field(default=None)
+    coalesced: bool = Field(default=False, description="Result shared with an identical in-flight request")
+    llm_error: Optional[str] = Field(default=None, description="LLM failure; affected fields are null and the result is not cached")
+    shadow_fields: Optional[List[str]] = Field(default=None, description="Confident heuristic fields re-checked by the LLM for calibration")
 
 
 class ExtractionResult(BaseModel):
@@ -32,13 +36,15 @@ class ExtractionResult(BaseModel):
 
 class BatchItem(BaseModel):
     index: int
-    data: Dict[str, Any]
-    metadata: ProcessingMetadata
+    data: Optional[Dict[str, Any]] = Field(default=None)
+    metadata: Optional[ProcessingMetadata] = Field(default=None)
+    error: Optional[str] = Field(default=None)
 
 
 class BatchResult(BaseModel):
     results: List[BatchItem]
     total_processed: int
+    total_failed: int = 0
 
 
 class PipelineStatistics(BaseModel):
@@ -46,6 +52,9 @@ class PipelineStatistics(BaseModel):
     performance: Dict[str, float]
     llm: Dict[str, Any]
     cache: Optional[Dict[str, Any]] = Field(default=None)
+    calibration: Optional[Dict[str, Any]] = Field(default=None)
+    latency: Optional[Dict[str, Any]] = Field(default=None)
+    executor: Optional[Dict[str, Any]] = Field(default=None)
 
 
 class HealthStatus(BaseModel):
@@ -1,60 +1,208 @@
 import io
+import itertools
 import pdfplumber
-from typing import Optional, List, Dict, Any
-from functools import lru_cache
+from typing import Optional, List, Dict, Any, Callable, Iterator
+from .settings import settings
 
+CACHEABLE_ARTIFACTS = ("text", "words", "tables")
+PRELOADED_ARTIFACTS = ("text", "words", "tables")
 
-def extract_text_from_pdf(pdf_content: bytes) -> Optional[str]:
-    try:
-        pdf_file = io.BytesIO(pdf_content)
-        
-        with pdfplumber.open(pdf_file) as pdf:
-            if len(pdf.pages) == 0:
-                return None
-            
-            page = pdf.pages[0]
-            text = page.extract_text()
-            
-            return text if text else None
-            
-    except Exception as e:
-        print(f"Erro ao extrair texto do PDF: {e}")
-        return None
+CELL_GAP_RATIO = 0.6
 
 
-def extract_text_with_coords(pdf_content: bytes) -> List[Dict[str, Any]]:
-    try:
-        pdf_file = io.BytesIO(pdf_content)
-        elements = []
+class ParsedPage:
+    
+    def __init__(self, document: "ParsedDocument", number: int):
+        self.document = document
+        self.number = number
+        self._artifacts = document._page_artifacts(number)
+    
+    def _page(self):
+        return self.document._open().pages[self.number]
+    
+    def _store(self, name: str, value: Any):
+        self._artifacts[name] = value
+        if name in CACHEABLE_ARTIFACTS:
+            self.document.modified = True
+    
+    def derive(self, name: str, factory: Callable[[], Any]) -> Any:
+        if name not in self._artifacts:
+            self._artifacts[name] = factory()
+        return self._artifacts[name]
+    
+    @property
+    def text(self) -> Optional[str]:
+        if "text" not in self._artifacts:
+            try:
+                text = self._page().extract_text()
+                if text and len(text) > self.document.max_page_chars:
+                    text = text[:self.document.max_page_chars]
+                self._store("text", text if text else None)
+            except Exception as e:
+                print(f"Erro ao extrair texto do PDF: {e}")
+                self._store("text", None)
+        return self._artifacts["text"]
+    
+    @property
+    def words(self) -> List[Dict[str, Any]]:
+        if "words" not in self._artifacts:
+            try:
+                words = self._page().extract_words()
+                self._store("words", [
+                    {
+                        'text': word['text'].strip(),
+                        'x0': round(word['x0'], 1),
+                        'y0': round(word['top'], 1),
+                        'x1': round(word['x1'], 1),
+                        'y1': round(word['bottom'], 1),
+                        'page': self.number,
+                        'type': 'word',
+                    }
+                    for word in words
+                ])
+            except Exception as e:
+                print(f"Erro ao extrair coordenadas do PDF: {e}")
+                self._store("words", [])
+        return self._artifacts["words"]
+    
+    @property
+    def lines(self) -> List[List[Dict[str, Any]]]:
+        if "lines" not in self._artifacts:
+            self._artifacts["lines"] = group_words_by_line(self.words)
+        return self._artifacts["lines"]
+    
+    @property
+    def tables(self) -> List[List[List[str]]]:
+        if "tables" not in self._artifacts:
+            try:
+                ruled = [table for table in self._page().extract_tables() if table]
+            except Exception:
+                ruled = []
+            layout = detect_layout_tables(self.lines, settings.heuristics.position_x_tolerance)
+            self._store("tables", ruled + layout)
+        return self._artifacts["tables"]
+
+
+class ParsedDocument:
+    
+    def __init__(
+        self,
+        pdf_content: bytes,
+        artifacts: Optional[Dict[str, Any]] = None,
+        max_pages: Optional[int] = None,
+        max_page_chars: Optional[int] = None
+    ):
+        self.pdf_content = pdf_content
+        self.max_pages = max_pages or settings.limits.max_pages
+        self.max_page_chars = max_page_chars or settings.limits.max_page_text_length
+        self._pdf = None
+        self.modified = False
         
-        with pdfplumber.open(pdf_file) as pdf:
-            if len(pdf.pages) == 0:
-                return []
-            
-            page = pdf.pages[0]
-            
-            words = page.extract_words()
-            
-            for word in words:
-                elements.append({
-                    'text': word['text'].strip(),
-                    'x0': round(word['x0'], 1),
-                    'y0': round(word['y0'], 1),
-                    'x1': round(word['x1'], 1),
-                    'y1': round(word['y1'], 1),
-                    'type': 'word',
-                })
-            
-            return elements
-            
-    except Exception as e:
-        print(f"Erro ao extrair coordenadas do PDF: {e}")
-        return []
+        artifacts = dict(artifacts) if artifacts else {}
+        if artifacts and "pages" not in artifacts:
+            artifacts = {"pages": {0: artifacts}}
+        
+        self._page_count: Optional[int] = artifacts.get("page_count")
+        self._pages: Dict[int, Dict[str, Any]] = {
+            number: dict(page) for number, page in artifacts.get("pages", {}).items()
+        }
+    
+    def _open(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(io.BytesIO(self.pdf_content))
+        return self._pdf
+    
+    def _page_artifacts(self, number: int) -> Dict[str, Any]:
+        return self._pages.setdefault(number, {})
+    
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            try:
+                self._page_count = len(self._open().pages)
+            except Exception as e:
+                print(f"Erro ao abrir o PDF: {e}")
+                self._page_count = 0
+            self.modified = True
+        return min(self._page_count, self.max_pages)
+    
+    def page(self, number: int) -> ParsedPage:
+        return ParsedPage(self, number)
+    
+    def pages(self) -> Iterator[ParsedPage]:
+        for number in range(self.page_count):
+            yield self.page(number)
+    
+    @property
+    def text(self) -> Optional[str]:
+        texts = [page.text for page in self.pages() if page.text]
+        return "\n".join(texts) if texts else None
+    
+    @property
+    def words(self) -> List[Dict[str, Any]]:
+        return [word for page in self.pages() for word in page.words]
+    
+    @property
+    def lines(self) -> List[List[Dict[str, Any]]]:
+        return [line for page in self.pages() for line in page.lines]
+    
+    @property
+    def tables(self) -> List[List[List[str]]]:
+        return [table for page in self.pages() for table in page.tables]
+    
+    def has_text(self, min_chars: int = 10) -> bool:
+        total = 0
+        for page in self.pages():
+            total += len((page.text or "").strip())
+            if total >= min_chars:
+                return True
+        return False
+    
+    def preload(self, *names: str, pages: int = 1) -> "ParsedDocument":
+        for page in itertools.islice(self.pages(), pages):
+            for name in names:
+                getattr(page, name)
+        return self
+    
+    def artifacts(self, names: tuple = CACHEABLE_ARTIFACTS) -> Dict[str, Any]:
+        return {
+            "page_count": self._page_count,
+            "pages": {
+                number: {name: page[name] for name in names if name in page}
+                for number, page in self._pages.items()
+            },
+        }
+    
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+    
+    def __enter__(self) -> "ParsedDocument":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_pdf"] = None
+        return state
 
 
-@lru_cache(maxsize=100)
-def extract_text_from_pdf_cached(pdf_hash: str, pdf_content: bytes) -> Optional[str]:
-    return extract_text_from_pdf(pdf_content)
+def load_document(pdf_content: bytes, preload: tuple = PRELOADED_ARTIFACTS) -> ParsedDocument:
+    with ParsedDocument(pdf_content) as document:
+        return document.preload(*preload)
+
+
+def extract_text_from_pdf(pdf_content: bytes) -> Optional[str]:
+    with ParsedDocument(pdf_content) as document:
+        return document.text
+
+
+def extract_text_with_coords(pdf_content: bytes) -> List[Dict[str, Any]]:
+    with ParsedDocument(pdf_content) as document:
+        return document.words
 
 
 def group_words_by_line(elements: List[Dict[str, Any]], y_tolerance: int = 4) -> List[List[Dict]]:
@@ -71,29 +219,73 @@ def group_words_by_line(elements: List[Dict[str, Any]], y_tolerance: int = 4) ->
         if abs(elem['y0'] - current_y) <= y_tolerance:
             current_line.append(elem)
         else:
-            lines.append(current_line)
+            lines.append(sorted(current_line, key=lambda e: e['x0']))
             current_line = [elem]
             current_y = elem['y0']
     
     if current_line:
-        lines.append(current_line)
+        lines.append(sorted(current_line, key=lambda e: e['x0']))
     
     return lines
 
 
 def extract_tables(pdf_content: bytes) -> List[List[List[str]]]:
-    try:
-        pdf_file = io.BytesIO(pdf_content)
-        tables = []
-        
-        with pdfplumber.open(pdf_file) as pdf:
-            page = pdf.pages[0]
-            extracted_tables = page.extract_tables()
-            
-            if extracted_tables:
-                tables = extracted_tables
+    with ParsedDocument(pdf_content) as document:
+        return document.tables
+
+
+def split_cells(line: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    height = max(w['y1'] - w['y0'] for w in line)
+    cells = [[line[0]]]
+    for previous, word in zip(line, line[1:]):
+        if word['x0'] - previous['x1'] > height * CELL_GAP_RATIO:
+            cells.append([word])
+        else:
+            cells[-1].append(word)
+    return cells
+
+
+def _column_for(word: Dict[str, Any], spans: List[tuple], x_tolerance: float) -> Optional[int]:
+    best, best_score = None, None
+    for idx, (x0, x1) in enumerate(spans):
+        score = min(x1, word['x1']) - max(x0, word['x0'])
+        if score <= 0 and -score > x_tolerance:
+            continue
+        if best_score is None or score > best_score:
+            best, best_score = idx, score
+    return best
+
+
+def _table_row(line: List[Dict[str, Any]], spans: List[tuple], x_tolerance: float) -> Optional[List[Optional[str]]]:
+    columns: List[List[str]] = [[] for _ in spans]
+    assigned = 0
+    for word in line:
+        idx = _column_for(word, spans, x_tolerance)
+        if idx is not None:
+            columns[idx].append(word['text'])
+            assigned += 1
+    
+    if assigned * 2 < len(line):
+        return None
+    return [" ".join(column) if column else None for column in columns]
+
+
+def detect_layout_tables(lines: List[List[Dict[str, Any]]], x_tolerance: float = 30) -> List[List[List[Optional[str]]]]:
+    tables = []
+    for header, line in zip(lines, lines[1:]):
+        cells = split_cells(header)
+        if len(cells) < 2:
+            continue
+        if sum(any(c.isalpha() for w in cell for c in w['text']) for cell in cells) * 2 < len(cells):
+            continue
         
-        return tables
+        height = max(w['y1'] - w['y0'] for w in header)
+        if min(w['y0'] for w in line) - max(w['y1'] for w in header) > height:
+            continue
         
-    except Exception:
-        return []
+        spans = [(cell[0]['x0'], max(w['x1'] for w in cell)) for cell in cells]
+        row = _table_row(line, spans, x_tolerance)
+        if row is not None:
+            tables.append([[" ".join(w['text'] for w in cell) for cell in cells], row])
+    
+    return tables
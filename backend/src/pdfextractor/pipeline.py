@@ -1,9 +1,40 @@
-import time
-from typing import Dict, Any, Tuple
-from .pdf_parser import extract_text_from_pdf as extract_text
-from .cache import Cache
-from .heuristics import Heuristics
-from .llm_client import LLMClient
+from concurrent.futures import Executor
+from typing import Dict, Any, Tuple, Optional
+from .pdf_parser import ParsedDocument, load_document, PRELOADED_ARTIFACTS
+from .cache import Cache, KeyGenerator, ParseCache, SharedCounters
+from .heuristics import ConfidenceCalibrator, Heuristics, LayoutTemplate
+from .latency import STAGES, LatencyStats, StageTimer
+from .llm_client import LLMClient, LLMError
+from .metrics import MetricsRegistry
+from .settings import settings
+from .singleflight import SingleFlight
+
+STAT_NAMES = [
+    "total_extractions",
+    "cache_hits",
+    "partial_cache_hits",
+    "coalesced",
+    "heuristic_only",
+    "hybrid",
+    "llm_only",
+    "empty",
+    "template_updates",
+    "shadow_samples",
+    "total_time",
+]
+
+METHODS = ["cache", "heuristic", "hybrid", "llm", "empty", "coalesced"]
+
+
+class CacheLookup:
+    
+    def __init__(self, cached: Optional[Dict[str, Any]], seconds: float):
+        self.cached = cached
+        self.seconds = seconds
+    
+    @property
+    def full_hit(self) -> bool:
+        return bool(self.cached) and not self.cached.get("_needs_llm_fields")
 
 
 class ExtractionPipeline:
@@ -12,19 +43,70 @@ class ExtractionPipeline:
         self,
         cache_dir: str = "./storage/cache_data",
         enable_cache: bool = True,
-        enable_heuristics: bool = True
+        enable_heuristics: bool = True,
+        parser_pool: Optional[Executor] = None,
+        llm: Optional[LLMClient] = None,
+        shared_stats: bool = True
     ):
-        self.cache = Cache(cache_dir=cache_dir) if enable_cache else None
-        self.heuristics = Heuristics() if enable_heuristics else None
-        self.llm = LLMClient()
-        
-        self.stats = {
-            "total_extractions": 0,
-            "cache_hits": 0,
-            "heuristic_only": 0,
-            "hybrid": 0,
-            "llm_only": 0,
-            "total_time": 0.0,
+        self.parser_pool = parser_pool
+        self.cache = Cache(cache_dir=cache_dir, shared_stats=shared_stats) if enable_cache else None
+        self.parse_cache = ParseCache(cache_dir=cache_dir, shared_stats=shared_stats) if enable_cache else None
+        self.calibrator = ConfidenceCalibrator(
+            store=self.cache.calibration_store if self.cache else None
+        ) if enable_heuristics and settings.heuristics.calibration_enabled else None
+        self.heuristics = Heuristics(calibrator=self.calibrator) if enable_heuristics else None
+        self.in_flight = SingleFlight()
+        
+        stats_store = self.cache.stats_store if self.cache else None
+        self.llm = llm or LLMClient(stats_store=stats_store)
+        
+        self.stats = SharedCounters(
+            "pipeline",
+            STAT_NAMES,
+            store=stats_store
+        )
+        self.latency = LatencyStats(
+            window_size=settings.metrics.latency_window_size,
+            groups={"stages": STAGES, "methods": METHODS}
+        )
+        
+        self.metrics = MetricsRegistry()
+        self._register_metrics()
+    
+    def _register_metrics(self):
+        self.metrics.counter(
+            "extractions_total", "Completed extractions by method", ["method"],
+            collect=lambda: self._method_counts()
+        )
+        self.metrics.counter(
+            "coalesced_requests_total", "Requests served by an identical in-flight extraction",
+            collect=lambda: {(): self.stats.snapshot()["coalesced"]}
+        )
+        self.in_flight_requests = self.metrics.gauge(
+            "in_flight_requests", "Extractions currently running in this process"
+        )
+        self.in_flight_requests.set(0)
+        self.extraction_duration = self.metrics.histogram(
+            "extraction_duration_seconds", "Extraction latency by method", ["method"]
+        )
+        self.stage_duration = self.metrics.histogram(
+            "stage_duration_seconds", "Time spent per extraction stage", ["stage"]
+        )
+        
+        self.llm.register_metrics(self.metrics)
+        if self.cache:
+            self.cache.register_metrics(self.metrics)
+            self.parse_cache.register_metrics(self.metrics)
+    
+    def _method_counts(self) -> Dict[tuple, int]:
+        counters = self.stats.snapshot()
+        return {
+            ("cache",): counters["cache_hits"],
+            ("heuristic",): counters["heuristic_only"],
+            ("hybrid",): counters["hybrid"],
+            ("llm",): counters["llm_only"],
+            ("empty",): counters["empty"],
+            ("coalesced",): counters["coalesced"],
         }
     
     def extract(
@@ -32,112 +114,323 @@ class ExtractionPipeline:
         pdf_content: bytes,
         label: str,
         schema: Dict[str, str],
-        use_cache: bool = True
+        use_cache: bool = True,
+        pdf_hash: Optional[str] = None,
+        batch_llm: bool = False,
+        lookup: Optional[CacheLookup] = None
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        start_time = time.time()
-        self.stats["total_extractions"] += 1
+        timer = StageTimer()
+        if lookup is not None:
+            timer.started_at -= lookup.seconds
+        self.stats.incr("total_extractions")
+        pdf_hash = pdf_hash or KeyGenerator.hash_pdf(pdf_content)
         
-        if use_cache and self.cache:
-            cached = self.cache.get(pdf_content, label, schema)
-            if cached:
-                self.stats["cache_hits"] += 1
+        self.in_flight_requests.inc()
+        try:
+            if not use_cache:
+                result, metadata = self._extract(pdf_content, pdf_hash, label, schema, use_cache, batch_llm, timer, lookup)
+            else:
+                flight_key = KeyGenerator.generate_full_key(pdf_hash, label, schema)
+                (result, metadata), shared = self.in_flight.do(
+                    flight_key,
+                    lambda: self._extract(pdf_content, pdf_hash, label, schema, use_cache, batch_llm, timer, lookup)
+                )
                 
-                elapsed = time.time() - start_time
+                if shared:
+                    self.stats.incr("coalesced")
+                    metadata.pop("shadow_fields", None)
+                    metadata["method"] = "coalesced"
+                    metadata["coalesced"] = True
+                    metadata["processing_time"] = waited = timer.elapsed()
+                    metadata["timings"] = {"coalesced_wait": round(waited, 6)}
+        finally:
+            self.in_flight_requests.dec()
+        
+        self._record_latency(metadata["method"], timer, metadata["processing_time"])
+        
+        return result, metadata
+    
+    def _record_latency(self, method: str, timer: StageTimer, elapsed: float):
+        self.stats.incr("total_time", elapsed)
+        self.latency.record_timer(method, timer, elapsed)
+        self.extraction_duration.observe(elapsed, method=method)
+        for stage, seconds in timer.stages.items():
+            self.stage_duration.observe(seconds, stage=stage)
+    
+    def _extract(
+        self,
+        pdf_content: bytes,
+        pdf_hash: str,
+        label: str,
+        schema: Dict[str, str],
+        use_cache: bool,
+        batch_llm: bool,
+        timer: StageTimer,
+        lookup: Optional[CacheLookup]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        result, metadata = self._extract_stages(
+            pdf_content, pdf_hash, label, schema, use_cache, batch_llm, timer, lookup
+        )
+        metadata["processing_time"] = timer.elapsed()
+        metadata["timings"] = timer.to_dict()
+        return result, metadata
+    
+    def _extract_stages(
+        self,
+        pdf_content: bytes,
+        pdf_hash: str,
+        label: str,
+        schema: Dict[str, str],
+        use_cache: bool,
+        batch_llm: bool,
+        timer: StageTimer,
+        lookup: Optional[CacheLookup]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        cached_fields = {}
+        
+        if use_cache and self.cache:
+            if lookup is not None:
+                timer.stages["cache_lookup"] = lookup.seconds
+                cached = lookup.cached
+            else:
+                with timer.stage("cache_lookup"):
+                    cached = self.cache.get(pdf_hash, label, schema)
+            if cached and cached.get("_needs_llm_fields"):
+                self.stats.incr("partial_cache_hits")
+                cached_fields = {
+                    k: cached[k] for k in schema
+                    if k not in cached["_needs_llm_fields"]
+                }
+            elif cached:
+                self.stats.incr("cache_hits")
                 
                 metadata = {
                     "method": "cache",
                     "cache_level": cached.get("_cache_level", "unknown"),
-                    "processing_time": elapsed,
                 }
                 
                 result = {k: v for k, v in cached.items() if not k.startswith("_")}
                 
                 return result, metadata
         
-        text = extract_text(pdf_content)
+        with timer.stage("parse"):
+            document = self._parse(pdf_content, pdf_hash)
         
-        if not text or len(text.strip()) < 10:
-            result = {field: None for field in schema}
-            metadata = {
-                "method": "empty",
-                "processing_time": time.time() - start_time,
-            }
-            return result, metadata
+        with document:
+            result = self._extract_from_document(
+                document, pdf_hash, label, schema, cached_fields, use_cache, batch_llm, timer
+            )
+            if self.parse_cache is not None and document.modified:
+                with timer.stage("cache_write"):
+                    self.parse_cache.set(pdf_hash, document.artifacts())
+            return result
+    
+    def _extract_from_document(
+        self,
+        document: ParsedDocument,
+        pdf_hash: str,
+        label: str,
+        schema: Dict[str, str],
+        cached_fields: Dict[str, Any],
+        use_cache: bool,
+        batch_llm: bool,
+        timer: StageTimer
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        pending_schema = {k: v for k, v in schema.items() if k not in cached_fields}
+        
+        if not document.has_text(10):
+            self.stats.incr("empty")
+            result = {field: cached_fields.get(field) for field in schema}
+            return result, {"method": "empty"}
         
         heuristic_result = {}
         confidence_scores = {}
         needs_llm = True
+        llm_error = None
         
-        if self.heuristics:
-            heuristic_result, confidence_scores, needs_llm = self.heuristics.extract_fields(
-                text, schema, label
-            )
+        template = self._load_template(label)
+        run_heuristics = bool(
+            self.heuristics and self.heuristics.answerable_fields(pending_schema, label, template)
+        )
         
-        if not needs_llm:
-            final_result = heuristic_result
-            method = "heuristic"
-            self.stats["heuristic_only"] += 1
-        else:
-            missing_fields = {
-                k: v for k, v in schema.items()
-                if heuristic_result.get(k) is None or confidence_scores.get(k, 0) < 0.75
-            }
-            
-            if missing_fields:
-                llm_result = self.llm.extract_fields(
-                    text=text,
-                    schema=missing_fields,
-                    label=label,
-                    context=heuristic_result
+        if run_heuristics:
+            with timer.stage("heuristics"):
+                heuristic_result, confidence_scores, needs_llm = self.heuristics.extract_fields(
+                    document, pending_schema, label, template=template
                 )
-                
-                final_result = {**heuristic_result, **llm_result}
-                method = "hybrid"
-                self.stats["hybrid"] += 1
+        
+        missing_fields = {}
+        if needs_llm:
+            missing_fields = self.heuristics.pending_fields(
+                pending_schema, label, heuristic_result, confidence_scores
+            ) if run_heuristics else dict(pending_schema)
+        
+        shadow_fields = {}
+        if run_heuristics and self.calibrator is not None and self.calibrator.should_sample():
+            shadow_fields = {
+                k: v for k, v in pending_schema.items()
+                if k not in missing_fields and heuristic_result.get(k) is not None
+            }
+            if shadow_fields:
+                self.stats.incr("shadow_samples")
+        
+        final_result = heuristic_result
+        if missing_fields or shadow_fields:
+            llm_schema = {**missing_fields, **shadow_fields}
+            context = {
+                k: v for k, v in {**cached_fields, **heuristic_result}.items()
+                if k not in llm_schema
+            }
+            try:
+                with timer.stage("llm"):
+                    llm_result = self.llm.extract_fields(
+                        text=document.text,
+                        schema=llm_schema,
+                        label=label,
+                        context=context,
+                        batch=batch_llm
+                    )
+            except LLMError as e:
+                llm_result = {field: None for field in missing_fields}
+                if missing_fields:
+                    llm_error = str(e)
             else:
-                final_result = heuristic_result
-                method = "heuristic"
-                self.stats["heuristic_only"] += 1
+                self._learn_template(label, template, document, llm_result)
+                self._calibrate(label, heuristic_result, llm_result)
+            
+            final_result = {
+                **heuristic_result,
+                **{k: v for k, v in llm_result.items() if k not in shadow_fields}
+            }
         
-        if use_cache and self.cache:
-            self.cache.set(pdf_content, label, schema, final_result)
+        if missing_fields:
+            method = "hybrid" if run_heuristics else "llm"
+            self.stats.incr("hybrid" if run_heuristics else "llm_only")
+        else:
+            method = "heuristic"
+            self.stats.incr("heuristic_only")
+        
+        final_result = {**cached_fields, **final_result}
         
-        elapsed = time.time() - start_time
-        self.stats["total_time"] += elapsed
+        if use_cache and self.cache and llm_error is None:
+            with timer.stage("cache_write"):
+                self.cache.set(pdf_hash, label, schema, final_result)
         
         metadata = {
             "method": method,
-            "processing_time": elapsed,
             "heuristic_confidence": {
                 k: round(v, 2) for k, v in confidence_scores.items()
             } if confidence_scores else {},
         }
         
+        if cached_fields:
+            metadata["cache_level"] = "L3_PARTIAL"
+        
+        if llm_error:
+            metadata["llm_error"] = llm_error
+        
+        if shadow_fields:
+            metadata["shadow_fields"] = sorted(shadow_fields)
+        
         return final_result, metadata
     
-    def process(self, pdf_content: bytes, label: str, schema: Dict[str, str], use_cache: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        return self.extract(pdf_content, label, schema, use_cache=use_cache)
+    def _load_template(self, label: str) -> Optional[LayoutTemplate]:
+        if self.cache is None or not self.heuristics or not settings.heuristics.templates_enabled:
+            return None
+        
+        return self._template(label, self.cache.get_template(label))
+    
+    def _template(self, label: str, fields: Optional[Dict[str, Any]]) -> LayoutTemplate:
+        return LayoutTemplate(
+            label,
+            fields,
+            x_tolerance=settings.heuristics.position_x_tolerance,
+            y_tolerance=settings.heuristics.position_y_tolerance,
+            min_samples=settings.heuristics.template_min_samples
+        )
+    
+    def _learn_template(
+        self,
+        label: str,
+        template: Optional[LayoutTemplate],
+        document: ParsedDocument,
+        values: Dict[str, Any]
+    ):
+        if template is None or not template.learn(document, values):
+            return
+        
+        def update(fields: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            current = self._template(label, fields)
+            return current.to_dict() if current.learn(document, values) else None
+        
+        try:
+            if self.cache.update_template(label, update):
+                self.stats.incr("template_updates")
+        except Exception as e:
+            print(f"Erro ao atualizar template do label '{label}': {e}")
+    
+    def _calibrate(self, label: str, heuristic_result: Dict[str, Any], llm_result: Dict[str, Any]):
+        if self.calibrator is None:
+            return
+        
+        for field_name, llm_value in llm_result.items():
+            if heuristic_result.get(field_name) is not None:
+                self.calibrator.record(label, field_name, heuristic_result[field_name], llm_value)
+    
+    def _parse(self, pdf_content: bytes, pdf_hash: str) -> ParsedDocument:
+        if self.parse_cache is None:
+            return self._load_document(pdf_content)
+        
+        artifacts = self.parse_cache.get(pdf_hash)
+        if artifacts is not None:
+            return ParsedDocument(pdf_content, artifacts=artifacts)
+        
+        return self._load_document(pdf_content)
+    
+    def _load_document(self, pdf_content: bytes) -> ParsedDocument:
+        if self.parser_pool is None:
+            return ParsedDocument(pdf_content).preload(*PRELOADED_ARTIFACTS)
+        return self.parser_pool.submit(load_document, pdf_content).result()
+    
+    def lookup(self, pdf_hash: str, label: str, schema: Dict[str, str]) -> CacheLookup:
+        timer = StageTimer()
+        cached = self.cache.get(pdf_hash, label, schema) if self.cache else None
+        return CacheLookup(cached, timer.elapsed())
+    
+    def process(self, pdf_content: bytes, label: str, schema: Dict[str, str], use_cache: bool = True, pdf_hash: Optional[str] = None, batch_llm: bool = False, lookup: Optional[CacheLookup] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        return self.extract(pdf_content, label, schema, use_cache=use_cache, pdf_hash=pdf_hash, batch_llm=batch_llm, lookup=lookup)
     
     def get_stats(self) -> Dict[str, Any]:
-        total = self.stats["total_extractions"]
+        counters = self.stats.snapshot()
+        total = counters["total_extractions"]
         
         stats = {
             "extractions": {
                 "total": total,
-                "cache_hits": self.stats["cache_hits"],
-                "heuristic_only": self.stats["heuristic_only"],
-                "hybrid": self.stats["hybrid"],
-                "llm_only": self.stats["llm_only"],
+                "cache_hits": counters["cache_hits"],
+                "partial_cache_hits": counters["partial_cache_hits"],
+                "coalesced": counters["coalesced"],
+                "heuristic_only": counters["heuristic_only"],
+                "hybrid": counters["hybrid"],
+                "llm_only": counters["llm_only"],
+                "empty": counters["empty"],
+                "template_updates": counters["template_updates"],
+                "shadow_samples": counters["shadow_samples"],
             },
             "performance": {
-                "total_time": round(self.stats["total_time"], 2),
-                "avg_time": round(self.stats["total_time"] / max(1, total), 3),
+                "total_time": round(counters["total_time"], 2),
+                "avg_time": round(counters["total_time"] / max(1, total), 3),
             },
             "llm": self.llm.get_stats(),
+            "latency": self.latency.snapshot(),
         }
         
         if self.cache:
             stats["cache"] = self.cache.get_stats()
+            stats["cache"]["parsed"] = self.parse_cache.get_stats()
+        
+        if self.calibrator:
+            stats["calibration"] = self.calibrator.snapshot()
         
         return stats
     
@@ -145,14 +438,15 @@ class ExtractionPipeline:
         return self.get_stats()
     
     def reset_statistics(self):
-        self.stats = {
-            "total_extractions": 0,
-            "cache_hits": 0,
-            "heuristic_only": 0,
-            "hybrid": 0,
-            "llm_only": 0,
-            "total_time": 0.0,
-        }
+        self.stats.reset()
+        self.latency.reset()
+    
+    def flush_statistics(self):
+        self.stats.flush()
+        self.llm.stats.flush()
+        if self.cache:
+            self.cache.stats.flush()
+            self.parse_cache.stats.flush()
 
 
 Pipeline = ExtractionPipeline
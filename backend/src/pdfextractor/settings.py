@@ -11,13 +11,33 @@ class LLMSettings:
     reasoning_effort: str
     cost_input_per_token: float
     cost_output_per_token: float
+    timeout_seconds: float
+    max_retries: int
+    backoff_base_seconds: float
+    backoff_max_seconds: float
+    circuit_failure_threshold: int
+    circuit_reset_seconds: float
+    max_connections: int
+    batching_enabled: bool
+    batch_max_size: int
+    batch_window_ms: int
+    batch_max_chars: int
+    context_selection_enabled: bool
+    context_tokens_per_field: int
+    context_max_tokens: int
+    context_window_lines: int
+    prompt_prefix_cache_size: int
 
 
 @dataclass
 class CacheSettings:
     directory: str
     memory_size: int
+    memory_size_mb: int
+    memory_ttl_seconds: int
     disk_size_gb: int
+    parsed_fraction: float
+    shards: int
 
 
 @dataclass
@@ -25,6 +45,14 @@ class HeuristicSettings:
     confidence_threshold: float
     position_x_tolerance: int
     position_y_tolerance: int
+    templates_enabled: bool
+    template_min_samples: int
+    plan_cache_size: int
+    tables_enabled: bool
+    calibration_enabled: bool
+    calibration_min_samples: int
+    calibration_target_agreement: float
+    calibration_sample_rate: float
 
 
 @dataclass
@@ -32,6 +60,23 @@ class LimitSettings:
     max_pdf_size_mb: int
     max_schema_fields: int
     max_text_length: int
+    max_pages: int
+    max_page_text_length: int
+
+
+@dataclass
+class ExecutionSettings:
+    thread_workers: int
+    process_workers: int
+    max_queue_size: int
+    retry_after_seconds: int
+    batch_concurrency: int
+    batch_queue_timeout_seconds: float
+
+
+@dataclass
+class MetricsSettings:
+    latency_window_size: int
 
 
 class Settings:
@@ -44,25 +89,68 @@ class Settings:
             max_tokens=int(os.getenv("LLM_MAX_TOKENS", "2048")),
             reasoning_effort=os.getenv("LLM_REASONING_EFFORT", "minimal"),
             cost_input_per_token=0.150 / 1_000_000,
-            cost_output_per_token=0.600 / 1_000_000
+            cost_output_per_token=0.600 / 1_000_000,
+            timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "30")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            backoff_base_seconds=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5")),
+            backoff_max_seconds=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8")),
+            circuit_failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            circuit_reset_seconds=float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30")),
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            batching_enabled=os.getenv("LLM_BATCHING_ENABLED", "true").lower() == "true",
+            batch_max_size=int(os.getenv("LLM_BATCH_MAX_SIZE", "8")),
+            batch_window_ms=int(os.getenv("LLM_BATCH_WINDOW_MS", "50")),
+            batch_max_chars=int(os.getenv("LLM_BATCH_MAX_CHARS", "40000")),
+            context_selection_enabled=os.getenv("LLM_CONTEXT_SELECTION_ENABLED", "true").lower() == "true",
+            context_tokens_per_field=int(os.getenv("LLM_CONTEXT_TOKENS_PER_FIELD", "150")),
+            context_max_tokens=int(os.getenv("LLM_CONTEXT_MAX_TOKENS", "2000")),
+            context_window_lines=int(os.getenv("LLM_CONTEXT_WINDOW_LINES", "1")),
+            prompt_prefix_cache_size=int(os.getenv("LLM_PROMPT_PREFIX_CACHE_SIZE", "256"))
         )
         
         self.cache = CacheSettings(
             directory=os.getenv("CACHE_DIR", "./storage/cache_data"),
             memory_size=int(os.getenv("CACHE_L1_SIZE", "100")),
-            disk_size_gb=int(os.getenv("CACHE_L2_SIZE_GB", "1"))
+            memory_size_mb=int(os.getenv("CACHE_L1_SIZE_MB", "64")),
+            memory_ttl_seconds=int(os.getenv("CACHE_L1_TTL_SECONDS", "3600")),
+            disk_size_gb=int(os.getenv("CACHE_L2_SIZE_GB", "1")),
+            parsed_fraction=float(os.getenv("CACHE_PARSED_FRACTION", "0.5")),
+            shards=int(os.getenv("CACHE_SHARDS", "8"))
         )
         
         self.heuristics = HeuristicSettings(
             confidence_threshold=float(os.getenv("HEURISTIC_CONFIDENCE_THRESHOLD", "0.75")),
             position_x_tolerance=int(os.getenv("POSITION_X_TOLERANCE", "30")),
-            position_y_tolerance=int(os.getenv("POSITION_Y_TOLERANCE", "20"))
+            position_y_tolerance=int(os.getenv("POSITION_Y_TOLERANCE", "20")),
+            templates_enabled=os.getenv("TEMPLATES_ENABLED", "true").lower() == "true",
+            template_min_samples=int(os.getenv("TEMPLATE_MIN_SAMPLES", "3")),
+            plan_cache_size=int(os.getenv("HEURISTIC_PLAN_CACHE_SIZE", "256")),
+            tables_enabled=os.getenv("TABLES_ENABLED", "true").lower() == "true",
+            calibration_enabled=os.getenv("CALIBRATION_ENABLED", "true").lower() == "true",
+            calibration_min_samples=int(os.getenv("CALIBRATION_MIN_SAMPLES", "20")),
+            calibration_target_agreement=float(os.getenv("CALIBRATION_TARGET_AGREEMENT", "0.9")),
+            calibration_sample_rate=float(os.getenv("CALIBRATION_SAMPLE_RATE", "0"))
         )
         
         self.limits = LimitSettings(
             max_pdf_size_mb=int(os.getenv("MAX_PDF_SIZE_MB", "10")),
             max_schema_fields=int(os.getenv("MAX_SCHEMA_FIELDS", "50")),
-            max_text_length=int(os.getenv("MAX_TEXT_LENGTH", "10000"))
+            max_text_length=int(os.getenv("MAX_TEXT_LENGTH", "10000")),
+            max_pages=int(os.getenv("MAX_PDF_PAGES", "20")),
+            max_page_text_length=int(os.getenv("MAX_PAGE_TEXT_LENGTH", "5000"))
+        )
+        
+        self.execution = ExecutionSettings(
+            thread_workers=int(os.getenv("EXECUTOR_THREAD_WORKERS", "16")),
+            process_workers=int(os.getenv("EXECUTOR_PROCESS_WORKERS", "2")),
+            max_queue_size=int(os.getenv("EXECUTOR_MAX_QUEUE_SIZE", "64")),
+            retry_after_seconds=int(os.getenv("EXECUTOR_RETRY_AFTER_SECONDS", "5")),
+            batch_concurrency=int(os.getenv("BATCH_CONCURRENCY", "8")),
+            batch_queue_timeout_seconds=float(os.getenv("BATCH_QUEUE_TIMEOUT_SECONDS", "60"))
+        )
+        
+        self.metrics = MetricsSettings(
+            latency_window_size=int(os.getenv("LATENCY_WINDOW_SIZE", "1000"))
         )
     
     def validate(self) -> bool:
@@ -77,19 +165,54 @@ class Settings:
                 "temperature": self.llm.temperature,
                 "max_tokens": self.llm.max_tokens,
                 "reasoning_effort": self.llm.reasoning_effort,
+                "timeout_seconds": self.llm.timeout_seconds,
+                "max_retries": self.llm.max_retries,
+                "circuit_failure_threshold": self.llm.circuit_failure_threshold,
+                "circuit_reset_seconds": self.llm.circuit_reset_seconds,
+                "max_connections": self.llm.max_connections,
+                "batching_enabled": self.llm.batching_enabled,
+                "batch_max_size": self.llm.batch_max_size,
+                "batch_window_ms": self.llm.batch_window_ms,
+                "context_selection_enabled": self.llm.context_selection_enabled,
+                "context_tokens_per_field": self.llm.context_tokens_per_field,
+                "context_max_tokens": self.llm.context_max_tokens,
             },
             "cache": {
                 "directory": self.cache.directory,
                 "memory_size": self.cache.memory_size,
+                "memory_size_mb": self.cache.memory_size_mb,
+                "memory_ttl_seconds": self.cache.memory_ttl_seconds,
                 "disk_size_gb": self.cache.disk_size_gb,
+                "parsed_fraction": self.cache.parsed_fraction,
+                "shards": self.cache.shards,
             },
             "heuristics": {
                 "confidence_threshold": self.heuristics.confidence_threshold,
+                "templates_enabled": self.heuristics.templates_enabled,
+                "template_min_samples": self.heuristics.template_min_samples,
+                "tables_enabled": self.heuristics.tables_enabled,
+                "calibration_enabled": self.heuristics.calibration_enabled,
+                "calibration_min_samples": self.heuristics.calibration_min_samples,
+                "calibration_target_agreement": self.heuristics.calibration_target_agreement,
+                "calibration_sample_rate": self.heuristics.calibration_sample_rate,
             },
             "limits": {
                 "max_pdf_size_mb": self.limits.max_pdf_size_mb,
                 "max_schema_fields": self.limits.max_schema_fields,
                 "max_text_length": self.limits.max_text_length,
+                "max_pages": self.limits.max_pages,
+                "max_page_text_length": self.limits.max_page_text_length,
+            },
+            "execution": {
+                "thread_workers": self.execution.thread_workers,
+                "process_workers": self.execution.process_workers,
+                "max_queue_size": self.execution.max_queue_size,
+                "retry_after_seconds": self.execution.retry_after_seconds,
+                "batch_concurrency": self.execution.batch_concurrency,
+                "batch_queue_timeout_seconds": self.execution.batch_queue_timeout_seconds,
+            },
+            "metrics": {
+                "latency_window_size": self.metrics.latency_window_size,
             },
         }
 
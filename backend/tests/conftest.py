@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("CALIBRATION_SAMPLE_RATE", "0")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="pdfextractor-tests-"))
+os.environ.setdefault("EXECUTOR_PROCESS_WORKERS", "0")
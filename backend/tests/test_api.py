@@ -0,0 +1,114 @@
+import asyncio
+import io
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
+
+from pdfextractor import api
+from pdfextractor.cache import KeyGenerator
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+
+
+@pytest.fixture
+def client():
+    return TestClient(api.app)
+
+
+def test_metrics_are_rendered_off_the_event_loop(client, monkeypatch):
+    threads = []
+    
+    def render():
+        threads.append(threading.current_thread().name)
+        return "pdfextractor_up 1\n"
+    
+    monkeypatch.setattr(api.pipeline.metrics, "render", render)
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.text == "pdfextractor_up 1\n"
+    assert response.headers["content-type"].startswith("text/plain")
+    assert threads and threads[0].startswith("AnyIO worker thread")
+
+
+def test_stats_are_collected_off_the_event_loop(client, monkeypatch):
+    threads = []
+    real_get_statistics = api.pipeline.get_statistics
+    
+    def get_statistics():
+        threads.append(threading.current_thread().name)
+        return real_get_statistics()
+    
+    monkeypatch.setattr(api.pipeline, "get_statistics", get_statistics)
+    
+    response = client.get("/stats")
+    
+    assert response.status_code == 200
+    assert "executor" in response.json()
+    assert threads and threads[0].startswith("AnyIO worker thread")
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    
+    async def run_extraction(pdf_content, pdf_hash, label, schema, use_cache, batch_llm=False):
+        calls.append((pdf_content, pdf_hash))
+        return {}, {"method": "empty", "processing_time": 0.0}
+    
+    monkeypatch.setattr(api, "run_extraction", run_extraction)
+    return calls
+
+
+def post_extract(client, content):
+    return client.post(
+        "/extract",
+        data={"label": "carteira_oab", "schema": json.dumps({"nome": "Nome"})},
+        files={"pdf": ("doc.pdf", content, "application/pdf")}
+    )
+
+
+def test_declared_size_over_limit_is_rejected_before_reading(client, extractions, monkeypatch):
+    monkeypatch.setattr(api.settings.limits, "max_pdf_size_mb", 1)
+    reads = []
+    real_read = UploadFile.read
+    
+    async def read(self, size=-1):
+        reads.append(size)
+        return await real_read(self, size)
+    
+    monkeypatch.setattr(UploadFile, "read", read)
+    
+    response = post_extract(client, b"x" * (1024 * 1024 + 1))
+    
+    assert response.status_code == 413
+    assert reads == []
+    assert extractions == []
+
+
+def test_stream_over_limit_is_rejected_mid_read(monkeypatch):
+    monkeypatch.setattr(api.settings.limits, "max_pdf_size_mb", 1)
+    monkeypatch.setattr(api, "UPLOAD_CHUNK_SIZE", 256 * 1024)
+    upload = UploadFile(io.BytesIO(b"x" * (2 * 1024 * 1024)), filename="doc.pdf")
+    assert upload.size is None
+    
+    with pytest.raises(api.HTTPException) as error:
+        asyncio.run(api.read_pdf_content(upload))
+    
+    assert error.value.status_code == 413
+    assert upload.file.tell() == 1024 * 1024 + 256 * 1024
+
+
+def test_incremental_digest_matches_pdf_hash(client, extractions, monkeypatch):
+    monkeypatch.setattr(api, "UPLOAD_CHUNK_SIZE", 1000)
+    content = EXAMPLE.read_bytes()
+    
+    response = post_extract(client, content)
+    
+    assert response.status_code == 200
+    assert extractions == [(content, KeyGenerator.hash_pdf(content))]
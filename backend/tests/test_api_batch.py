@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pdfextractor import api
+from pdfextractor.executor import QueueFullError
+from pdfextractor.models import DocumentLabel
+
+REQUEST = DocumentLabel(label="carteira_oab", extraction_schema={"nome": "Nome"})
+METADATA = {"method": "heuristic", "processing_time": 0.01}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    real_sleep = asyncio.sleep
+    
+    async def sleep(seconds):
+        waits.append(seconds)
+        await real_sleep(0)
+    
+    monkeypatch.setattr(api.asyncio, "sleep", sleep)
+    return waits
+
+
+def process(outcomes, monkeypatch):
+    attempts = []
+    
+    async def run_extraction(*args, **kwargs):
+        attempts.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    monkeypatch.setattr(api, "run_extraction", run_extraction)
+    item = asyncio.run(api.process_batch_item(
+        0, "a.pdf", b"%PDF", "hash", REQUEST, True, asyncio.Semaphore(1)
+    ))
+    return item, attempts
+
+
+def test_queue_full_item_is_retried_with_backoff(monkeypatch, sleeps):
+    item, attempts = process(
+        [QueueFullError(5), QueueFullError(5), ({"nome": "Maria"}, METADATA)],
+        monkeypatch
+    )
+    
+    assert item.error is None
+    assert item.data == {"nome": "Maria"}
+    assert len(attempts) == 3
+    assert attempts[0]["batch_llm"]
+    assert len(sleeps) == 2
+    assert sleeps[1] > sleeps[0] / 2
+    assert all(0 < seconds <= 5 for seconds in sleeps)
+
+
+def test_backoff_never_exceeds_retry_after(monkeypatch, sleeps):
+    item, _ = process([QueueFullError(1)] * 8 + [({"nome": "Maria"}, METADATA)], monkeypatch)
+    
+    assert item.error is None
+    assert max(sleeps) <= 1
+
+
+def test_gives_up_after_queue_timeout(monkeypatch, sleeps):
+    monkeypatch.setattr(api.settings.execution, "batch_queue_timeout_seconds", 0)
+    
+    item, attempts = process([QueueFullError(5)], monkeypatch)
+    
+    assert item.error == "Server busy, extraction queue is full"
+    assert len(attempts) == 1
+    assert sleeps == []
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    async def run_extraction(pdf_content, pdf_hash, label, schema, use_cache, batch_llm=False):
+        if pdf_content == b"%PDF quebrado":
+            raise RuntimeError("PDF corrompido")
+        return {"nome": pdf_content.decode()}, METADATA
+    
+    monkeypatch.setattr(api, "run_extraction", run_extraction)
+
+
+def post_stream(files):
+    requests = [{"label": "carteira_oab", "extraction_schema": {"nome": "Nome"}}] * len(files)
+    return TestClient(api.app).post(
+        "/extract/batch",
+        data={"requests": json.dumps(requests), "stream": "true"},
+        files=[("pdfs", (name, content, "application/pdf")) for name, content in files]
+    )
+
+
+def test_stream_yields_one_ndjson_line_per_item(extractions):
+    response = post_stream([("a.pdf", b"%PDF a"), ("b.pdf", b"%PDF b"), ("c.pdf", b"%PDF c")])
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    items = {item["index"]: item for item in map(json.loads, response.text.splitlines())}
+    assert sorted(items) == [0, 1, 2]
+    assert [items[i]["data"] for i in range(3)] == [{"nome": "%PDF a"}, {"nome": "%PDF b"}, {"nome": "%PDF c"}]
+    assert all(item["error"] is None for item in items.values())
+
+
+def test_bad_items_do_not_abort_the_stream(extractions):
+    response = post_stream([
+        ("a.pdf", b"%PDF a"),
+        ("quebrado.pdf", b"%PDF quebrado"),
+        ("notas.txt", b"texto"),
+        ("d.pdf", b"%PDF d"),
+    ])
+    
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    items = {item["index"]: item for item in map(json.loads, lines)}
+    
+    assert len(lines) == 4
+    assert "PDF corrompido" in items[1]["error"]
+    assert "notas.txt" in items[2]["error"]
+    assert items[0]["data"] == {"nome": "%PDF a"}
+    assert items[3]["data"] == {"nome": "%PDF d"}
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+from pdfextractor.benchmark import RssSampler, current_rss_mb, summarize_rss
+
+pytestmark = pytest.mark.skipif(current_rss_mb() is None, reason="RSS atual indisponível nesta plataforma")
+
+
+def test_sampler_measures_growth_inside_its_block():
+    with RssSampler(interval=0.001) as rss:
+        block = bytearray(64 * 1024**2)
+        block[::4096] = b"x" * len(block[::4096])
+        time.sleep(0.05)
+        del block
+    
+    assert rss.growth_mb() >= 48
+
+
+def test_scenarios_do_not_inherit_earlier_peaks():
+    with RssSampler(interval=0.001) as first:
+        block = bytearray(64 * 1024**2)
+        block[::4096] = b"x" * len(block[::4096])
+        time.sleep(0.05)
+        del block
+    
+    with RssSampler(interval=0.001) as second:
+        pass
+    
+    assert summarize_rss([first])["rss_growth_mb"] >= 48
+    assert summarize_rss([second])["rss_growth_mb"] < 8
+
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pdfextractor.cache.cache_manager import CacheManager
+from pdfextractor.cache.memory_cache import MemoryCache
+from pdfextractor.cache.parse_cache import ParseCache
+from pdfextractor.settings import settings
+
+PDF_HASH = "abc123"
+LABEL = "contrato"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    manager = CacheManager(cache_dir=str(tmp_path / "cache"))
+    yield manager
+    manager.disk_cache.close()
+
+
+def test_full_hit_returns_result_for_same_schema(cache):
+    schema = {"nome": "nome do cliente", "cpf": "cpf do cliente"}
+    cache.set(PDF_HASH, LABEL, schema, {"nome": "Maria", "cpf": "123", "_method": "hybrid"})
+    
+    result = cache.get(PDF_HASH, LABEL, schema)
+    
+    assert result["nome"] == "Maria"
+    assert result["cpf"] == "123"
+    assert result["_cache_level"] == "L1_MEMORY"
+    assert "_method" not in result
+
+
+def test_same_field_name_with_other_description_does_not_overwrite(cache):
+    parcela = {"valor": "valor da parcela"}
+    contrato = {"valor": "valor total do contrato"}
+    
+    cache.set(PDF_HASH, LABEL, parcela, {"valor": "100.00"})
+    cache.set(PDF_HASH, LABEL, contrato, {"valor": "5000.00"})
+    
+    assert cache.get(PDF_HASH, LABEL, parcela)["valor"] == "100.00"
+    assert cache.get(PDF_HASH, LABEL, contrato)["valor"] == "5000.00"
+
+
+def test_full_hit_is_served_from_disk_after_memory_is_cleared(cache):
+    parcela = {"valor": "valor da parcela"}
+    contrato = {"valor": "valor total do contrato"}
+    cache.set(PDF_HASH, LABEL, parcela, {"valor": "100.00"})
+    cache.set(PDF_HASH, LABEL, contrato, {"valor": "5000.00"})
+    cache.memory_cache = MemoryCache()
+    
+    result = cache.get(PDF_HASH, LABEL, parcela)
+    
+    assert result["valor"] == "100.00"
+    assert result["_cache_level"] == "L2_DISK"
+
+
+def test_partial_match_reuses_fields_with_same_name_and_description(cache):
+    cache.set(
+        PDF_HASH,
+        LABEL,
+        {"nome": "nome do cliente", "cpf": "cpf do cliente"},
+        {"nome": "Maria", "cpf": "123"}
+    )
+    
+    result = cache.get(
+        PDF_HASH,
+        LABEL,
+        {"nome": "nome do cliente", "cpf": "cpf do cliente", "email": "email do cliente"}
+    )
+    
+    assert result["_cache_level"] == "L3_PARTIAL"
+    assert result["nome"] == "Maria"
+    assert result["cpf"] == "123"
+    assert result["_needs_llm_fields"] == ["email"]
+
+
+def test_partial_match_ignores_field_with_other_description(cache):
+    cache.set(PDF_HASH, LABEL, {"valor": "valor da parcela"}, {"valor": "100.00"})
+    
+    assert cache.get(PDF_HASH, LABEL, {"valor": "valor total do contrato"}) is None
+
+
+def test_later_schema_keeps_earlier_value_when_it_found_nothing(cache):
+    schema = {"nome": "nome do cliente", "cpf": "cpf do cliente"}
+    cache.set(PDF_HASH, LABEL, {"nome": "nome do cliente"}, {"nome": "Maria"})
+    cache.set(PDF_HASH, LABEL, {"nome": "nome do cliente", "rg": "rg do cliente"}, {"nome": None, "rg": None})
+    
+    result = cache.get(PDF_HASH, LABEL, schema)
+    
+    assert result["_cache_level"] == "L3_PARTIAL"
+    assert result["nome"] == "Maria"
+
+
+def test_set_merges_records_written_by_another_worker(tmp_path):
+    worker_a = CacheManager(cache_dir=str(tmp_path / "cache"))
+    worker_b = CacheManager(cache_dir=str(tmp_path / "cache"))
+    nome = {"nome": "nome do cliente"}
+    cpf = {"cpf": "cpf do cliente"}
+    email = {"email": "email do cliente"}
+    
+    worker_a.set(PDF_HASH, LABEL, nome, {"nome": "Maria"})
+    worker_b.set(PDF_HASH, LABEL, cpf, {"cpf": "123"})
+    worker_a.set(PDF_HASH, LABEL, email, {"email": "maria@example.com"})
+    
+    reader = CacheManager(cache_dir=str(tmp_path / "cache"))
+    assert reader.get(PDF_HASH, LABEL, nome)["nome"] == "Maria"
+    assert reader.get(PDF_HASH, LABEL, cpf)["cpf"] == "123"
+    assert reader.get(PDF_HASH, LABEL, email)["email"] == "maria@example.com"
+    
+    for manager in (worker_a, worker_b, reader):
+        manager.disk_cache.close()
+
+
+def test_concurrent_sets_keep_every_schema(cache):
+    schemas = [{f"campo_{idx}": f"descrição {idx}"} for idx in range(16)]
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(
+            lambda schema: cache.set(PDF_HASH, LABEL, schema, {name: "ok" for name in schema}),
+            schemas
+        ))
+    
+    record = cache.disk_cache.get(cache.key_gen.generate_document_key(PDF_HASH, LABEL))
+    assert len(record["results"]) == len(schemas)
+
+
+def test_disk_budget_is_split_with_parse_cache(tmp_path):
+    cache_settings = type(settings.cache)(**{**vars(settings.cache), "disk_size_gb": 2, "parsed_fraction": 0.25})
+    results = CacheManager(cache_dir=str(tmp_path / "cache"), cache_settings=cache_settings)
+    parsed = ParseCache(cache_dir=str(tmp_path / "cache"), cache_settings=cache_settings)
+    
+    shards = cache_settings.shards
+    assert (results.disk_cache.size_limit + parsed.disk_cache.size_limit) * shards == 2 * 1024**3
+    assert parsed.disk_cache.size_limit * shards == 2 * 1024**3 // 4
+    
+    results.disk_cache.close()
+    parsed.disk_cache.close()
+
+
+def test_memory_budget_is_split_with_parse_cache(tmp_path):
+    cache_settings = type(settings.cache)(**{
+        **vars(settings.cache), "memory_size": 100, "memory_size_mb": 64, "parsed_fraction": 0.25
+    })
+    results = CacheManager(cache_dir=str(tmp_path / "cache"), cache_settings=cache_settings)
+    parsed = ParseCache(cache_dir=str(tmp_path / "cache"), cache_settings=cache_settings)
+    
+    assert results.memory_cache.max_items + parsed.memory_cache.max_items == 100
+    assert parsed.memory_cache.max_bytes == 16 * 1024**2
+    assert results.memory_cache.max_bytes + parsed.memory_cache.max_bytes == 64 * 1024**2
+    
+    results.disk_cache.close()
+    parsed.disk_cache.close()
@@ -0,0 +1,154 @@
+import asyncio
+import concurrent.futures
+import time
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError
+
+from pdfextractor.llm_client import CircuitBreaker, CircuitOpenError, LLMClient, LLMError
+from pdfextractor.settings import settings
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def bad_request():
+    return BadRequestError("invalid", response=httpx.Response(400, request=REQUEST), body=None)
+
+
+class FakeCompletions:
+    
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class FakeOpenAI:
+    
+    def __init__(self, completions):
+        self.chat = type("Chat", (), {"completions": completions})()
+    
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    llm = LLMClient()
+    llm.settings = type(settings.llm)(**{**vars(settings.llm), "max_retries": 0, "circuit_failure_threshold": 1})
+    llm.circuit = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    yield llm
+    llm.close()
+
+
+def call(llm, completions):
+    llm.client = FakeOpenAI(completions)
+    return asyncio.run_coroutine_threadsafe(llm._create_with_retries([]), llm._loop).result()
+
+
+def half_open(circuit):
+    circuit.opened_at = time.monotonic() - circuit.reset_seconds - 1
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_reset():
+    circuit = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    assert circuit.state == "closed"
+    
+    circuit.record_failure()
+    assert circuit.state == "closed"
+    circuit.record_failure()
+    assert circuit.state == "open"
+    assert not circuit.allow()
+    
+    half_open(circuit)
+    assert circuit.state == "half_open"
+    assert circuit.allow()
+    assert not circuit.allow()
+
+
+def test_breaker_closes_after_successful_trial():
+    circuit = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    circuit.record_failure()
+    half_open(circuit)
+    
+    assert circuit.allow()
+    circuit.record_success()
+    assert circuit.state == "closed"
+    assert circuit.allow()
+
+
+def test_failed_trial_reopens_breaker():
+    circuit = CircuitBreaker(failure_threshold=5, reset_seconds=60)
+    circuit.opened_at = 0.0
+    
+    assert circuit.allow()
+    circuit.record_failure()
+    assert circuit.state == "open"
+    assert not circuit.half_open_trial
+
+
+def test_successful_trial_closes_circuit(client):
+    client.circuit.record_failure()
+    half_open(client.circuit)
+    
+    completions = FakeCompletions("ok")
+    assert call(client, completions) == "ok"
+    assert client.circuit.state == "closed"
+
+
+def test_transient_error_during_trial_reopens_circuit(client):
+    client.circuit.record_failure()
+    half_open(client.circuit)
+    
+    with pytest.raises(LLMError):
+        call(client, FakeCompletions(APIConnectionError(request=REQUEST)))
+    assert client.circuit.state == "open"
+    assert not client.circuit.half_open_trial
+
+
+def test_non_transient_error_during_trial_reopens_instead_of_locking(client):
+    client.circuit.record_failure()
+    half_open(client.circuit)
+    
+    completions = FakeCompletions(bad_request(), "ok")
+    with pytest.raises(LLMError):
+        call(client, completions)
+    assert client.circuit.state == "open"
+    assert not client.circuit.half_open_trial
+    
+    half_open(client.circuit)
+    assert call(client, completions) == "ok"
+    assert completions.calls == 2
+    assert client.circuit.state == "closed"
+
+
+def test_cancelled_trial_reopens_circuit(client):
+    client.circuit.record_failure()
+    half_open(client.circuit)
+    
+    with pytest.raises((asyncio.CancelledError, concurrent.futures.CancelledError)):
+        call(client, FakeCompletions(asyncio.CancelledError()))
+    assert client.circuit.state == "open"
+    assert not client.circuit.half_open_trial
+
+
+def test_non_transient_error_while_closed_does_not_open_circuit(client):
+    with pytest.raises(LLMError):
+        call(client, FakeCompletions(bad_request()))
+    assert client.circuit.state == "closed"
+
+
+def test_open_circuit_rejects_without_calling_provider(client):
+    client.circuit.record_failure()
+    completions = FakeCompletions("ok")
+    
+    with pytest.raises(CircuitOpenError):
+        call(client, completions)
+    assert completions.calls == 0
@@ -0,0 +1,106 @@
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from pdfextractor import cli
+from pdfextractor.llm_client import LLMClient
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+SCHEMA = {"nome": "Nome", "inscricao": "Número de inscrição"}
+
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        LLMClient, "extract_fields",
+        lambda self, text, schema, **kwargs: {field: "valor" for field in schema}
+    )
+
+
+def write_dataset(tmp_path, names):
+    dataset = [
+        {"label": "carteira_oab", "extraction_schema": SCHEMA, "pdf_path": str(EXAMPLES / name)}
+        for name in names
+    ]
+    path = tmp_path / "dataset.json"
+    path.write_text(json.dumps(dataset), encoding="utf-8")
+    return path
+
+
+def batch_args(dataset, output=None, **kwargs):
+    defaults = {
+        "dataset": str(dataset), "pdf_dir": None, "output": output, "workers": 1,
+        "resume": False, "stats": False, "verbose": False, "pretty": False,
+    }
+    defaults.update(kwargs)
+    return Namespace(**defaults)
+
+
+def printed_stats(capsys):
+    err = capsys.readouterr().err
+    start = err.index('{\n  "statistics"')
+    return json.loads(err[start:err.index("\n}\n", start) + 2])["statistics"]
+
+
+def test_batch_stats_cover_only_the_current_run(tmp_path, capsys):
+    dataset = write_dataset(tmp_path, ["oab_1.pdf", "oab_2.pdf"])
+    
+    cli.extract_batch(batch_args(dataset, output=str(tmp_path / "first.jsonl"), stats=True))
+    assert printed_stats(capsys)["extractions"]["total"] == 2
+    
+    cli.extract_batch(batch_args(dataset, output=str(tmp_path / "second.jsonl"), stats=True))
+    stats = printed_stats(capsys)
+    assert stats["extractions"]["total"] == 2
+    assert stats["extractions"]["cache_hits"] == 2
+
+
+def read_entries(path):
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def test_resume_reprocesses_only_failed_and_unwritten_items(tmp_path, monkeypatch):
+    bad = tmp_path / "ruim.pdf"
+    bad.mkdir()
+    dataset = tmp_path / "dataset.json"
+    dataset.write_text(json.dumps([
+        {"label": "carteira_oab", "extraction_schema": SCHEMA, "pdf_path": str(EXAMPLES / "oab_1.pdf")},
+        {"label": "carteira_oab", "extraction_schema": SCHEMA, "pdf_path": str(bad)},
+        {"label": "carteira_oab", "extraction_schema": SCHEMA, "pdf_path": str(EXAMPLES / "oab_2.pdf")},
+        {"label": "carteira_oab", "extraction_schema": SCHEMA, "pdf_path": str(EXAMPLES / "oab_3.pdf")},
+    ]), encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+    
+    cli.extract_batch(batch_args(dataset, output=str(output)))
+    entries = read_entries(output)
+    assert [("error" in entry) for entry in entries] == [False, True, False, False]
+    
+    # Simula uma execução interrompida depois do item 2, com a última linha pela metade
+    lines = output.read_text(encoding="utf-8").splitlines(keepends=True)
+    output.write_text("".join(lines[:2]) + lines[2][:20], encoding="utf-8")
+    bad.rmdir()
+    bad.write_bytes((EXAMPLES / "oab_1.pdf").read_bytes())
+    
+    processed = []
+    process = cli.process_dataset_item
+    
+    def tracking(pipeline, item, batch_llm=False):
+        processed.append(item["index"])
+        return process(pipeline, item, batch_llm)
+    
+    monkeypatch.setattr(cli, "process_dataset_item", tracking)
+    cli.extract_batch(batch_args(dataset, output=str(output), resume=True))
+    
+    assert processed == [2, 3, 4]
+    
+    successes = [(entry["index"], entry["pdf_path"]) for entry in read_entries(output) if "error" not in entry]
+    assert sorted(successes) == sorted(set(successes))
+    assert [index for index, _ in sorted(successes)] == [1, 2, 3, 4]
@@ -0,0 +1,50 @@
+from pdfextractor.context_selector import CHARS_PER_TOKEN, ContextSelector
+
+SCHEMA = {"telefone": "Telefone do titular"}
+
+
+def selector(budget_chars, window_lines=1):
+    return ContextSelector(
+        tokens_per_field=budget_chars // CHARS_PER_TOKEN,
+        max_tokens=budget_chars // CHARS_PER_TOKEN,
+        window_lines=window_lines
+    )
+
+
+def test_short_text_is_returned_whole():
+    assert selector(400).select("Telefone: 1234", SCHEMA) == "Telefone: 1234"
+
+
+def test_keeps_neighbour_lines_when_window_fits():
+    text = "\n".join(["x" * 30] * 5 + ["antes", "Telefone: (11) 9999-0000", "depois"] + ["y" * 30] * 5)
+    
+    selected = selector(80).select(text, SCHEMA)
+    
+    assert selected == "antes\nTelefone: (11) 9999-0000\ndepois"
+
+
+def test_shrinks_window_before_truncating():
+    filler = "z" * 60
+    text = "\n".join(["x" * 30] * 5 + [filler, "Telefone: (11) 9999-0000", filler] + ["y" * 30] * 5)
+    
+    selected = selector(40).select(text, SCHEMA)
+    
+    assert selected == "Telefone: (11) 9999-0000"
+
+
+def test_skips_oversized_best_line_for_next_ranked():
+    long_line = "Telefone do titular " + "w" * 200
+    text = "\n".join(["x" * 30] * 5 + [long_line] + ["y" * 30] * 5 + ["Telefone: (11) 9999-0000"])
+    
+    selected = selector(40).select(text, SCHEMA)
+    
+    assert selected == "Telefone: (11) 9999-0000"
+
+
+def test_truncates_best_line_when_nothing_fits():
+    long_line = "Telefone: (11) 9999-0000 " + "w" * 200
+    text = "\n".join(["x" * 30] * 5 + [long_line] + ["y" * 30] * 5)
+    
+    selected = selector(40).select(text, SCHEMA)
+    
+    assert selected == long_line[:40]
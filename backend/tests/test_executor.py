@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+
+from pdfextractor.executor import ExtractionExecutor, QueueFullError
+from pdfextractor.settings import settings
+
+
+@pytest.fixture
+def executor():
+    execution = type(settings.execution)(**{
+        **vars(settings.execution),
+        "thread_workers": 1,
+        "max_queue_size": 1,
+        "process_workers": 0
+    })
+    executor = ExtractionExecutor(execution)
+    yield executor
+    executor.shutdown()
+
+
+def test_rejects_when_running_and_queued_slots_are_taken(executor):
+    release = threading.Event()
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        
+        with pytest.raises(QueueFullError):
+            await executor.run(lambda: "rejected")
+        
+        release.set()
+        return await running, await queued
+    
+    assert asyncio.run(scenario()) == (True, "queued")
+    assert executor.get_stats()["rejected"] == 1
+    assert executor.get_stats()["pending"] == 0
+
+
+def test_cancelled_request_keeps_slot_until_worker_finishes(executor):
+    started = threading.Event()
+    release = threading.Event()
+    
+    def work():
+        started.set()
+        release.wait()
+    
+    async def scenario():
+        task = asyncio.ensure_future(executor.run(work))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        busy = executor.get_stats()
+        release.set()
+        await asyncio.sleep(0.05)
+        return busy
+    
+    busy = asyncio.run(scenario())
+    
+    assert busy["pending"] == 1
+    assert busy["active"] == 1
+    assert executor.get_stats()["pending"] == 0
+
+
+def test_cancelled_queued_request_frees_its_slot(executor):
+    release = threading.Event()
+    ran = []
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: ran.append(True)))
+        await asyncio.sleep(0.05)
+        
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        pending = executor.get_stats()["pending"]
+        
+        release.set()
+        await running
+        return pending
+    
+    assert asyncio.run(scenario()) == 1
+    assert not ran
+    assert executor.get_stats()["pending"] == 0
@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pdfextractor.latency import LatencyStats, LatencyWindow, StageTimer, percentile
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+
+
+def test_percentile_uses_nearest_rank():
+    ordered = [float(value) for value in range(1, 101)]
+    
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 95) == 95.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_window_keeps_last_samples_and_total_count():
+    window = LatencyWindow(size=3)
+    for seconds in (10.0, 1.0, 2.0, 3.0):
+        window.add(seconds)
+    
+    summary = window.summary()
+    
+    assert summary["count"] == 4
+    assert summary["window"] == 3
+    assert summary["max"] == 3.0
+
+
+def test_record_timer_fills_stage_and_method_windows():
+    stats = LatencyStats(window_size=10, groups={"methods": ["cache"]})
+    timer = StageTimer()
+    with timer.stage("parse"):
+        pass
+    
+    stats.record_timer("hybrid", timer, 0.5)
+    snapshot = stats.snapshot()
+    
+    assert snapshot["stages"]["parse"]["count"] == 1
+    assert snapshot["methods"]["hybrid"]["p50"] == 0.5
+    assert snapshot["methods"]["cache"]["count"] == 0
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    yield pipeline
+    pipeline.llm.close()
+
+
+def test_coalesced_followers_use_their_own_latency_bucket(pipeline):
+    schema = {"nome": "Nome", "cor_favorita": "Cor favorita do titular"}
+    
+    def extract_fields(text, schema, **kwargs):
+        time.sleep(0.2)
+        return {field: "azul" for field in schema}
+    
+    pipeline.llm.extract_fields = extract_fields
+    pdf_content = EXAMPLE.read_bytes()
+    
+    def extract(delay):
+        time.sleep(delay)
+        return pipeline.extract(pdf_content, "carteira_oab", schema)
+    
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(extract, [0, 0.05, 0.05]))
+    
+    latency = pipeline.latency.snapshot()
+    
+    assert latency["methods"]["hybrid"]["count"] == 1
+    assert latency["methods"]["coalesced"]["count"] == 2
+    assert latency["stages"]["llm"]["count"] == 1
+    assert latency["methods"]["coalesced"]["max"] < latency["methods"]["hybrid"]["max"]
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pdfextractor.llm_batcher import BatchRequest, LLMBatcher
+from pdfextractor.llm_client import LLMClient, LLMError
+
+USAGE = SimpleNamespace(prompt_tokens=10, completion_tokens=5, prompt_tokens_details=None)
+
+
+def response(payload):
+    message = SimpleNamespace(content=json.dumps(payload))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=USAGE)
+
+
+class FakeCompletions:
+    
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = []
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs["messages"])
+        return response(self.payloads.pop(0))
+
+
+class FakeOpenAI:
+    
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+    
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    llm = LLMClient()
+    yield llm
+    llm.close()
+
+
+def run(llm, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, llm._loop).result()
+
+
+@pytest.mark.parametrize("payload", [["Ana", "1"], "Ana", 42, None])
+def test_single_call_rejects_non_object_json(client, payload):
+    client.client = FakeOpenAI(FakeCompletions(payload))
+    
+    with pytest.raises(LLMError):
+        run(client, client.aextract_fields("texto", {"nome": "Nome"}))
+    
+    assert client.stats.snapshot()["errors"] == 1
+
+
+ITEMS = [
+    ("texto 0", {"nome": "Nome", "cpf": "CPF"}, None),
+    ("texto 1", {"nome": "Nome", "cpf": "CPF"}, None),
+]
+
+
+def test_batch_accepts_answers_with_exact_fields(client):
+    client.client = FakeOpenAI(FakeCompletions({"documentos": {
+        "0": {"nome": "Ana", "cpf": "1"},
+        "1": {"nome": "Bia", "cpf": None},
+    }}))
+    
+    results = run(client, client.aextract_batch(ITEMS))
+    
+    assert results == [{"nome": "Ana", "cpf": "1"}, {"nome": "Bia", "cpf": None}]
+
+
+@pytest.mark.parametrize("answer", [
+    {"nome": "Bia"},
+    {"nome": "Bia", "cpf": "2", "rg": "3"},
+    {"name": "Bia", "cpf": "2"},
+    ["Bia", "2"],
+])
+def test_batch_rejects_answers_without_exact_fields(client, answer):
+    client.client = FakeOpenAI(FakeCompletions({"documentos": {
+        "0": {"nome": "Ana", "cpf": "1"},
+        "1": answer,
+    }}))
+    
+    results = run(client, client.aextract_batch(ITEMS))
+    
+    assert results == [{"nome": "Ana", "cpf": "1"}, None]
+
+
+def test_batcher_falls_back_to_single_call_for_rejected_answer(client):
+    completions = FakeCompletions(
+        {"documentos": {"0": {"nome": "Ana", "cpf": "1"}, "1": {"nome": "Bia"}}},
+        {"nome": "Bia", "cpf": "2"}
+    )
+    client.client = FakeOpenAI(completions)
+    batcher = LLMBatcher(client, max_batch_size=10, window_seconds=1.0, max_batch_chars=10000)
+    
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        requests = [BatchRequest(text, schema, context, loop.create_future()) for text, schema, context in ITEMS]
+        await batcher._run(None, requests)
+        return [request.future.result() for request in requests]
+    
+    results = run(client, scenario())
+    
+    assert results == [{"nome": "Ana", "cpf": "1"}, {"nome": "Bia", "cpf": "2"}]
+    assert len(completions.calls) == 2
+    assert client.stats.snapshot()["batch_fallbacks"] == 1
+
+
+def test_batcher_keeps_task_references_and_fails_requests_on_error(client, capsys):
+    batcher = LLMBatcher(client, max_batch_size=2, window_seconds=1.0, max_batch_chars=10000)
+    
+    async def broken_run(label, requests):
+        raise RuntimeError("falha interna")
+    
+    batcher._run = broken_run
+    
+    async def scenario():
+        submits = [asyncio.ensure_future(batcher.submit(text, schema, None, context)) for text, schema, context in ITEMS]
+        await asyncio.sleep(0)
+        assert len(batcher._tasks) == 1
+        return await asyncio.gather(*submits, return_exceptions=True)
+    
+    results = run(client, scenario())
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not batcher._tasks
+    assert "falha interna" in capsys.readouterr().out
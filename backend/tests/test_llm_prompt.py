@@ -0,0 +1,91 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pdfextractor.llm_client import LLMClient
+
+SCHEMA = {"nome": "Nome completo", "cpf": "CPF do titular", "data": "Data de emissão"}
+
+
+def response(payload, cached_tokens=None):
+    details = SimpleNamespace(cached_tokens=cached_tokens) if cached_tokens is not None else None
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10, prompt_tokens_details=details)
+    message = SimpleNamespace(content=json.dumps(payload))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class FakeCompletions:
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs["messages"])
+        return self.responses.pop(0)
+
+
+class FakeOpenAI:
+    
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+    
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    llm = LLMClient()
+    yield llm
+    llm.close()
+
+
+def run(llm, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, llm._loop).result()
+
+
+def test_prefix_is_built_once_per_label_and_schema(client):
+    first = client._prompt_prefix("single", "carteira_oab", SCHEMA)
+    second = client._prompt_prefix("single", "carteira_oab", dict(SCHEMA))
+    
+    assert first is second
+    assert client.get_stats()["prompt_prefixes"] == 1
+    
+    other = client._prompt_prefix("single", "tela_sistema", SCHEMA)
+    assert other != first
+    assert client.get_stats()["prompt_prefixes"] == 2
+
+
+@pytest.mark.parametrize("kind", ["single", "batch"])
+def test_field_order_does_not_change_prefix(client, kind):
+    reordered = dict(reversed(list(SCHEMA.items())))
+    
+    assert client._prompt_prefix(kind, "carteira_oab", SCHEMA) == client._prompt_prefix(kind, "carteira_oab", reordered)
+
+
+def test_messages_share_a_stable_prefix_before_document_text(client):
+    first = client._build_messages("texto A", SCHEMA, "carteira_oab", None)
+    second = client._build_messages("texto B", dict(reversed(list(SCHEMA.items()))), "carteira_oab", {"nome": "Ana"})
+    
+    prefix = client._prompt_prefix("single", "carteira_oab", SCHEMA)
+    assert first[0] == second[0]
+    assert first[1]["content"].startswith(prefix)
+    assert second[1]["content"].startswith(prefix)
+
+
+def test_cached_prompt_tokens_are_summed(client):
+    client.client = FakeOpenAI(FakeCompletions(
+        response({"nome": "Ana"}, cached_tokens=64),
+        response({"nome": "Bia"}),
+        response({"nome": "Carla"}, cached_tokens=32),
+    ))
+    
+    for text in ("a", "b", "c"):
+        run(client, client.aextract_fields(text, {"nome": "Nome"}))
+    
+    tokens = client.get_stats()["tokens"]
+    assert tokens["cached"] == 96
+    assert tokens["input"] == 300
@@ -0,0 +1,86 @@
+import pickle
+
+from pdfextractor.cache import memory_cache
+from pdfextractor.cache.memory_cache import MemoryCache
+
+
+def size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_evicts_least_recently_used_by_item_count():
+    cache = MemoryCache(max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_evicts_oldest_entries_to_fit_byte_budget():
+    value = "x" * 1000
+    cache = MemoryCache(max_items=100, max_bytes=size(value) * 2)
+    
+    cache.set("a", value)
+    cache.set("b", value)
+    cache.set("c", value)
+    
+    assert cache.get("a") is None
+    assert cache.get("b") == value
+    assert cache.get("c") == value
+    assert cache.size_bytes == size(value) * 2
+
+
+def test_skips_values_larger_than_budget():
+    cache = MemoryCache(max_bytes=100)
+    cache.set("small", "ok")
+    cache.set("big", "x" * 1000)
+    
+    assert cache.get("big") is None
+    assert cache.get("small") == "ok"
+
+
+def test_replacing_a_key_updates_byte_count():
+    cache = MemoryCache()
+    cache.set("a", "x" * 1000)
+    cache.set("a", "y")
+    
+    assert len(cache) == 1
+    assert cache.size_bytes == size("y")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memory_cache.time, "monotonic", lambda: now[0])
+    cache = MemoryCache(ttl_seconds=10)
+    cache.set("a", 1)
+    
+    now[0] += 9
+    assert cache.get("a") == 1
+    
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_zero_ttl_never_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memory_cache.time, "monotonic", lambda: now[0])
+    cache = MemoryCache(ttl_seconds=0)
+    cache.set("a", 1)
+    
+    now[0] += 10**6
+    assert cache.get("a") == 1
+
+
+def test_returns_copies():
+    cache = MemoryCache()
+    cache.set("a", {"fields": {"nome": "Maria"}})
+    
+    cache.get("a")["fields"]["nome"] = "Outra"
+    
+    assert cache.get("a") == {"fields": {"nome": "Maria"}}
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+
+from pdfextractor.metrics import MetricsRegistry
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+
+
+def test_renders_counters_and_gauges_with_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests served", ["method"])
+    gauge = registry.gauge("in_flight", "Requests in flight")
+    counter.inc(method="cache")
+    counter.inc(2, method="hybrid")
+    gauge.set(3)
+    gauge.dec()
+    
+    text = registry.render()
+    
+    assert text.endswith("\n")
+    assert "# HELP pdfextractor_requests_total Requests served\n" in text
+    assert "# TYPE pdfextractor_requests_total counter\n" in text
+    assert 'pdfextractor_requests_total{method="cache"} 1\n' in text
+    assert 'pdfextractor_requests_total{method="hybrid"} 2\n' in text
+    assert "# TYPE pdfextractor_in_flight gauge\n" in text
+    assert "pdfextractor_in_flight 2\n" in text
+
+
+def test_renders_cumulative_histogram_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("duration_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="parse")
+    histogram.observe(0.5, stage="parse")
+    histogram.observe(2.0, stage="parse")
+    
+    lines = registry.render().splitlines()
+    
+    assert "# TYPE pdfextractor_duration_seconds histogram" in lines
+    assert 'pdfextractor_duration_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'pdfextractor_duration_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'pdfextractor_duration_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'pdfextractor_duration_seconds_sum{stage="parse"} 2.55' in lines
+    assert 'pdfextractor_duration_seconds_count{stage="parse"} 3' in lines
+
+
+def test_collected_metrics_and_label_escaping():
+    registry = MetricsRegistry()
+    registry.counter(
+        "calls_total", "Calls", ["label"],
+        collect=lambda: {('a "quoted"\nlabel',): 4}
+    )
+    
+    assert 'pdfextractor_calls_total{label="a \\"quoted\\"\\nlabel"} 4\n' in registry.render()
+
+
+def test_counter_rejects_negative_and_wrong_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests served", ["method"])
+    
+    with pytest.raises(ValueError):
+        counter.inc(-1, method="cache")
+    with pytest.raises(ValueError):
+        counter.inc(stage="parse")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Duplicate")
+
+
+def test_failing_collector_does_not_break_render():
+    registry = MetricsRegistry()
+    
+    def broken():
+        raise RuntimeError("boom")
+    
+    registry.gauge("broken", "Broken", collect=broken)
+    registry.gauge("ok", "Ok").set(1)
+    
+    assert "pdfextractor_ok 1\n" in registry.render()
+
+
+def test_pipeline_exposes_extraction_metrics(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    try:
+        pipeline.llm.extract_fields = lambda text, schema, **kwargs: {field: "valor" for field in schema}
+        pipeline.extract(EXAMPLE.read_bytes(), "carteira_oab", {"nome": "Nome", "cor": "Cor favorita"})
+        pipeline.extract(EXAMPLE.read_bytes(), "carteira_oab", {"nome": "Nome", "cor": "Cor favorita"})
+        
+        text = pipeline.metrics.render()
+    finally:
+        pipeline.llm.close()
+    
+    lines = text.splitlines()
+    assert 'pdfextractor_extractions_total{method="cache"} 1' in lines
+    assert 'pdfextractor_extraction_duration_seconds_count{method="cache"} 1' in lines
+    assert any(line.startswith('pdfextractor_stage_duration_seconds_bucket{stage="parse"') for line in lines)
+    assert "# TYPE pdfextractor_in_flight_requests gauge" in lines
+    assert "pdfextractor_in_flight_requests 0" in lines
@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import pdfplumber
+import pytest
+
+from pdfextractor.pdf_parser import ParsedDocument
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+SCHEMA = {"nome": "Nome", "inscricao": "Número de inscrição"}
+RESOLVED_ON_FIRST_PAGE = {"nome": "Nome", "inscricao": "Número de inscrição", "seccional": "Seccional"}
+
+
+class BlankPage:
+    
+    def __init__(self, number, touched):
+        self.number = number
+        self.touched = touched
+    
+    def _touch(self):
+        self.touched.append(self.number)
+    
+    def extract_text(self):
+        self._touch()
+        return None
+    
+    def extract_words(self):
+        self._touch()
+        return []
+    
+    def extract_tables(self):
+        self._touch()
+        return []
+
+
+class ThreePagePdf:
+    
+    def __init__(self, touched):
+        self.real = pdfplumber.open(EXAMPLE)
+        self.pages = [self.real.pages[0], BlankPage(1, touched), BlankPage(2, touched)]
+    
+    def close(self):
+        self.real.close()
+
+
+@pytest.fixture
+def touched(monkeypatch):
+    touched = []
+    
+    def open_three_pages(self):
+        if self._pdf is None:
+            self._pdf = ThreePagePdf(touched)
+        return self._pdf
+    
+    monkeypatch.setattr(ParsedDocument, "_open", open_three_pages)
+    return touched
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    pipeline.llm.extract_fields = lambda text, schema, **kwargs: {field: None for field in schema}
+    yield pipeline
+    pipeline.llm.close()
+
+
+def test_later_pages_are_not_parsed_once_fields_are_resolved(pipeline, touched):
+    result, metadata = pipeline.extract(EXAMPLE.read_bytes(), "carteira_oab", RESOLVED_ON_FIRST_PAGE, pdf_hash="three_pages")
+    
+    assert metadata["method"] == "heuristic"
+    assert all(result.values())
+    assert touched == []
+    
+    artifacts = pipeline.parse_cache.get("three_pages")
+    assert artifacts["page_count"] == 3
+    assert set(artifacts["pages"]) == {0}
+
+
+def test_later_pages_are_parsed_while_fields_are_pending(pipeline, touched):
+    schema = {**RESOLVED_ON_FIRST_PAGE, "telefone_profissional": "Telefone"}
+    pipeline.extract(EXAMPLE.read_bytes(), "carteira_oab", schema, pdf_hash="three_pages")
+    
+    assert set(touched) == {1, 2}
+    assert set(pipeline.parse_cache.get("three_pages")["pages"]) == {0, 1, 2}
+
+
+@pytest.fixture
+def pdf_opens(monkeypatch):
+    opens = []
+    real_open = pdfplumber.open
+    
+    def recording_open(*args, **kwargs):
+        opens.append(args)
+        return real_open(*args, **kwargs)
+    
+    monkeypatch.setattr(pdfplumber, "open", recording_open)
+    return opens
+
+
+def test_parse_cache_hit_skips_pdfplumber_for_new_label_and_schema(pipeline, pdf_opens, tmp_path):
+    pdf_content = EXAMPLE.read_bytes()
+    pipeline.extract(pdf_content, "carteira_oab", SCHEMA, pdf_hash="oab_1")
+    assert pdf_opens
+    
+    pdf_opens.clear()
+    _, metadata = pipeline.extract(pdf_content, "outro_documento", {"situacao": "Situação"}, pdf_hash="oab_1")
+    assert metadata["method"] != "cache"
+    assert pdf_opens == []
+    
+    restarted = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    restarted.llm.extract_fields = pipeline.llm.extract_fields
+    try:
+        _, metadata = restarted.extract(pdf_content, "carteira_oab", {"categoria": "Categoria"}, pdf_hash="oab_1")
+        assert metadata["method"] != "cache"
+        assert restarted.parse_cache.get_stats()["hits"]["disk"] >= 1
+        assert pdf_opens == []
+    finally:
+        restarted.llm.close()
+
+
+def test_flat_artifacts_are_read_as_first_page(pdf_opens):
+    words = [{"text": "Ana", "x0": 10, "y0": 10, "x1": 30, "y1": 20, "page": 0, "type": "word"}]
+    document = ParsedDocument(b"", artifacts={"text": "Nome Ana", "words": words, "tables": []})
+    page = document.page(0)
+    
+    assert page.text == "Nome Ana"
+    assert page.words == words
+    assert page.tables == []
+    assert document.artifacts()["pages"] == {0: {"text": "Nome Ana", "words": words, "tables": []}}
+    assert pdf_opens == []
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+from diskcache import Cache
+
+from pdfextractor.heuristics.calibration import ConfidenceCalibrator
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+SCHEMA = {
+    "nome": "Nome",
+    "inscricao": "Número de inscrição",
+    "situacao": "Situação",
+    "telefone_profissional": "Telefone"
+}
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    yield pipeline
+    pipeline.llm.close()
+
+
+def test_shadow_fields_are_not_sent_as_context(pipeline):
+    calls = []
+    
+    def extract_fields(text, schema, label=None, context=None, **kwargs):
+        calls.append((dict(schema), dict(context or {})))
+        return {field: None for field in schema}
+    
+    pipeline.llm.extract_fields = extract_fields
+    pipeline.calibrator.sample_rate = 1.0
+    
+    _, metadata = pipeline.extract(EXAMPLE.read_bytes(), "carteira_oab", SCHEMA, use_cache=False)
+    
+    assert metadata.get("shadow_fields")
+    schema, context = calls[-1]
+    assert set(metadata["shadow_fields"]) <= set(schema)
+    assert not set(schema) & set(context)
+
+
+def test_calibrator_bounds_cached_fields_and_keeps_stored_totals(tmp_path):
+    store = Cache(str(tmp_path / "calibration"))
+    calibrator = ConfidenceCalibrator(store=store, base_threshold=0.7, min_samples=2, max_cached_fields=2)
+    
+    for label in ("a", "b", "c"):
+        for _ in range(3):
+            calibrator.record(label, "nome", "Ana", "Ana")
+    
+    assert len(calibrator._counts) == 2
+    assert ("a", "nome") not in calibrator._counts
+    assert sorted(calibrator.snapshot()) == ["a", "b", "c"]
+    assert calibrator.snapshot()["a"]["nome"]["total"] == 3
+    assert calibrator.threshold("a", "nome") < 0.7
+    
+    store.close()
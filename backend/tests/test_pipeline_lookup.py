@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+SCHEMA = {"nome": "Nome", "inscricao": "Número de inscrição"}
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    pipeline.llm.extract_fields = lambda text, schema, **kwargs: {field: "valor" for field in schema}
+    yield pipeline
+    pipeline.llm.close()
+
+
+def test_lookup_reports_miss_then_full_hit(pipeline):
+    pdf_content = EXAMPLE.read_bytes()
+    pdf_hash = "oab_1"
+    
+    assert not pipeline.lookup(pdf_hash, "carteira_oab", SCHEMA).full_hit
+    pipeline.process(pdf_content, "carteira_oab", SCHEMA, pdf_hash=pdf_hash)
+    
+    lookup = pipeline.lookup(pdf_hash, "carteira_oab", SCHEMA)
+    assert lookup.full_hit
+    
+    result, metadata = pipeline.process(pdf_content, "carteira_oab", SCHEMA, pdf_hash=pdf_hash, lookup=lookup)
+    assert metadata["method"] == "cache"
+    assert "cache_lookup" in metadata["timings"]
+    assert metadata["processing_time"] >= lookup.seconds
+    assert set(result) == set(SCHEMA)
+
+
+def test_partial_lookup_is_not_a_full_hit(pipeline):
+    pdf_content = EXAMPLE.read_bytes()
+    pipeline.process(pdf_content, "carteira_oab", SCHEMA, pdf_hash="oab_1")
+    
+    wider = {**SCHEMA, "situacao": "Situação"}
+    lookup = pipeline.lookup("oab_1", "carteira_oab", wider)
+    
+    assert lookup.cached["_cache_level"] == "L3_PARTIAL"
+    assert not lookup.full_hit
+    
+    _, metadata = pipeline.process(pdf_content, "carteira_oab", wider, pdf_hash="oab_1", lookup=lookup)
+    assert metadata["cache_level"] == "L3_PARTIAL"
@@ -0,0 +1,89 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from pdfextractor.heuristics.generic import GenericExtractor
+from pdfextractor.heuristics.oab import OABExtractor
+from pdfextractor.heuristics.registry import ExtractorRegistry, HeuristicExtractor
+from pdfextractor.pdf_parser import load_document
+from pdfextractor.pipeline import ExtractionPipeline
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+DATASET = json.loads((EXAMPLES / "dataset.json").read_text(encoding="utf-8"))
+EXPECTED = json.loads((Path(__file__).parent / "data" / "heuristics_expected.json").read_text(encoding="utf-8"))
+
+
+def make_registry():
+    registry = ExtractorRegistry()
+    registry.register(r"oab", ".oab:OABExtractor")
+    registry.register(r"sistema", ".sistema:SistemaExtractor")
+    return registry
+
+
+def test_registry_state_does_not_grow_with_distinct_labels():
+    registry = make_registry()
+    
+    for i in range(1000):
+        registry.for_label(f"carteira_oab_{i}")
+        registry.for_label(f"documento_{i}")
+    
+    assert sorted(registry.loaded()) == [".generic:GenericExtractor", ".oab:OABExtractor"]
+    assert all(len(value) <= 2 for value in vars(registry).values() if isinstance(value, (dict, list)))
+
+
+def test_labels_route_to_registered_extractors_with_generic_fallback():
+    registry = make_registry()
+    
+    assert isinstance(registry.for_label("carteira_OAB"), OABExtractor)
+    assert type(registry.for_label("documento_qualquer")) is GenericExtractor
+    assert registry.for_label("carteira_oab") is registry.for_label("oab_segunda_via")
+
+
+def test_extractor_modules_are_imported_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "pdfextractor.heuristics.sistema", raising=False)
+    registry = make_registry()
+    
+    registry.for_label("carteira_oab")
+    assert "pdfextractor.heuristics.sistema" not in sys.modules
+    assert registry.loaded() == [".oab:OABExtractor"]
+    
+    registry.for_label("tela_sistema")
+    assert "pdfextractor.heuristics.sistema" in sys.modules
+
+
+@pytest.mark.parametrize("item, expected", list(zip(DATASET, EXPECTED)), ids=[
+    f"{index}-{Path(item['pdf_path']).stem}" for index, item in enumerate(DATASET)
+])
+def test_dataset_heuristics_match_stored_outputs(item, expected):
+    document = load_document((EXAMPLES / Path(item["pdf_path"]).name).read_bytes())
+    
+    results, confidence, needs_llm = HeuristicExtractor().extract_fields(
+        document, item["extraction_schema"], item["label"]
+    )
+    
+    assert results == expected["data"]
+    assert {k: round(v, 2) for k, v in confidence.items()} == expected["confidence"]
+    assert needs_llm == expected["needs_llm"]
+
+
+def test_schema_without_answerable_fields_goes_straight_to_llm(tmp_path, monkeypatch):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    pipeline.llm.extract_fields = lambda text, schema, **kwargs: {field: "valor" for field in schema}
+    
+    def unexpected(*args, **kwargs):
+        raise AssertionError("heurísticas não deveriam rodar")
+    
+    monkeypatch.setattr(pipeline.heuristics, "extract_fields", unexpected)
+    schema = {"observacoes": "Observações gerais"}
+    
+    try:
+        assert pipeline.heuristics.answerable_fields(schema, "documento_qualquer") == {}
+        result, metadata = pipeline.extract((EXAMPLES / "oab_1.pdf").read_bytes(), "documento_qualquer", schema)
+    finally:
+        pipeline.llm.close()
+    
+    assert result == {"observacoes": "valor"}
+    assert metadata["method"] == "llm"
+    assert metadata["heuristic_confidence"] == {}
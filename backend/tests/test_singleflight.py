@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pdfextractor.pipeline import ExtractionPipeline
+from pdfextractor.singleflight import SingleFlight
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "oab_1.pdf"
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    
+    def work():
+        calls.append(True)
+        release.wait()
+        return {"value": [1]}
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "key", work) for _ in range(4)]
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+    
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result == {"value": [1]} for result, _ in results)
+    
+    leader = next(result for result, shared in results if not shared)
+    follower = next(result for result, shared in results if shared)
+    assert follower is not leader
+    assert follower["value"] is not leader["value"]
+
+
+def test_followers_receive_leader_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    
+    def work():
+        release.wait()
+        raise ValueError("falhou")
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flight.do, "key", work) for _ in range(2)]
+        time.sleep(0.05)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+    
+    assert flight.in_flight() == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ExtractionPipeline(cache_dir=str(tmp_path / "cache"))
+    yield pipeline
+    pipeline.llm.close()
+
+
+def test_pipeline_follower_gets_its_own_method_and_wait(pipeline):
+    schema = {"nome": "Nome", "cor_favorita": "Cor favorita do titular"}
+    calls = []
+    
+    def extract_fields(text, schema, **kwargs):
+        calls.append(True)
+        time.sleep(0.2)
+        return {field: "azul" for field in schema}
+    
+    pipeline.llm.extract_fields = extract_fields
+    pdf_content = EXAMPLE.read_bytes()
+    
+    def extract(delay):
+        time.sleep(delay)
+        return pipeline.extract(pdf_content, "carteira_oab", schema)
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(extract, [0, 0.05]))
+    
+    (_, leader), (_, follower) = results
+    assert len(calls) == 1
+    assert leader["method"] == "hybrid"
+    assert not leader.get("coalesced")
+    assert follower["method"] == "coalesced"
+    assert follower["coalesced"]
+    assert set(follower["timings"]) == {"coalesced_wait"}
+    assert follower["processing_time"] < leader["processing_time"]
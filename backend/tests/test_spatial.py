@@ -0,0 +1,90 @@
+from pdfextractor.heuristics.base import Anchor, FieldRule
+from pdfextractor.heuristics.plan import ExtractionPlan
+from pdfextractor.heuristics.spatial import SpatialIndex
+from pdfextractor.pdf_parser import ParsedDocument
+
+
+def word(text, x0, y0, width=None, height=10):
+    width = len(text) * 6 if width is None else width
+    return {"text": text, "x0": x0, "y0": y0, "x1": x0 + width, "y1": y0 + height, "page": 0, "type": "word"}
+
+
+def texts(words):
+    return [w["text"] for w in words]
+
+
+def test_right_of_finds_neighbours_across_cell_boundaries():
+    index = SpatialIndex([
+        word("Nome:", 20, 44),
+        word("Ana", 52, 44),
+        word("Maria", 74, 44),
+        word("Idade:", 110, 44),
+    ], cell_size=50)
+    
+    anchor = index.find("nome")[0]
+    
+    assert texts(index.right_of(anchor)) == ["Ana", "Maria"]
+
+
+def test_below_finds_the_next_row_across_cell_boundaries():
+    index = SpatialIndex([
+        word("Inscrição", 40, 36),
+        word("101943", 45, 52),
+        word("999999", 45, 70),
+    ], cell_size=50)
+    
+    anchor = index.find("inscrição")[0]
+    
+    assert texts(index.below(anchor)) == ["101943"]
+
+
+def test_right_of_rejects_words_outside_the_vertical_band():
+    index = SpatialIndex([word("Nome:", 20, 40), word("Ana", 60, 47)], y_tolerance=20)
+    
+    assert index.right_of(index.find("nome")[0]) == []
+
+
+def test_right_of_respects_max_distance():
+    index = SpatialIndex([word("Nome:", 20, 40), word("Ana", 200, 40)])
+    anchor = index.find("nome")[0]
+    
+    assert index.right_of(anchor, max_distance=100) == []
+    assert texts(index.right_of(anchor)) == ["Ana"]
+
+
+def test_below_rejects_words_outside_tolerances():
+    index = SpatialIndex([
+        word("Seccional", 100, 40),
+        word("PR", 20, 55),
+        word("SP", 110, 100),
+    ], x_tolerance=30, y_tolerance=20)
+    
+    assert index.below(index.find("seccional")[0]) == []
+
+
+def test_anchor_rule_beats_regex_fallback():
+    words = [
+        word("Protocolo", 20, 20), word("111111", 90, 20),
+        word("Inscrição", 20, 60), word("222222", 20, 75),
+    ]
+    document = ParsedDocument(b"", artifacts={
+        "page_count": 1,
+        "pages": {0: {"text": "Protocolo 111111\nInscrição\n222222", "words": words, "tables": []}},
+    })
+    rule = FieldRule(
+        "inscricao", lambda name: True, confidence=0.8,
+        patterns=[r"\b(\d{6})\b"],
+        anchors=[Anchor("inscrição", "below", r"\b(\d{6})\b")]
+    )
+    
+    results, confidence = ExtractionPlan({"inscricao": rule}).execute(document.page(0))
+    
+    assert results == {"inscricao": "222222"}
+    assert confidence == {"inscricao": rule.anchor_confidence}
+    
+    results, confidence = ExtractionPlan({"inscricao": FieldRule(
+        "inscricao", lambda name: True, confidence=0.8, patterns=[r"\b(\d{6})\b"]
+    )}).execute(document.page(0))
+    
+    assert results == {"inscricao": "111111"}
+    assert confidence == {"inscricao": 0.8}
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from pdfextractor.heuristics.base import FieldRule, LabelExtractor
+from pdfextractor.heuristics.registry import HeuristicExtractor
+from pdfextractor.heuristics.tables import EXACT_CONFIDENCE, TableReader
+
+
+def page(tables, text=""):
+    return SimpleNamespace(text=text, words=[], tables=tables)
+
+
+def test_reads_value_below_exact_header():
+    results, confidence = TableReader().extract(
+        page([[["Parcela", "Valor", "Vencimento"], ["1", "100,00", "10/01/2024"]]]),
+        {"valor": "Valor da parcela"}
+    )
+    
+    assert results == {"valor": "100,00"}
+    assert confidence == {"valor": EXACT_CONFIDENCE}
+
+
+def test_conflicting_values_for_best_header_return_nothing():
+    results, confidence = TableReader().extract(
+        page([
+            [["Valor"], ["100,00"]],
+            [["Valor"], ["200,00"]],
+        ]),
+        {"valor": "Valor da parcela"}
+    )
+    
+    assert results == {}
+    assert confidence == {}
+
+
+def test_repeated_identical_value_is_not_a_conflict():
+    results, _ = TableReader().extract(
+        page([
+            [["Valor"], ["100,00"]],
+            [["Valor"], ["100,00"]],
+        ]),
+        {"valor": "Valor da parcela"}
+    )
+    
+    assert results == {"valor": "100,00"}
+
+
+class TableExtractor(LabelExtractor):
+    
+    READS_TABLES = True
+    RULES = [
+        FieldRule("valor", lambda f: "valor" in f, 0.95, patterns=[r"R\$ ([\d.,]+)"]),
+        FieldRule("cpf", lambda f: "cpf" in f, 0.95, patterns=[r"CPF (\d+)"]),
+    ]
+
+
+class SingleExtractor:
+    
+    def for_label(self, label):
+        return TableExtractor()
+
+
+class CountingReader(TableReader):
+    
+    def __init__(self):
+        self.schemas = []
+    
+    def extract(self, page, schema):
+        self.schemas.append(dict(schema))
+        return super().extract(page, schema)
+
+
+def heuristics(threshold):
+    extractor = HeuristicExtractor(extractor_registry=SingleExtractor(), tables_enabled=True)
+    extractor.tables = CountingReader()
+    extractor.threshold = lambda label, field_name: threshold
+    return extractor
+
+
+def document(*pages):
+    return SimpleNamespace(pages=lambda: iter(pages))
+
+
+def test_tables_only_read_fields_pending_after_regex():
+    extractor = heuristics(threshold=0.85)
+    doc = document(page(
+        [[["Parcela", "Valor", "CPF"], ["1", "100,00", "999"]]],
+        text="CPF 123"
+    ))
+    
+    results, _, _ = extractor.extract_fields(doc, {"valor": "Valor", "cpf": "CPF"}, "tela")
+    
+    assert extractor.tables.schemas == [{"valor": "Valor"}]
+    assert results == {"valor": "100,00", "cpf": "123"}
+
+
+def test_exact_table_hit_wins_tie_with_regex():
+    extractor = heuristics(threshold=0.99)
+    doc = document(page(
+        [[["Valor"], ["100,00"]]],
+        text="Total R$ 5.000,00"
+    ))
+    
+    results, confidence, needs_llm = extractor.extract_fields(doc, {"valor": "Valor"}, "tela")
+    
+    assert results["valor"] == "100,00"
+    assert confidence["valor"] == EXACT_CONFIDENCE
+    assert needs_llm
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from pdfextractor.cache.cache_manager import CacheManager
+from pdfextractor.heuristics.templates import LayoutTemplate
+
+
+def word(text, x0, y0, width=40, height=10):
+    return {"text": text, "x0": x0, "y0": y0, "x1": x0 + width, "y1": y0 + height}
+
+
+class Page:
+    
+    def __init__(self, number, lines):
+        self.number = number
+        self._lines = lines
+        self.text = "\n".join(" ".join(w["text"] for w in line) for line in lines)
+        self.lines_reads = 0
+    
+    @property
+    def lines(self):
+        self.lines_reads += 1
+        return self._lines
+
+
+def form_page(number, value):
+    return Page(number, [
+        [word("Titulo", 10, 10)],
+        [word("Nome:", 10, 50), word(value, 60, 50)],
+    ])
+
+
+def document(*pages):
+    return SimpleNamespace(pages=lambda: iter(pages))
+
+
+def learned_field(samples):
+    return {
+        "nome": {
+            "bbox": [60, 50, 100, 60],
+            "anchor": ["nome"],
+            "anchor_bbox": [10, 50, 50, 60],
+            "kind": "alpha",
+            "page": 0,
+            "samples": samples,
+        }
+    }
+
+
+def test_anchored_read_needs_min_samples_for_high_confidence():
+    page = form_page(0, "MARIA")
+    
+    _, single = LayoutTemplate("form", learned_field(1), min_samples=3).extract(page, {"nome": "Nome"})
+    results, confirmed = LayoutTemplate("form", learned_field(3), min_samples=3).extract(page, {"nome": "Nome"})
+    
+    assert single["nome"] < 0.75
+    assert results["nome"] == "MARIA"
+    assert confirmed["nome"] == 0.9
+
+
+def test_learn_reads_words_only_on_pages_containing_the_value():
+    cover = form_page(0, "OUTRO")
+    body = form_page(1, "MARIA")
+    template = LayoutTemplate("form")
+    
+    assert template.learn(document(cover, body), {"nome": "MARIA"})
+    
+    assert cover.lines_reads == 0
+    assert body.lines_reads == 1
+    assert template.fields["nome"]["page"] == 1
+
+
+def test_learn_without_matches_changes_nothing():
+    template = LayoutTemplate("form")
+    
+    assert not template.learn(document(form_page(0, "OUTRO")), {"nome": "MARIA"})
+    assert template.fields == {}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    manager = CacheManager(cache_dir=str(tmp_path / "cache"))
+    yield manager
+    manager.disk_cache.close()
+
+
+def test_concurrent_template_updates_are_not_lost(cache):
+    def add_field(idx):
+        def update(fields):
+            fields = dict(fields or {})
+            fields[f"campo_{idx}"] = {"samples": 1}
+            return fields
+        return cache.update_template("form", update)
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(add_field, range(16)))
+    
+    assert len(cache.get_template("form")) == 16
+
+
+def test_update_template_skips_write_when_nothing_changed(cache):
+    assert not cache.update_template("form", lambda fields: None)
+    assert cache.get_template("form") is None